@@ -56,6 +56,18 @@ DATABASES = {
     }
 }
 
+# Kesh sozlamalari (bir nechta gunicorn jarayonlari uchun umumiy)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'TIMEOUT': 300,
+    }
+}
+
+# E'lonlar lentasi keshi muddati (soniya)
+ANNOUNCEMENT_FEED_TIMEOUT = 300
+
 # Til va vaqt sozlamalari
 LANGUAGE_CODE = 'uz'
 TIME_ZONE = 'Asia/Tashkent'
@@ -71,6 +83,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Fonda yaratilgan hisobotlar (MEDIA_ROOT/reports) qancha vaqt qayta ishlatiladi (soniya)
+REPORT_JOB_CACHE_SECONDS = 3600
+
+# Faoliyat tarixi: 'buffered' - fon oqimida bulk_create, 'sync' - har bir yozuv darhol.
+# Standart - 'sync' (testlar va buyruqlar uchun); ishchi serverda ACTIVITY_LOG_MODE=buffered muhit o'zgaruvchisi bilan yoqiladi
+ACTIVITY_LOG_MODE = os.environ.get('ACTIVITY_LOG_MODE', 'sync')
+ACTIVITY_LOG_BATCH_SIZE = 100
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # soniya
+# Shu kundan eski yozuvlar archive_activity_log buyrug'i bilan arxivga ko'chiriladi
+ACTIVITY_LOG_RETENTION_DAYS = 180
+ACTIVITY_ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
+
 # Session va authentication sozlamalari
 SESSION_COOKIE_AGE = 3600  # 1 soat
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Brauzer yopilganda session tugasin
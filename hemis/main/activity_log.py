@@ -0,0 +1,69 @@
+# main/activity_log.py
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import connection
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LOG_BATCH_SIZE = getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 100)
+ACTIVITY_LOG_FLUSH_INTERVAL = getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 2.0)
+
+
+class ActivityLogBuffer:
+    """ActivityLog yozuvlarini xotirada yig'ib, fon oqimida bulk_create bilan yozish
+    
+    Yozuvlar hajm (ACTIVITY_LOG_BATCH_SIZE) yoki vaqt (ACTIVITY_LOG_FLUSH_INTERVAL)
+    chegarasiga yetganda yoziladi, jarayon tugashida esa albatta yoziladi.
+    """
+
+    def __init__(self):
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Fork qilingan jarayon ota jarayon yozuvlarini qayta yozmasligi kerak
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._entries = []
+        self._thread = None
+
+    def add(self, entry):
+        """Yozuvni navbatga qo'shish"""
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= ACTIVITY_LOG_BATCH_SIZE
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Navbatdagi barcha yozuvlarni bitta bulk_create bilan yozish"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if entries:
+            ActivityLog.objects.bulk_create(entries, batch_size=500)
+        return len(entries)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(ACTIVITY_LOG_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Faoliyat tarixini yozishda xatolik")
+            finally:
+                # Fon oqimining ulanishi ochiq qolmasligi uchun
+                connection.close()
+
+
+activity_log_buffer = ActivityLogBuffer()
+
+# Worker to'xtaganda navbatda qolgan yozuvlar yo'qolmasligi uchun
+atexit.register(activity_log_buffer.flush)
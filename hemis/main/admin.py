@@ -1,14 +1,27 @@
 # main/admin.py
 from django.contrib import admin
 from .models import *
+from .gradebook import refresh_grade_summary
+from .stats import refresh_summary_groups
+
+class CounterColumnAdmin(admin.ModelAdmin):
+    """Hisoblagich ustuni signallarda F() bilan yangilanadi - tahrirda faqat o'zgargan maydonlar yoziladi"""
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save(update_fields=form.changed_data)
+        else:
+            obj.save()
 
 @admin.register(SchoolClass)
-class SchoolClassAdmin(admin.ModelAdmin):
+class SchoolClassAdmin(CounterColumnAdmin):
     list_display = ['name', 'student_count']
+    readonly_fields = ['student_count']
 
 @admin.register(Subject)
-class SubjectAdmin(admin.ModelAdmin):
+class SubjectAdmin(CounterColumnAdmin):
     list_display = ['name', 'teacher_count']
+    readonly_fields = ['teacher_count']
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -21,16 +34,44 @@ class TeacherAdmin(admin.ModelAdmin):
 
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
-    list_display = ['student', 'subject', 'quarter_grade', 'yearly_grade', 'average_score']
+    list_display = ['student', 'subject', 'value', 'date', 'quarter_grade', 'yearly_grade']
+
+    def delete_queryset(self, request, queryset):
+        """Tanlangan baholar bitta so'rov bilan o'chiriladi, yig'indi har bir (o'quvchi, fan) uchun bir marta"""
+        pairs = set(queryset.values_list('student_id', 'subject_id'))
+        queryset.delete()
+        for student_id, subject_id in pairs:
+            refresh_grade_summary(student_id, subject_id)
+
+@admin.register(GradeSummary)
+class GradeSummaryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'subject', 'marks_count', 'average_score', 'updated_at']
+    list_filter = ['subject']
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ['student', 'date', 'status', 'subject']
 
+    def delete_queryset(self, request, queryset):
+        """Tanlangan yozuvlar bitta so'rov bilan o'chiriladi, yig'indi har bir (sana, sinf, fan) uchun bir marta"""
+        groups = set(queryset.values_list('date', 'student__school_class_id', 'subject_id'))
+        queryset.delete()
+        refresh_summary_groups(groups)
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'school_class', 'subject', 'teacher', 'present_count', 'absent_with_reason_count', 'absent_without_reason_count']
+    list_filter = ['school_class', 'subject', 'date']
+
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'target_class', 'created_at']
 
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report_type', 'file_format', 'status', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'report_type']
+
 @admin.register(Schedule)
 class ScheduleAdmin(admin.ModelAdmin):
     list_display = ['id', 'school_class', 'subject', 'day', 'period', 'room']
@@ -41,4 +82,14 @@ class ScheduleAdmin(admin.ModelAdmin):
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'activity_type', 'description', 'ip_address', 'created_at')
     list_filter = ('activity_type', 'created_at')
-    search_fields = ('description', 'user__username')
\ No newline at end of file
+    search_fields = ('description', 'user__username')
+
+@admin.register(LessonPeriod)
+class LessonPeriodAdmin(admin.ModelAdmin):
+    list_display = ['number', 'day', 'start_time', 'end_time']
+    list_filter = ['day']
+
+@admin.register(Curriculum)
+class CurriculumAdmin(admin.ModelAdmin):
+    list_display = ['school_class', 'subject', 'weekly_hours']
+    list_filter = ['school_class', 'subject']
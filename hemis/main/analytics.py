@@ -0,0 +1,167 @@
+# main/analytics.py
+from itertools import islice
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from .models import Attendance, Grade, SchoolClass, Subject
+
+ANALYTICS_CHUNK_SIZE = 20000
+ANALYTICS_TIMEOUT = getattr(settings, 'ANALYTICS_TIMEOUT', 600)
+
+# Davomat holati -> son (0 - keldi)
+STATUS_CODES = {status: code for code, (status, _) in enumerate(Attendance.ATTENDANCE_CHOICES)}
+
+# O'quvchilar davomat foizi taqsimoti (oxirgi oraliq 100% ni ham o'z ichiga oladi)
+RATE_BINS = [0, 50, 60, 70, 80, 90, 100]
+
+# Sababsiz va sababli qoldirilgan darslar soni bo'yicha guruhlar: (quyi chegara, nomi)
+ABSENCE_BUCKETS = [(0, '0'), (1, '1-2'), (3, '3-5'), (6, '6-10'), (11, '11+')]
+
+PERCENTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75}
+
+
+def _round(value, digits=2):
+    return round(float(value), digits)
+
+def load_columns(queryset, fields, chunk_size=ANALYTICS_CHUNK_SIZE):
+    """values_list qatorlarini bo'laklab o'qib ustunli int64 massivlarga aylantirish: {maydon: massiv}"""
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    parts = []
+    while chunk := list(islice(rows, chunk_size)):
+        parts.append(np.array(chunk, dtype=np.int64).reshape(len(chunk), len(fields)))
+    data = np.concatenate(parts) if parts else np.empty((0, len(fields)), dtype=np.int64)
+    return {field: data[:, i] for i, field in enumerate(fields)}
+
+def attendance_columns(date_from, date_to):
+    """Davomat: student, school_class, status (STATUS_CODES bo'yicha SQL ichida songa aylantiriladi)"""
+    status_code = models.Case(
+        *(models.When(status=status, then=models.Value(code)) for status, code in STATUS_CODES.items()),
+        output_field=models.IntegerField(),
+    )
+    attendance = Attendance.objects.filter(date__gte=date_from, date__lte=date_to).order_by().annotate(
+        school_class=models.F('student__school_class_id'), status_code=status_code,
+    )
+    columns = load_columns(attendance, ['student_id', 'school_class', 'status_code'])
+    return {'student': columns['student_id'], 'school_class': columns['school_class'], 'status': columns['status_code']}
+
+def grade_columns(date_from, date_to):
+    """Baholar: student, school_class, subject, value"""
+    grades = Grade.objects.filter(
+        date__gte=date_from, date__lte=date_to, value__isnull=False
+    ).order_by().annotate(school_class=models.F('student__school_class_id'))
+    columns = load_columns(grades, ['student_id', 'school_class', 'subject_id', 'value'])
+    return {
+        'student': columns['student_id'],
+        'school_class': columns['school_class'],
+        'subject': columns['subject_id'],
+        'value': columns['value'],
+    }
+
+def attendance_distribution(attendance):
+    """O'quvchilar davomat foizi: o'rtacha, mediana va RATE_BINS bo'yicha gistogramma"""
+    students, index = np.unique(attendance['student'], return_inverse=True)
+    totals = np.bincount(index)
+    present = np.bincount(index, weights=attendance['status'] == STATUS_CODES['present'])
+    rates = present / totals * 100 if len(students) else np.empty(0)
+    counts, _ = np.histogram(rates, bins=RATE_BINS)
+
+    labels = [f'<{RATE_BINS[1]}%'] + [f'{low}-{high}%' for low, high in zip(RATE_BINS[1:], RATE_BINS[2:])]
+    return {
+        'students': len(students),
+        'mean_rate': _round(rates.mean(), 1) if len(rates) else 0,
+        'median_rate': _round(np.median(rates), 1) if len(rates) else 0,
+        'histogram': [
+            {'label': label, 'count': int(count), 'percent': round(count / len(rates) * 100) if len(rates) else 0}
+            for label, count in zip(labels, counts)
+        ],
+    }
+
+def group_percentiles(keys, values, names):
+    """Guruhlar (sinf yoki fan) bo'yicha baholar: soni, o'rtacha va kvartillar
+
+    Bitta lexsort bilan guruh ichida saralanadi, kvartillar chiziqli interpolyatsiya
+    (np.percentile standarti) bilan barcha guruhlar uchun birdaniga hisoblanadi.
+    """
+    if not len(keys):
+        return []
+    order = np.lexsort((values, keys))
+    keys = keys[order]
+    values = values[order].astype(np.float64)
+    groups, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    means = np.add.reduceat(values, starts) / counts
+
+    quantiles = {}
+    for name, fraction in PERCENTILES.items():
+        position = starts + fraction * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        quantiles[name] = values[low] + (values[high] - values[low]) * (position - low)
+
+    rows = [
+        {
+            'name': names.get(int(group), ''),
+            'count': int(counts[i]),
+            'mean': _round(means[i]),
+            **{name: _round(quantiles[name][i]) for name in PERCENTILES},
+        }
+        for i, group in enumerate(groups)
+    ]
+    return sorted(rows, key=lambda row: row['name'])
+
+def absence_grade_correlation(attendance, grades):
+    """Qoldirilgan darslar soni va o'rtacha baho o'rtasidagi Pearson korrelyatsiyasi
+
+    Ikkala ma'lumoti ham bor o'quvchilar olinadi. Qo'shimcha: ABSENCE_BUCKETS bo'yicha o'rtacha baho.
+    """
+    att_students, att_index = np.unique(attendance['student'], return_inverse=True)
+    absences = np.bincount(att_index, weights=attendance['status'] != STATUS_CODES['present'])
+    grade_students, grade_index = np.unique(grades['student'], return_inverse=True)
+    averages = np.bincount(grade_index, weights=grades['value']) / np.bincount(grade_index) if len(grade_students) else np.empty(0)
+
+    _, att_pos, grade_pos = np.intersect1d(att_students, grade_students, assume_unique=True, return_indices=True)
+    absences = absences[att_pos]
+    averages = averages[grade_pos]
+
+    correlation = None
+    if len(absences) > 1 and absences.std() > 0 and averages.std() > 0:
+        correlation = _round(np.corrcoef(absences, averages)[0, 1])
+
+    bounds = [low for low, _ in ABSENCE_BUCKETS]
+    bucket = np.digitize(absences, bounds[1:])
+    students = np.bincount(bucket, minlength=len(bounds))
+    totals = np.bincount(bucket, weights=averages, minlength=len(bounds))
+    return {
+        'students': len(absences),
+        'correlation': correlation,
+        'buckets': [
+            {
+                'label': label,
+                'students': int(students[i]),
+                'average': _round(totals[i] / students[i]) if students[i] else None,
+            }
+            for i, (_, label) in enumerate(ABSENCE_BUCKETS)
+        ],
+    }
+
+def school_analytics(date_from, date_to):
+    """Maktab bo'yicha tahlil: davomat taqsimoti, sinf/fan kvartillari va korrelyatsiya"""
+    attendance = attendance_columns(date_from, date_to)
+    grades = grade_columns(date_from, date_to)
+    class_names = dict(SchoolClass.objects.values_list('id', 'name'))
+    subject_names = dict(Subject.objects.values_list('id', 'name'))
+    return {
+        'attendance': attendance_distribution(attendance),
+        'class_grades': group_percentiles(grades['school_class'], grades['value'], class_names),
+        'subject_grades': group_percentiles(grades['subject'], grades['value'], subject_names),
+        'absences': absence_grade_correlation(attendance, grades),
+    }
+
+def get_school_analytics(date_from, date_to):
+    """Tahlil natijasi keshdan (ANALYTICS_TIMEOUT soniya)"""
+    key = f'analytics:{date_from.isoformat()}:{date_to.isoformat()}'
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = school_analytics(date_from, date_to)
+        cache.set(key, analytics, ANALYTICS_TIMEOUT)
+    return analytics
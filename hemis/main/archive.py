@@ -0,0 +1,141 @@
+# main/archive.py
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import timezone
+from .models import ActivityLog
+
+ACTIVITY_LOG_RETENTION_DAYS = getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 180)
+
+_ARCHIVE_NAME = re.compile(r'^activity-(\d{4}-\d{2})\.jsonl\.gz$')
+
+
+def archive_dir():
+    """Arxiv papkasi (sozlamalardan har safar o'qiladi)"""
+    return getattr(settings, 'ACTIVITY_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+
+def archive_path(month):
+    """Oylik arxiv fayli yo'li (month - 'YYYY-MM')"""
+    return os.path.join(archive_dir(), f'activity-{month}.jsonl.gz')
+
+def archive_months():
+    """Mavjud arxiv oylari (yangilari birinchi)"""
+    directory = archive_dir()
+    if not os.path.isdir(directory):
+        return []
+    months = (_ARCHIVE_NAME.match(name) for name in os.listdir(directory))
+    return sorted((match.group(1) for match in months if match), reverse=True)
+
+def _append_records(month, records):
+    """Yozuvlarni arxiv oxiriga yangi gzip a'zosi sifatida qo'shish"""
+    os.makedirs(archive_dir(), exist_ok=True)
+    data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+    with open(archive_path(month), 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+            archive.write(data.encode('utf-8'))
+        raw.flush()
+        # O'chirishdan oldin yozuvlar diskda bo'lishi shart
+        os.fsync(raw.fileno())
+
+def archive_activities(days=None, chunk_size=1000):
+    """Eski faoliyat yozuvlarini oylik arxivlarga ko'chirib, bazadan o'chirish
+
+    Yozuvlar (created_at, id) o'sish tartibida ko'chiriladi, shuning uchun oylik fayl ham shu tartibda.
+    Har bir bo'lak avval arxivga yoziladi, keyin o'chiriladi. Jarayon to'xtab qolsa
+    bo'lak qayta yozilishi mumkin - o'qishda takrorlar tashlab yuboriladi.
+    Qaytaradi: {oy: ko'chirilgan yozuvlar soni}
+    """
+    days = ACTIVITY_LOG_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    moved = {}
+    last = None
+
+    while True:
+        queryset = ActivityLog.objects.filter(created_at__lt=cutoff)
+        if last:
+            queryset = queryset.filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], id__gt=last[1]))
+        rows = list(
+            queryset.order_by('created_at', 'id').values_list(
+                'id', 'created_at', 'user_id', 'user__username', 'activity_type',
+                'description', 'ip_address', 'agent__value',
+            )[:chunk_size]
+        )
+        if not rows:
+            break
+
+        by_month = {}
+        for pk, created_at, user_id, username, activity_type, description, ip_address, user_agent in rows:
+            month = timezone.localtime(created_at).strftime('%Y-%m')
+            by_month.setdefault(month, []).append({
+                'id': pk,
+                'created_at': created_at.isoformat(),
+                'user_id': user_id,
+                'username': username,
+                'activity_type': activity_type,
+                'description': description,
+                'ip_address': ip_address,
+                'user_agent': user_agent or '',
+            })
+        for month, records in by_month.items():
+            _append_records(month, records)
+            moved[month] = moved.get(month, 0) + len(records)
+
+        last = rows[-1][1], rows[-1][0]
+        ActivityLog.objects.filter(id__in=[row[0] for row in rows]).delete()
+
+    return moved
+
+def read_archive(month):
+    """Arxiv yozuvlarini fayl tartibida ((created_at, id) o'sishi) oqim bilan o'qish
+
+    Qayta yozilgan bo'lak yozuvlari oldingilaridan katta emas - ular takror sifatida tashlab yuboriladi.
+    """
+    path = archive_path(month)
+    if not os.path.exists(path):
+        return
+    last = None
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            record = json.loads(line)
+            record['created_at'] = datetime.fromisoformat(record['created_at'])
+            key = (record['created_at'], record['id'])
+            if last is None or key > last:
+                last = key
+                yield record
+
+def archived_activities(month, activity_type='all', date_from=None, date_to=None, search=''):
+    """Arxivdan filtrlangan yozuvlar - ActivityLog obyektlari generatori (eskilari birinchi)
+
+    Foydalanuvchilar biriktirilmaydi - sahifa tanlangach attach_users ni chaqiring.
+    """
+    words = search.lower().split()
+    for record in read_archive(month):
+        if activity_type != 'all' and record['activity_type'] != activity_type:
+            continue
+        day = timezone.localtime(record['created_at']).date().isoformat()
+        if (date_from and day < date_from) or (date_to and day > date_to):
+            continue
+        if words:
+            text = f"{record['description']} {record['username'] or ''}".lower()
+            if not all(word in text for word in words):
+                continue
+        yield ActivityLog(
+            id=record['id'],
+            user_id=record['user_id'],
+            activity_type=record['activity_type'],
+            description=record['description'],
+            ip_address=record['ip_address'],
+            created_at=record['created_at'],
+        )
+
+def attach_users(activities):
+    """Foydalanuvchilarni bitta so'rov bilan biriktirish (o'chirilganlari None bo'lib qoladi)"""
+    users = User.objects.in_bulk({activity.user_id for activity in activities if activity.user_id})
+    for activity in activities:
+        activity.user = users.get(activity.user_id)
+    return activities
@@ -0,0 +1,355 @@
+# main/benchmarks.py
+import json
+import math
+import os
+import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .analytics import ABSENCE_BUCKETS, PERCENTILES, RATE_BINS, school_analytics
+from .models import Announcement, Attendance, Grade, Schedule, Student
+from .report_jobs import claim_report_jobs, enqueue_report_job, report_params, run_report_job
+
+# Namuna maktab hajmlari (seed_school parametrlari)
+BENCHMARK_SCALES = {
+    'small': {'classes': 3, 'students': 45, 'teachers': 10, 'days': 14},
+    'full': {'classes': 60, 'students': 2000, 'teachers': 150, 'days': 365},
+}
+
+# So'rovlar soni aniq bo'lishi uchun: kesh har safar bo'sh, faoliyat tarixi darhol yoziladi
+BENCHMARK_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'ACTIVITY_LOG_MODE': 'sync',
+}
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+
+# p95 vaqti baseline * TIME_TOLERANCE + TIME_SLACK_MS dan oshsa regressiya
+TIME_TOLERANCE = 1.5
+TIME_SLACK_MS = 5.0
+
+
+class Route:
+    """Benchmark qilinadigan manzil: rol, argumentlar va so'rov turi
+
+    args, params, data va json qiymatlari fixtures lug'atini oluvchi funksiya bo'lishi mumkin.
+    repeat=False - holatni o'zgartiradigan manzillar faqat bir marta chaqiriladi.
+    """
+
+    def __init__(self, name, role=None, args=None, params=None, data=None, json=None, repeat=True):
+        self.name = name
+        self.role = role
+        self.args = args
+        self.params = params
+        self.data = data
+        self.json = json
+        self.repeat = repeat
+
+    def resolve(self, value, fixtures):
+        return value(fixtures) if callable(value) else value
+
+    def send(self, client, fixtures):
+        url = reverse(self.name, urlconf='main.urls', args=self.resolve(self.args, fixtures))
+        if self.json is not None:
+            return client.post(url, json.dumps(self.resolve(self.json, fixtures)), content_type='application/json')
+        if self.data is not None:
+            return client.post(url, self.resolve(self.data, fixtures))
+        return client.get(url, self.resolve(self.params, fixtures))
+
+
+def _id(key):
+    return lambda fixtures: [fixtures[key].id]
+
+ROUTES = [
+    Route('home'),
+    Route('logout', 'student', repeat=False),
+    Route('clear_session', 'student', repeat=False),
+
+    Route('student_dashboard', 'student'),
+    Route('student_grades', 'student'),
+    Route('student_schedule', 'student'),
+    Route('student_attendance', 'student'),
+    Route('student_announcements', 'student'),
+    Route('student_library', 'student'),
+
+    Route('teacher_dashboard', 'teacher'),
+    Route('teacher_grades', 'teacher', params=lambda f: f['grades_params']),
+    Route('save_grades', 'teacher', json=lambda f: f['grades_payload']),
+    Route('teacher_attendance', 'teacher', params=lambda f: f['attendance_params']),
+    Route('save_attendance', 'teacher', json=lambda f: f['attendance_payload']),
+    Route('teacher_schedule', 'teacher'),
+    Route('teacher_announcements', 'teacher'),
+    Route('teacher_create_announcement', 'teacher'),
+
+    Route('admin_dashboard', 'admin'),
+    Route('admin_users', 'admin'),
+    Route('admin_add_user', 'admin'),
+    Route('admin_edit_user', 'admin', args=_id('student')),
+    Route('admin_delete_user', 'admin', args=_id('spare_user')),
+    Route('admin_toggle_active', 'admin', args=_id('spare_user'), repeat=False),
+    Route('admin_classes', 'admin'),
+    Route('admin_reports', 'admin'),
+    Route('admin_report_export', 'admin', params=lambda f: f['report_params']),
+    Route('admin_report_job_create', 'admin', data=lambda f: f['report_params']),
+    Route('admin_report_job_status', 'admin', args=_id('report_job')),
+    Route('admin_report_job_download', 'admin', args=_id('report_job')),
+    Route('admin_announcements', 'admin'),
+    Route('admin_create_announcement', 'admin'),
+    Route('admin_edit_announcement', 'admin', args=_id('announcement')),
+    Route('admin_delete_announcement', 'admin', args=_id('spare_announcement'), repeat=False),
+    Route('admin_delete_announcement_ajax', 'admin', args=_id('announcement')),  # GET - o'chirmaydi
+    Route('admin_activities', 'admin'),
+    Route('admin_add_class', 'admin'),
+    Route('admin_edit_class', 'admin', args=_id('school_class')),
+    Route('admin_delete_class', 'admin', args=_id('school_class')),  # GET - tasdiqlash sahifasi
+    Route('admin_add_subject', 'admin'),
+    Route('admin_edit_subject', 'admin', args=_id('subject')),
+    Route('admin_delete_subject', 'admin', args=_id('subject')),
+    Route('admin_schedule', 'admin'),
+    Route('admin_schedule_class', 'admin', args=_id('school_class')),
+    Route('admin_import_schedule', 'admin'),  # GET - jadval sahifasiga qaytaradi
+    Route('admin_add_schedule', 'admin'),
+    Route('admin_edit_schedule', 'admin', args=_id('lesson')),
+    Route('admin_delete_schedule', 'admin', args=_id('lesson')),
+]
+
+
+def benchmark_fixtures(school):
+    """seed_school natijasidan manzillar uchun foydalanuvchi va obyektlarni tanlash
+
+    Davomat bo'lishi kerak (seed_school days >= 1).
+    """
+    school_class = school['classes'][0]
+    day = school['school_days'][-1]
+    date_from = school['school_days'][max(0, len(school['school_days']) - 6)]
+    attendance = Attendance.objects.filter(
+        student__school_class=school_class, date=day, period=1
+    ).select_related('teacher__user', 'subject').first()
+    students = Student.objects.filter(school_class=school_class).order_by('id')
+
+    # Yuklab olish manzili uchun tayyor hisobot fayli
+    job = enqueue_report_job(report_params('attendance', 'csv', date_from, day, school_class.id), school['admin'])
+    if job.id in claim_report_jobs(1):
+        run_report_job(job.id)
+
+    return {
+        'admin': school['admin'],
+        'teacher': attendance.teacher.user,
+        'student': students[0].user,
+        'school_class': school_class,
+        'subject': attendance.subject,
+        'lesson': Schedule.objects.filter(school_class=school_class).order_by('id').first(),
+        'announcement': school['announcements'][0],
+        'report_job': job,
+        'spare_user': User.objects.create(username='benchmark_spare'),
+        'spare_announcement': Announcement.objects.create(
+            title='O\'chiriladigan e\'lon', content='-', author=school['admin'],
+        ),
+        'attendance_params': {
+            'class_id': school_class.id, 'subject_id': attendance.subject_id, 'period': 1, 'date': day.isoformat(),
+        },
+        'attendance_payload': {
+            'date': day.isoformat(),
+            'class_id': school_class.id,
+            'subject_id': attendance.subject_id,
+            'period': 1,
+            'attendance_data': [
+                {'student_id': student_id, 'status': 'present', 'comment': ''}
+                for student_id in students.values_list('id', flat=True)
+            ],
+        },
+        'grades_params': {'class_id': school_class.id, 'subject_id': attendance.subject_id},
+        'grades_payload': {
+            'class_id': school_class.id,
+            'subject_id': attendance.subject_id,
+            'marks': [
+                {'student_id': student_id, 'value': 5} for student_id in students.values_list('id', flat=True)
+            ],
+        },
+        'report_params': {
+            'report': 'attendance', 'format': 'csv',
+            'date_from': date_from.isoformat(), 'date_to': day.isoformat(),
+        },
+    }
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def _consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    response.close()
+
+def measure_route(client, route, fixtures, repeat=5):
+    """Bitta manzil: so'rovlar soni va SQL vaqti (sovuq keshda), p50/p95 javob vaqti"""
+    def login():
+        if route.role:
+            client.force_login(fixtures[route.role])
+        else:
+            client.logout()
+
+    cache.clear()
+    login()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = route.send(client, fixtures)
+        _consume(response)
+        timings = [time.perf_counter() - started]
+    # captured_queries keyingi so'rovlar tozalaydigan jurnaldan o'qiydi
+    captured = queries.captured_queries
+
+    for _ in range(repeat - 1 if route.repeat else 0):
+        login()
+        started = time.perf_counter()
+        _consume(route.send(client, fixtures))
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'status': response.status_code,
+        'queries': len(captured),
+        'sql_ms': round(sum(float(query['time']) for query in captured) * 1000, 2),
+        'p50_ms': round(_percentile(timings, 0.5) * 1000, 2),
+        'p95_ms': round(_percentile(timings, 0.95) * 1000, 2),
+    }
+
+def run_benchmarks(fixtures, repeat=5, routes=ROUTES):
+    """Barcha manzillarni o'lchash: {manzil nomi: natija}"""
+    client = Client()
+    return {route.name: measure_route(client, route, fixtures, repeat) for route in routes}
+
+def load_baseline(scale):
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as baseline:
+        return json.load(baseline).get(scale, {})
+
+def save_baseline(scale, results):
+    data = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as baseline:
+            data = json.load(baseline)
+    data[scale] = results
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as baseline:
+        json.dump(data, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
+
+def compare_with_baseline(results, baseline, check_timing=True):
+    """Baseline bilan solishtirish - regressiyalar ro'yxatini qaytaradi"""
+    problems = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            problems.append(f'{name}: baseline yo\'q')
+            continue
+        if result['status'] != expected['status']:
+            problems.append(f"{name}: status {expected['status']} -> {result['status']}")
+        if result['queries'] > expected['queries']:
+            problems.append(f"{name}: so'rovlar {expected['queries']} -> {result['queries']}")
+        if check_timing and result['p95_ms'] > expected['p95_ms'] * TIME_TOLERANCE + TIME_SLACK_MS:
+            problems.append(f"{name}: p95 {expected['p95_ms']} ms -> {result['p95_ms']} ms")
+    return problems
+
+def _interpolated(ordered, fraction):
+    position = fraction * (len(ordered) - 1)
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+def _grade_rows(groups):
+    rows = []
+    for name, values in groups.items():
+        values.sort()
+        row = {'name': name, 'count': len(values), 'mean': round(sum(values) / len(values), 2)}
+        for key, fraction in PERCENTILES.items():
+            row[key] = round(_interpolated(values, fraction), 2)
+        rows.append(row)
+    return sorted(rows, key=lambda row: row['name'])
+
+def naive_school_analytics(date_from, date_to):
+    """analytics.school_analytics ning ORM obyektlari ustida oddiy sikl bilan yozilgan nusxasi (solishtirish uchun)"""
+    attendance = Attendance.objects.filter(date__gte=date_from, date__lte=date_to).select_related('student')
+    totals = {}
+    present = {}
+    for record in attendance:
+        totals[record.student_id] = totals.get(record.student_id, 0) + 1
+        present[record.student_id] = present.get(record.student_id, 0) + (record.status == 'present')
+    rates = sorted(present[student] / totals[student] * 100 for student in totals)
+    histogram = [0] * (len(RATE_BINS) - 1)
+    for rate in rates:
+        for i in range(len(histogram)):
+            if rate < RATE_BINS[i + 1] or i == len(histogram) - 1:
+                histogram[i] += 1
+                break
+    labels = [f'<{RATE_BINS[1]}%'] + [f'{low}-{high}%' for low, high in zip(RATE_BINS[1:], RATE_BINS[2:])]
+
+    grades = Grade.objects.filter(
+        date__gte=date_from, date__lte=date_to, value__isnull=False
+    ).select_related('student__school_class', 'subject')
+    by_class = {}
+    by_subject = {}
+    by_student = {}
+    for grade in grades:
+        by_class.setdefault(grade.student.school_class.name, []).append(grade.value)
+        by_subject.setdefault(grade.subject.name, []).append(grade.value)
+        by_student.setdefault(grade.student_id, []).append(grade.value)
+
+    pairs = [
+        (totals[student] - present[student], sum(values) / len(values))
+        for student, values in sorted(by_student.items()) if student in totals
+    ]
+    correlation = None
+    if len(pairs) > 1:
+        mean_x = sum(x for x, _ in pairs) / len(pairs)
+        mean_y = sum(y for _, y in pairs) / len(pairs)
+        cov = sum((x - mean_x) * (y - mean_y) for x, y in pairs)
+        var_x = sum((x - mean_x) ** 2 for x, _ in pairs)
+        var_y = sum((y - mean_y) ** 2 for _, y in pairs)
+        if var_x > 0 and var_y > 0:
+            correlation = round(cov / math.sqrt(var_x * var_y), 2)
+    buckets = []
+    for i, (low, label) in enumerate(ABSENCE_BUCKETS):
+        high = ABSENCE_BUCKETS[i + 1][0] if i + 1 < len(ABSENCE_BUCKETS) else math.inf
+        averages = [y for x, y in pairs if low <= x < high]
+        buckets.append({
+            'label': label,
+            'students': len(averages),
+            'average': round(sum(averages) / len(averages), 2) if averages else None,
+        })
+
+    return {
+        'attendance': {
+            'students': len(rates),
+            'mean_rate': round(sum(rates) / len(rates), 1) if rates else 0,
+            'median_rate': round(_interpolated(rates, 0.5), 1) if rates else 0,
+            'histogram': [
+                {'label': label, 'count': count, 'percent': round(count / len(rates) * 100) if rates else 0}
+                for label, count in zip(labels, histogram)
+            ],
+        },
+        'class_grades': _grade_rows(by_class),
+        'subject_grades': _grade_rows(by_subject),
+        'absences': {'students': len(pairs), 'correlation': correlation, 'buckets': buckets},
+    }
+
+def benchmark_analytics(date_from, date_to, repeat=3):
+    """NumPy va ORM sikli versiyalarini o'lchash: {'numpy_ms', 'naive_ms', 'speedup', 'equal'}"""
+    timings = {}
+    results = {}
+    for name, build in (('numpy', school_analytics), ('naive', naive_school_analytics)):
+        best = math.inf
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[name] = build(date_from, date_to)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+    return {
+        'numpy_ms': round(timings['numpy'] * 1000, 2),
+        'naive_ms': round(timings['naive'] * 1000, 2),
+        'speedup': round(timings['naive'] / timings['numpy'], 1) if timings['numpy'] else None,
+        'equal': results['numpy'] == results['naive'],
+    }
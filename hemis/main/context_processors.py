@@ -1,16 +1,15 @@
-from .utils import get_user_announcements
+from .utils import get_cached_user_announcements
+from django.utils.functional import SimpleLazyObject
 from django.utils import timezone
 
 def announcements_processor(request):
-    """Barcha sahifalarga e'lonlarni qo'shish"""
-    if request.user.is_authenticated:
-        announcements = get_user_announcements(request.user)
-        recent_announcements = announcements[:5]  # So'nggi 5 ta e'lon
-    else:
-        announcements = []
-        recent_announcements = []
+    """Barcha sahifalarga e'lonlarni qo'shish (faqat shablon o'qisa hisoblanadi)"""
+    def user_announcements():
+        if request.user.is_authenticated:
+            return get_cached_user_announcements(request.user)
+        return []
     
     return {
-        'recent_announcements': recent_announcements,
-        'user_announcements': announcements
-    }
\ No newline at end of file
+        'recent_announcements': SimpleLazyObject(lambda: user_announcements()[:5]),  # So'nggi 5 ta e'lon
+        'user_announcements': SimpleLazyObject(user_announcements)
+    }
@@ -0,0 +1,102 @@
+# main/counters.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from .models import SchoolClass, Student, Subject, Teacher
+from .utils import bump_cache_version, get_cache_version
+
+# Umumiy sonlar keshda alohida kalitlarda saqlanadi. Kalit yo'q bo'lsa (kesh tozalangan, muddati o'tgan yoki
+# tranzaksiya yakunida versiya oshirilgan) qiymat bazadan qayta hisoblanadi: o'quvchilar soni Student jadvalini
+# sanamasdan SchoolClass.student_count ustunlari yig'indisidan olinadi.
+# Sinf va fan bo'yicha sonlar esa SchoolClass.student_count va Subject.teacher_count ustunlarida (F() bilan,
+# tranzaksiya ichida - bekor qilinsa ular ham qaytadi). Og'ishlar reconcile_counters buyrug'i bilan tuzatiladi.
+COUNTERS_VERSION_KEY = 'counters:version'
+COUNTERS_TIMEOUT = getattr(settings, 'COUNTERS_TIMEOUT', 24 * 3600)
+
+TOTALS = ('students', 'teachers', 'classes', 'subjects')
+
+
+def _key(name):
+    return f'counters:{get_cache_version(COUNTERS_VERSION_KEY)}:{name}'
+
+def _cached_counts(keys, load):
+    """{kalit: qiymat} - keshda yo'qlari load(yo'q nomlar) dan olinib keshga yoziladi"""
+    found = cache.get_many(keys.values())
+    counts = {name: found[key] for name, key in keys.items() if key in found}
+    missing = [name for name in keys if name not in counts]
+    if missing:
+        loaded = load(missing)
+        cache.set_many({keys[name]: loaded.get(name, 0) for name in missing}, COUNTERS_TIMEOUT)
+        counts.update({name: loaded.get(name, 0) for name in missing})
+    return counts
+
+def get_totals(*names):
+    """Umumiy sonlar: get_totals('students', 'teachers') -> {'students': ..., 'teachers': ...}"""
+    names = names or TOTALS
+    return _cached_counts({name: _key(name) for name in names}, count_totals)
+
+def count_totals(names):
+    """Umumiy sonlarni bazadan hisoblash - o'quvchilar va sinflar bitta so'rovda sinflar jadvalidan"""
+    totals = {}
+    if {'students', 'classes'} & set(names):
+        totals.update(SchoolClass.objects.aggregate(
+            students=Coalesce(models.Sum('student_count'), 0), classes=models.Count('id'),
+        ))
+    if 'teachers' in names:
+        totals['teachers'] = Teacher.objects.count()
+    if 'subjects' in names:
+        totals['subjects'] = Subject.objects.count()
+    return totals
+
+def adjust_class_size(class_id, delta):
+    """SchoolClass.student_count ni F() bilan atomik o'zgartirish"""
+    if class_id and delta:
+        SchoolClass.objects.filter(pk=class_id).update(student_count=models.F('student_count') + delta)
+
+def adjust_subject_teachers(subject_ids, delta):
+    """Subject.teacher_count ni F() bilan atomik o'zgartirish - bitta UPDATE"""
+    if subject_ids and delta:
+        Subject.objects.filter(pk__in=subject_ids).update(teacher_count=models.F('teacher_count') + delta)
+
+def _count_subquery(model, field):
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(**{field: models.OuterRef('pk')}).order_by().values(field).annotate(
+                count=models.Count('*')
+            ).values('count')
+        ),
+        0,
+    )
+
+def reconcile_counts(dry_run=False):
+    """student_count va teacher_count ustunlarini haqiqiy sonlar bilan solishtirib tuzatish
+
+    Qaytaradi: {'classes': tuzatilgan sinflar soni, 'subjects': tuzatilgan fanlar soni}
+    """
+    targets = {
+        'classes': (SchoolClass, 'student_count', _count_subquery(Student, 'school_class')),
+        'subjects': (Subject, 'teacher_count', _count_subquery(Teacher.subjects.through, 'subject')),
+    }
+    fixed = {}
+    for name, (model, field, actual) in targets.items():
+        drifted = model.objects.annotate(actual=actual).exclude(**{field: models.F('actual')})
+        if dry_run:
+            fixed[name] = drifted.count()
+        else:
+            fixed[name] = model.objects.filter(pk__in=drifted.values('pk')).update(**{field: actual})
+    if not dry_run:
+        invalidate_counters()
+    return fixed
+
+def invalidate_counters_on_commit():
+    """Yozuv qo'shilgan yoki o'chirilganda - tranzaksiya muvaffaqiyatli yakunlangach sonlarni qayta hisoblatish
+
+    Keshdagi qiymat incr bilan o'zgartirilmaydi: FileBasedCache da incr ishchilar orasida atomik emas,
+    bekor qilingan tranzaksiya esa keshdagi sonni noto'g'ri qoldirar edi.
+    """
+    transaction.on_commit(invalidate_counters)
+
+def invalidate_counters():
+    """Barcha hisoblagichlarni bazadan qayta hisoblatish (bulk_create kabi signalsiz yozuvlardan keyin)"""
+    bump_cache_version(COUNTERS_VERSION_KEY)
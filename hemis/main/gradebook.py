@@ -0,0 +1,234 @@
+# main/gradebook.py
+from itertools import islice
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+from .models import Grade, GradeSummary, Student
+from .utils import bump_cache_version, get_cache_version
+
+GRADE_VALUES = range(1, 6)
+RECENT_MARKS = 5  # O'quvchi sahifasida har bir fan uchun ko'rsatiladigan so'nggi baholar
+
+# Reytinglar keshi - har qanday baho yozilganda versiya oshadi
+GRADE_RANKING_VERSION_KEY = 'grade_ranking:version'
+GRADE_RANKING_TIMEOUT = getattr(settings, 'GRADE_RANKING_TIMEOUT', 3600)
+
+# (chegara, holat, CSS klassi) - o'rtacha ball bo'yicha
+GRADE_LEVELS = [
+    (4.5, "A'lo", 'grade-excellent'),
+    (3.5, 'Yaxshi', 'grade-good'),
+    (2.5, 'Qoniqarli', 'grade-satisfactory'),
+    (0, 'Qoniqarsiz', 'grade-poor'),
+]
+
+
+def _average(marks_sum, marks_count):
+    return round(marks_sum / marks_count, 2) if marks_count else 0.0
+
+def grade_level(average):
+    """O'rtacha ball uchun (holat, CSS klassi) - baho bo'lmasa 'Kutilmoqda'"""
+    if not average:
+        return 'Kutilmoqda', 'grade-pending'
+    for threshold, label, css_class in GRADE_LEVELS:
+        if average >= threshold:
+            return label, css_class
+
+def record_grades(subject_id, marks, class_id=None):
+    """Butun sinf baholarini bitta tranzaksiyada yozish
+
+    Baholar Grade.value ga yoziladi. Har bir o'quvchining fan bo'yicha yig'indisi (summa, soni va o'rtacha ball)
+    faqat GradeSummary da - eski baholarni o'qimasdan bitta UPDATE da F() bilan oshiriladi.
+    So'rovlar soni o'quvchilar soniga bog'liq emas.
+    Har bir qator uchun {'student_id', 'success', 'error'} natijasi qaytariladi.
+    """
+    requested_ids = set()
+    for item in marks:
+        try:
+            requested_ids.add(int(item.get('student_id')))
+        except (TypeError, ValueError):
+            pass
+    students = Student.objects.filter(id__in=requested_ids)
+    if class_id:
+        students = students.filter(school_class_id=class_id)
+    known_ids = set(students.values_list('id', flat=True))
+
+    results = []
+    accepted = []
+    for item in marks:
+        student_id = item.get('student_id')
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            results.append({'student_id': student_id, 'success': False, 'error': "Noto'g'ri o'quvchi ID"})
+            continue
+        try:
+            value = int(item.get('value'))
+        except (TypeError, ValueError):
+            value = None
+        if student_id not in known_ids:
+            results.append({'student_id': student_id, 'success': False, 'error': "O'quvchi topilmadi"})
+            continue
+        if value not in GRADE_VALUES:
+            results.append({'student_id': student_id, 'success': False, 'error': f"Noto'g'ri baho: {item.get('value')}"})
+            continue
+        accepted.append((student_id, value))
+        results.append({'student_id': student_id, 'success': True, 'error': None})
+
+    if not accepted:
+        return results
+
+    # O'quvchi bo'yicha shu so'rovdagi baholar summasi va soni
+    deltas = {}
+    for student_id, value in accepted:
+        marks_sum, marks_count = deltas.get(student_id, (0, 0))
+        deltas[student_id] = (marks_sum + value, marks_count + 1)
+
+    def per_student(index):
+        return models.Case(
+            *(models.When(student_id=student_id, then=delta[index]) for student_id, delta in deltas.items()),
+            default=0, output_field=models.IntegerField(),
+        )
+
+    new_sum = models.F('marks_sum') + per_student(0)
+    new_count = models.F('marks_count') + per_student(1)
+    with transaction.atomic():
+        # Yig'indi qatori yo'q bo'lsa yaratiladi (parallel so'rov yaratgan bo'lsa e'tiborsiz), keyin bitta
+        # UPDATE da F() bilan oshiriladi - eski qiymat Python ga o'qilmaydi, parallel yozuvlar yo'qolmaydi
+        GradeSummary.objects.bulk_create(
+            [GradeSummary(student_id=student_id, subject_id=subject_id) for student_id in deltas],
+            ignore_conflicts=True,
+        )
+        GradeSummary.objects.filter(subject_id=subject_id, student_id__in=deltas).update(
+            marks_sum=new_sum,
+            marks_count=new_count,
+            average_score=Round(Cast(new_sum, models.FloatField()) / new_count, 2),
+            updated_at=timezone.now(),
+        )
+        Grade.objects.bulk_create(
+            Grade(student_id=student_id, subject_id=subject_id, value=value) for student_id, value in accepted
+        )
+    invalidate_grade_rankings()
+    return results
+
+def refresh_grade_summary(student_id, subject_id):
+    """Bitta o'quvchi va fan yig'indisini Grade yozuvlaridan qayta hisoblash (admin tahriri uchun)"""
+    totals = Grade.objects.filter(
+        student_id=student_id, subject_id=subject_id, value__isnull=False
+    ).aggregate(marks_sum=models.Sum('value'), marks_count=models.Count('id'))
+    if totals['marks_count']:
+        GradeSummary.objects.update_or_create(
+            student_id=student_id, subject_id=subject_id,
+            defaults={**totals, 'average_score': _average(totals['marks_sum'], totals['marks_count'])},
+        )
+    else:
+        GradeSummary.objects.filter(student_id=student_id, subject_id=subject_id).delete()
+    invalidate_grade_rankings()
+
+def rebuild_grade_summary(batch_size=1000):
+    """Barcha yig'indilarni Grade jadvalidan qayta qurish - yaratilgan qatorlar sonini qaytaradi"""
+    rows = Grade.objects.filter(value__isnull=False).order_by().values('student', 'subject').annotate(
+        marks_sum=models.Sum('value'),
+        marks_count=models.Count('id'),
+    ).iterator(chunk_size=batch_size)
+    summaries = (
+        GradeSummary(
+            student_id=row['student'],
+            subject_id=row['subject'],
+            marks_sum=row['marks_sum'],
+            marks_count=row['marks_count'],
+            average_score=_average(row['marks_sum'], row['marks_count']),
+        )
+        for row in rows
+    )
+
+    created = 0
+    with transaction.atomic():
+        GradeSummary.objects.all().delete()
+        while batch := list(islice(summaries, batch_size)):
+            GradeSummary.objects.bulk_create(batch)
+            created += len(batch)
+    invalidate_grade_rankings()
+    return created
+
+def _ranked(rows):
+    """O'rtacha ball bo'yicha saralab o'rin berish (teng ballar bir xil o'rinda: 1, 2, 2, 4)"""
+    rows.sort(key=lambda row: (-row['average'], row['name']))
+    for position, row in enumerate(rows, start=1):
+        tied = position > 1 and row['average'] == rows[position - 2]['average']
+        row['rank'] = rows[position - 2]['rank'] if tied else position
+    return rows
+
+def compile_class_rankings(class_id):
+    """Sinf ichidagi reytinglar - yig'indi jadvalidan bitta so'rov bilan
+
+    Qaytaradi: {'overall': [...], 'subjects': {fan ID: [...]}}
+    Qatorlar: {'student_id', 'name', 'average', 'marks_count', 'rank'}.
+    Umumiy o'rtacha - fanlar o'rtacha ballarining o'rtachasi.
+    """
+    rows = GradeSummary.objects.filter(
+        student__school_class_id=class_id, marks_count__gt=0
+    ).values_list(
+        'student_id', 'subject_id', 'average_score', 'marks_count',
+        'student__user__first_name', 'student__user__last_name',
+    )
+    subjects = {}
+    students = {}
+    for student_id, subject_id, average, marks_count, first_name, last_name in rows:
+        name = f'{last_name} {first_name}'.strip()
+        subjects.setdefault(subject_id, []).append({
+            'student_id': student_id, 'name': name, 'average': average, 'marks_count': marks_count,
+        })
+        student = students.setdefault(student_id, {'name': name, 'averages': [], 'marks_count': 0})
+        student['averages'].append(average)
+        student['marks_count'] += marks_count
+
+    overall = [
+        {
+            'student_id': student_id,
+            'name': student['name'],
+            'average': round(sum(student['averages']) / len(student['averages']), 2),
+            'marks_count': student['marks_count'],
+        }
+        for student_id, student in students.items()
+    ]
+    return {
+        'overall': _ranked(overall),
+        'subjects': {subject_id: _ranked(subject_rows) for subject_id, subject_rows in subjects.items()},
+    }
+
+def compile_subject_ranking(subject_id):
+    """Fan bo'yicha sinflar reytingi: [{'class_id', 'name', 'average', 'marks_count', 'rank'}]"""
+    rows = GradeSummary.objects.filter(subject_id=subject_id, marks_count__gt=0).order_by().values(
+        'student__school_class_id', 'student__school_class__name',
+    ).annotate(marks_sum=models.Sum('marks_sum'), marks_count=models.Sum('marks_count'))
+    return _ranked([
+        {
+            'class_id': row['student__school_class_id'],
+            'name': row['student__school_class__name'],
+            'average': _average(row['marks_sum'], row['marks_count']),
+            'marks_count': row['marks_count'],
+        }
+        for row in rows
+    ])
+
+def _cached(name, build, *args):
+    key = f"grade_ranking:{get_cache_version(GRADE_RANKING_VERSION_KEY)}:{name}:{':'.join(map(str, args))}"
+    value = cache.get(key)
+    if value is None:
+        value = build(*args)
+        cache.set(key, value, GRADE_RANKING_TIMEOUT)
+    return value
+
+def get_class_rankings(class_id):
+    """Sinf reytinglari keshdan"""
+    return _cached('class', compile_class_rankings, class_id)
+
+def get_subject_ranking(subject_id):
+    """Fan bo'yicha sinflar reytingi keshdan"""
+    return _cached('subject', compile_subject_ranking, subject_id)
+
+def invalidate_grade_rankings():
+    """Barcha reytinglarni eskirgan deb belgilash"""
+    bump_cache_version(GRADE_RANKING_VERSION_KEY)
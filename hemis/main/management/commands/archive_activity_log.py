@@ -0,0 +1,23 @@
+# main/management/commands/archive_activity_log.py
+from django.core.management.base import BaseCommand, CommandError
+from main.archive import ACTIVITY_LOG_RETENTION_DAYS, archive_activities
+
+class Command(BaseCommand):
+    help = 'Eski faoliyat tarixini oylik gzip JSONL arxivlarga ko\'chirish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ACTIVITY_LOG_RETENTION_DAYS,
+                            help='Shu kundan eski yozuvlar arxivlanadi')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Bir bo\'lakdagi yozuvlar soni')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('--days manfiy, --chunk-size esa 1 dan kichik bo\'lmasligi kerak')
+        
+        moved = archive_activities(days=options['days'], chunk_size=options['chunk_size'])
+        
+        for month, count in sorted(moved.items()):
+            self.stdout.write(f'  {month}: {count} ta yozuv')
+        self.stdout.write(
+            self.style.SUCCESS(f'{sum(moved.values())} ta yozuv arxivga ko\'chirildi!')
+        )
@@ -0,0 +1,42 @@
+# main/management/commands/benchmark_analytics.py
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from main.benchmarks import BENCHMARK_SCALES, benchmark_analytics
+from main.seed import seed_school
+
+class Command(BaseCommand):
+    help = 'NumPy tahlil modulini ORM sikli bilan yozilgan versiyasi bilan namuna maktabda solishtirish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(BENCHMARK_SCALES), default='small', help='Namuna maktab hajmi')
+        parser.add_argument('--repeat', type=int, default=3, help='Har bir versiya necha marta ishga tushiriladi')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        params = BENCHMARK_SCALES[scale]
+        date_to = timezone.localdate()
+        date_from = date_to - timedelta(days=params['days'])
+
+        # Alohida test bazasida ishlaydi - asosiy baza o'zgarmaydi
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            seed_school(**params)
+            self.stdout.write(f'Namuna maktab ({scale}) {time.perf_counter() - started:.1f} soniyada yaratildi')
+            result = benchmark_analytics(date_from, date_to, repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"NumPy: {result['numpy_ms']} ms")
+        self.stdout.write(f"ORM sikli: {result['naive_ms']} ms")
+        self.stdout.write(f"Tezlashish: {result['speedup']}x")
+        if not result['equal']:
+            raise CommandError('Natijalar mos kelmadi!')
+        self.stdout.write(self.style.SUCCESS('Natijalar bir xil!'))
@@ -0,0 +1,55 @@
+# main/management/commands/benchmark_routes.py
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from main.benchmarks import (
+    BENCHMARK_SCALES, BENCHMARK_SETTINGS, benchmark_fixtures, compare_with_baseline,
+    load_baseline, run_benchmarks, save_baseline,
+)
+from main.seed import seed_school
+
+class Command(BaseCommand):
+    help = 'main.urls dagi barcha manzillarni namuna maktabda o\'lchab, baseline bilan solishtirish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(BENCHMARK_SCALES), default='small', help='Namuna maktab hajmi')
+        parser.add_argument('--repeat', type=int, default=5, help='Har bir manzil necha marta chaqiriladi')
+        parser.add_argument('--update-baseline', action='store_true', help='Natijalarni baseline sifatida saqlash')
+        parser.add_argument('--no-timing', action='store_true', help='Faqat so\'rovlar sonini solishtirish')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        
+        # Alohida test bazasida ishlaydi - asosiy baza o'zgarmaydi
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(MEDIA_ROOT=media_root, **BENCHMARK_SETTINGS):
+                started = time.perf_counter()
+                school = seed_school(**BENCHMARK_SCALES[scale])
+                self.stdout.write(f'Namuna maktab ({scale}) {time.perf_counter() - started:.1f} soniyada yaratildi')
+                results = run_benchmarks(benchmark_fixtures(school), repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        
+        self.stdout.write(f"{'Manzil':<34}{'Status':>7}{'SQL':>6}{'SQL ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<34}{result['status']:>7}{result['queries']:>6}"
+                f"{result['sql_ms']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+            )
+        
+        if options['update_baseline']:
+            save_baseline(scale, results)
+            self.stdout.write(self.style.SUCCESS(f'Baseline ({scale}) yangilandi!'))
+            return
+        
+        problems = compare_with_baseline(results, load_baseline(scale), check_timing=not options['no_timing'])
+        if problems:
+            raise CommandError('Regressiya topildi:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('Regressiya topilmadi!'))
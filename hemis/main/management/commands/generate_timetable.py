@@ -0,0 +1,45 @@
+# main/management/commands/generate_timetable.py
+from django.core.management.base import BaseCommand, CommandError
+from main.timetable_solver import (
+    DEFAULT_PERIODS_PER_DAY, DEFAULT_TIME_LIMIT, TimetableError, generate, load_problem, save_generated,
+)
+
+class Command(BaseCommand):
+    help = 'O\'quv rejasi, o\'qituvchi fanlari va xonalardan dars jadvalini avtomatik tuzish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periods-per-day', type=int, default=DEFAULT_PERIODS_PER_DAY, help='Kunlik darslar soni')
+        parser.add_argument('--rooms', default='', help='Xonalar vergul bilan (standart: joriy jadvaldagi xonalar)')
+        parser.add_argument('--from-schedule', action='store_true',
+                            help='O\'quv rejasi o\'rniga joriy jadvaldagi haftalik soatlardan foydalanish')
+        parser.add_argument('--workers', type=int, default=1, help='Parallel qayta urinish jarayonlari')
+        parser.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT, help='Soniyalarda')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--dry-run', action='store_true', help='Faqat tuzish, bazaga yozmaslik')
+
+    def handle(self, *args, **options):
+        rooms = [room.strip() for room in options['rooms'].split(',') if room.strip()]
+        problem = load_problem(options['periods_per_day'], rooms=rooms, from_schedule=options['from_schedule'])
+        if not problem['groups']:
+            raise CommandError('O\'quv rejasi bo\'sh - avval Curriculum yozuvlarini kiriting yoki --from-schedule')
+        if not problem['rooms']:
+            raise CommandError('Xonalar topilmadi - --rooms bilan kiriting')
+
+        try:
+            result = generate(
+                problem, seed=options['seed'], workers=options['workers'], time_limit=options['time_limit'],
+            )
+        except TimetableError as e:
+            for error in e.errors:
+                self.stderr.write(f'  {error}')
+            raise CommandError('Jadval tuzilmadi')
+
+        self.stdout.write(
+            f"{len(result['lessons'])} ta dars {result['seconds']} soniyada tuzildi "
+            f"({result['attempts']} ta urinish, {result['repairs']} ta ta'mirlash, seed={result['seed']})"
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Tekshiruv rejimi: bazaga yozilmadi'))
+            return
+        save_generated(result['lessons'])
+        self.stdout.write(self.style.SUCCESS('Jadval saqlandi!'))
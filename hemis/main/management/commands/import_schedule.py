@@ -0,0 +1,33 @@
+# main/management/commands/import_schedule.py
+import os
+from django.core.management.base import BaseCommand, CommandError
+from main.schedule_import import ScheduleImportError, import_schedule, read_schedule_file
+
+class Command(BaseCommand):
+    help = 'Dars jadvalini CSV yoki XLSX fayldan ommaviy yuklash (to\'qnashuvlar oldindan tekshiriladi)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV yoki XLSX fayl (ustunlar: sinf, fan, o\'qituvchi, kun, dars, xona, izoh)')
+        parser.add_argument('--replace', action='store_true', help='Mavjud jadvalni to\'liq almashtirish')
+        parser.add_argument('--dry-run', action='store_true', help='Faqat tekshirish, bazaga yozmaslik')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'Fayl topilmadi: {path}')
+
+        with open(path, 'rb') as source:
+            data = source.read()
+
+        try:
+            records = read_schedule_file(data, path)
+            created = import_schedule(records, replace=options['replace'], dry_run=options['dry_run'])
+        except ScheduleImportError as e:
+            for error in e.errors:
+                self.stderr.write(f'  {error}')
+            raise CommandError(f'Jadval yuklanmadi: {len(e.errors)} ta xato')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Tekshiruv o\'tdi: {created} ta dars yuklanishi mumkin'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{created} ta dars yuklandi!'))
@@ -0,0 +1,32 @@
+# main/management/commands/rebuild_attendance_summary.py
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from main.stats import rebuild_daily_summary
+
+class Command(BaseCommand):
+    help = 'Kunlik davomat yig\'indisini Attendance jadvalidan qayta qurish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Boshlanish sanasi (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Tugash sanasi (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_create partiyasi hajmi')
+
+    def handle(self, *args, **options):
+        date_from = self.parse_date(options['date_from'])
+        date_to = self.parse_date(options['date_to'])
+        if date_from and date_to and date_from > date_to:
+            raise CommandError('--from sanasi --to sanasidan keyin bo\'lmasligi kerak')
+        
+        created = rebuild_daily_summary(date_from, date_to, batch_size=options['batch_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'{created} ta kunlik yig\'indi qayta qurildi!')
+        )
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Noto\'g\'ri sana: {value}')
@@ -0,0 +1,13 @@
+# main/management/commands/rebuild_grade_summary.py
+from django.core.management.base import BaseCommand
+from main.gradebook import rebuild_grade_summary
+
+class Command(BaseCommand):
+    help = 'Baholar yig\'indisini (o\'rtacha ball va reytinglar) Grade jadvalidan qayta qurish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_create partiyasi hajmi')
+
+    def handle(self, *args, **options):
+        created = rebuild_grade_summary(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{created} ta baholar yig\'indisi qayta qurildi!'))
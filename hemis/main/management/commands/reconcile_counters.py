@@ -0,0 +1,16 @@
+# main/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand
+from main.counters import reconcile_counts
+
+class Command(BaseCommand):
+    help = 'SchoolClass.student_count va Subject.teacher_count ustunlarini haqiqiy sonlar bilan tuzatish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Faqat noto\'g\'ri qatorlar sonini ko\'rsatish')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counts(dry_run=options['dry_run'])
+        action = 'noto\'g\'ri' if options['dry_run'] else 'tuzatildi'
+        self.stdout.write(self.style.SUCCESS(
+            f"Sinflar: {fixed['classes']} ta {action}, fanlar: {fixed['subjects']} ta {action}"
+        ))
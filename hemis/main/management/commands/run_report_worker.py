@@ -0,0 +1,70 @@
+# main/management/commands/run_report_worker.py
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+# Bu modul spawn jarayonlarida django.setup() dan oldin import qilinadi,
+# shuning uchun modellar funksiyalar ichida import qilinadi.
+
+
+def _init_worker():
+    """Yangi jarayonda Django ni sozlash"""
+    import django
+    django.setup()
+
+def _run_job(job_id):
+    from main.report_jobs import run_report_job
+    return run_report_job(job_id)
+
+class Command(BaseCommand):
+    help = 'Navbatdagi hisobot vazifalarini jarayonlar hovuzida bajarish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Parallel jarayonlar soni')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Navbatni tekshirish oralig\'i (soniya)')
+        parser.add_argument('--stale-minutes', type=int, default=30, help='Shuncha daqiqadan beri bajarilayotgan vazifalar qayta navbatga qo\'yiladi')
+        parser.add_argument('--once', action='store_true', help='Navbat bo\'shagach to\'xtash')
+
+    def handle(self, *args, **options):
+        from main.report_jobs import claim_report_jobs, requeue_stale_report_jobs
+        
+        workers = options['workers']
+        requeued = requeue_stale_report_jobs(options['stale_minutes'])
+        if requeued:
+            self.stdout.write(f'{requeued} ta osilib qolgan vazifa qayta navbatga qo\'yildi')
+        
+        # Jarayonlar ulanishlarni meros qilib olmasligi uchun
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        running = {}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            while True:
+                for job_id in claim_report_jobs(workers - len(running)):
+                    running[pool.submit(_run_job, job_id)] = job_id
+                
+                if running:
+                    done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job_id = running.pop(future)
+                        self.report(job_id, future)
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        
+        self.stdout.write(self.style.SUCCESS('Hisobot navbati bo\'sh!'))
+
+    def report(self, job_id, future):
+        from main.models import ReportJob
+        
+        try:
+            status = future.result()
+        except Exception as e:
+            # Jarayon o'zi yiqilsa vazifani xatolik bilan belgilaymiz
+            ReportJob.objects.filter(id=job_id).update(status='failed', error=str(e))
+            status = 'failed'
+        
+        style = self.style.SUCCESS if status == 'done' else self.style.ERROR
+        self.stdout.write(style(f'Hisobot #{job_id}: {status}'))
@@ -1,21 +1,91 @@
 # main/management/commands/seed_data.py
-from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User
-from main.models import *
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# Bu modul spawn jarayonlarida django.setup() dan oldin import qilinadi,
+# shuning uchun modellar funksiyalar ichida import qilinadi.
+
+
+def _init_worker():
+    """Yangi jarayonda Django ni sozlash"""
+    import django
+    django.setup()
+
+def _seed_range(date_from, date_to, lessons_per_day, seed, batch_size):
+    from main.seed import seed_attendance
+    return seed_attendance(date_from, date_to, lessons_per_day, seed=seed, batch_size=batch_size)
+
+def _split(days, parts):
+    """O'quv kunlarini ketma-ket, o'zaro kesishmaydigan oraliqlarga bo'lish"""
+    size = -(-len(days) // parts)
+    return [(chunk[0], chunk[-1]) for chunk in (days[i:i + size] for i in range(0, len(days), size))]
 
 class Command(BaseCommand):
-    help = 'Test ma\'lumotlarni yaratish'
+    help = 'Test ma\'lumotlarni yaratish (maktab hajmi, tarix va zichlik parametrlari bilan)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=2, help='Sinflar soni')
+        parser.add_argument('--students', type=int, default=58, help='O\'quvchilar soni')
+        parser.add_argument('--teachers', type=int, default=6, help='O\'qituvchilar soni')
+        parser.add_argument('--years', type=float, default=0, help='Davomat tarixi (yil)')
+        parser.add_argument('--attendance-density', type=int, default=1,
+                            help='Kuniga davomat olinadigan darslar soni (1-5)')
+        parser.add_argument('--grade-density', type=int, default=1,
+                            help='Har bir o\'quvchiga har bir fandan baholar soni')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create partiyasi hajmi')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Davomatni parallel yozadigan jarayonlar soni (SQLite da doim 1)')
+        parser.add_argument('--seed', type=int, default=1, help='Tasodifiy sonlar urug\'i (takroriy natija uchun)')
 
     def handle(self, *args, **options):
-        # Sinflar yaratish
-        class_9a = SchoolClass.objects.create(name='9-"A" sinfi', student_count=30)
-        class_9b = SchoolClass.objects.create(name='9-"B" sinfi', student_count=28)
+        from main.seed import LESSONS_PER_DAY, school_days, seed_attendance, seed_school
+        from main.stats import rebuild_daily_summary
+        
+        if options['classes'] < 1 or options['teachers'] < 1 or options['students'] < 0:
+            raise CommandError('Kamida bitta sinf va bitta o\'qituvchi bo\'lishi kerak')
+        if not 1 <= options['attendance_density'] <= LESSONS_PER_DAY:
+            raise CommandError(f'--attendance-density 1 dan {LESSONS_PER_DAY} gacha bo\'lishi kerak')
+        
+        started = time.perf_counter()
+        school = seed_school(
+            classes=options['classes'],
+            students=options['students'],
+            teachers=options['teachers'],
+            grades_per_subject=options['grade_density'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f"{len(school['classes'])} ta sinf, {len(school['subjects'])} ta fan, "
+            f"{len(school['teachers'])} ta o'qituvchi, {len(school['students'])} ta o'quvchi yaratildi"
+        )
         
-        # Fanlar yaratish
-        math = Subject.objects.create(name='Matematika', teacher_count=4)
-        physics = Subject.objects.create(name='Fizika', teacher_count=2)
-        english = Subject.objects.create(name='Ingliz tili', teacher_count=5)
+        days = school_days(round(options['years'] * 365))
+        if days:
+            lessons, seed, batch_size = options['attendance_density'], options['seed'], options['batch_size']
+            workers = max(1, options['workers'])
+            if workers > 1 and connections['default'].vendor == 'sqlite':
+                # SQLite bitta yozuvchiga ruxsat beradi - parallel yozish qulflanib qoladi
+                self.stdout.write(self.style.WARNING('SQLite bazasida davomat bitta jarayonda yoziladi'))
+                workers = 1
+            ranges = _split(days, workers)
+            if len(ranges) == 1:
+                created = seed_attendance(days[0], days[-1], lessons, seed=seed, batch_size=batch_size)
+            else:
+                # Jarayonlar ulanishlarni meros qilib olmasligi uchun
+                connections.close_all()
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context, initializer=_init_worker) as pool:
+                    futures = [
+                        pool.submit(_seed_range, start, end, lessons, seed, batch_size) for start, end in ranges
+                    ]
+                    created = sum(future.result() for future in futures)
+            rebuild_daily_summary(days[0], days[-1], batch_size=options['batch_size'])
+            self.stdout.write(f'{created} ta davomat yozuvi {days[0]} - {days[-1]} oralig\'ida yaratildi')
         
         self.stdout.write(
-            self.style.SUCCESS('Test ma\'lumotlar muvaffaqiyatli yaratildi!')
-        )
\ No newline at end of file
+            self.style.SUCCESS(f'Test ma\'lumotlar {time.perf_counter() - started:.1f} soniyada muvaffaqiyatli yaratildi!')
+        )
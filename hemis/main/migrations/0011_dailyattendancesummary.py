@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_daily_summary(apps, schema_editor):
+    """Mavjud davomat yozuvlaridan kunlik yig'indini to'ldirish"""
+    Attendance = apps.get_model('main', 'Attendance')
+    DailyAttendanceSummary = apps.get_model('main', 'DailyAttendanceSummary')
+    rows = Attendance.objects.order_by().values(
+        'date', 'student__school_class', 'subject', 'teacher'
+    ).annotate(
+        present=models.Count('id', filter=models.Q(status='present')),
+        with_reason=models.Count('id', filter=models.Q(status='absent_with_reason')),
+        without_reason=models.Count('id', filter=models.Q(status='absent_without_reason')),
+    )
+    DailyAttendanceSummary.objects.bulk_create(
+        (
+            DailyAttendanceSummary(
+                date=row['date'],
+                school_class_id=row['student__school_class'],
+                subject_id=row['subject'],
+                teacher_id=row['teacher'],
+                present_count=row['present'],
+                absent_with_reason_count=row['with_reason'],
+                absent_without_reason_count=row['without_reason'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_alter_attendance_options_attendance_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_with_reason_count', models.PositiveIntegerField(default=0)),
+                ('absent_without_reason_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.schoolclass')),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='main.subject')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.teacher')),
+            ],
+            options={
+                'verbose_name': 'Kunlik davomat',
+                'verbose_name_plural': 'Kunlik davomat',
+                'ordering': ['date'],
+                'unique_together': {('date', 'school_class', 'subject', 'teacher')},
+            },
+        ),
+        migrations.RunPython(fill_daily_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_dailyattendancesummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(max_length=20)),
+                ('file_format', models.CharField(max_length=10)),
+                ('params', models.JSONField(default=dict)),
+                ('params_hash', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('running', 'Bajarilmoqda'), ('done', 'Tayyor'), ('failed', 'Xatolik')], db_index=True, default='pending', max_length=10)),
+                ('result_file', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Hisobot vazifasi',
+                'verbose_name_plural': 'Hisobot vazifalari',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_activitylog_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-created_at', '-id'], name='activitylog_created_id_idx'),
+        ),
+    ]
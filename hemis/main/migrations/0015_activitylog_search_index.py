@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    # rowid = main_activitylog.id
+    """CREATE VIRTUAL TABLE main_activitylog_fts USING fts5(
+        description, username, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    """INSERT INTO main_activitylog_fts(rowid, description, username)
+        SELECT a.id, a.description,
+               COALESCE(u.username || ' ' || u.first_name || ' ' || u.last_name, '')
+        FROM main_activitylog a LEFT JOIN auth_user u ON u.id = a.user_id""",
+    """CREATE TRIGGER main_activitylog_fts_insert AFTER INSERT ON main_activitylog BEGIN
+        INSERT INTO main_activitylog_fts(rowid, description, username)
+        VALUES (new.id, new.description, COALESCE(
+            (SELECT username || ' ' || first_name || ' ' || last_name FROM auth_user WHERE id = new.user_id), ''));
+    END""",
+    """CREATE TRIGGER main_activitylog_fts_update AFTER UPDATE OF description, user_id ON main_activitylog BEGIN
+        UPDATE main_activitylog_fts SET description = new.description, username = COALESCE(
+            (SELECT username || ' ' || first_name || ' ' || last_name FROM auth_user WHERE id = new.user_id), '')
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER main_activitylog_fts_delete AFTER DELETE ON main_activitylog BEGIN
+        DELETE FROM main_activitylog_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER main_activitylog_fts_user_update AFTER UPDATE OF username, first_name, last_name ON auth_user BEGIN
+        UPDATE main_activitylog_fts SET username = new.username || ' ' || new.first_name || ' ' || new.last_name
+        WHERE rowid IN (SELECT id FROM main_activitylog WHERE user_id = new.id);
+    END""",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS main_activitylog_fts_user_update',
+    'DROP TRIGGER IF EXISTS main_activitylog_fts_delete',
+    'DROP TRIGGER IF EXISTS main_activitylog_fts_update',
+    'DROP TRIGGER IF EXISTS main_activitylog_fts_insert',
+    'DROP TABLE IF EXISTS main_activitylog_fts',
+]
+
+
+def search_gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(SearchVector('description', config='simple'), name='activitylog_search_gin')
+
+
+def create_search_index(apps, schema_editor):
+    """Faoliyat tarixi uchun to'liq matnli qidiruv indeksini yaratish"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return  # FTS5 yo'q - qidiruv icontains bilan ishlaydi
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('main', 'ActivityLog'), search_gin_index())
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_BACKWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('main', 'ActivityLog'), search_gin_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_activitylog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:40
+
+import hashlib
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_user_agents(apps, schema_editor):
+    """Mavjud brauzer satrlarini lug'at jadvaliga ko'chirish"""
+    ActivityLog = apps.get_model('main', 'ActivityLog')
+    UserAgent = apps.get_model('main', 'UserAgent')
+    values = ActivityLog.objects.exclude(user_agent='').values_list('user_agent', flat=True).distinct()
+    for value in values.iterator():
+        agent = UserAgent.objects.create(
+            value_hash=hashlib.sha256(value.encode('utf-8')).hexdigest(), value=value
+        )
+        ActivityLog.objects.filter(user_agent=value).update(agent=agent)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_activitylog_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value_hash', models.CharField(max_length=64, unique=True)),
+                ('value', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Brauzer',
+                'verbose_name_plural': 'Brauzerlar',
+            },
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='activities', to='main.useragent'),
+        ),
+        migrations.RunPython(move_user_agents, migrations.RunPython.noop),
+        # RenameField SQLite'da jadvalni qayta quradi va FTS triggerlarini buzadi
+        migrations.RemoveField(
+            model_name='activitylog',
+            name='user_agent',
+        ),
+    ]
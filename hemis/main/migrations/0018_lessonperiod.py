@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:05
+
+import datetime
+from django.db import migrations, models
+
+
+def create_default_periods(apps, schema_editor):
+    """Avval kodda yozilgan dars vaqtlari (08:00 dan har soatda 45 daqiqa)"""
+    LessonPeriod = apps.get_model('main', 'LessonPeriod')
+    LessonPeriod.objects.bulk_create(
+        LessonPeriod(
+            number=number,
+            start_time=datetime.time(7 + number, 0),
+            end_time=datetime.time(7 + number, 45),
+        )
+        for number in range(1, 9)
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.CharField(blank=True, choices=[('monday', 'Dushanba'), ('tuesday', 'Seshanba'), ('wednesday', 'Chorshanba'), ('thursday', 'Payshanba'), ('friday', 'Juma'), ('saturday', 'Shanba')], default='', max_length=20, verbose_name='Hafta kuni')),
+                ('number', models.IntegerField(choices=[(1, '1-dars'), (2, '2-dars'), (3, '3-dars'), (4, '4-dars'), (5, '5-dars'), (6, '6-dars'), (7, '7-dars'), (8, '8-dars')], verbose_name='Dars raqami')),
+                ('start_time', models.TimeField(verbose_name='Boshlanishi')),
+                ('end_time', models.TimeField(verbose_name='Tugashi')),
+            ],
+            options={
+                'verbose_name': 'Dars vaqti',
+                'verbose_name_plural': "Qo'ng'iroqlar jadvali",
+                'ordering': ['day', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'number'), name='unique_lesson_period'), models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='lesson_period_end_after_start')],
+            },
+        ),
+        migrations.RunPython(create_default_periods, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_lessonperiod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Curriculum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekly_hours', models.PositiveSmallIntegerField(verbose_name='Haftalik soatlar')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='curriculum', to='main.schoolclass', verbose_name='Sinf')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.subject', verbose_name='Fan')),
+            ],
+            options={
+                'verbose_name': "O'quv rejasi",
+                'verbose_name_plural': "O'quv rejalari",
+                'constraints': [models.UniqueConstraint(fields=('school_class', 'subject'), name='unique_class_subject_hours')],
+            },
+        ),
+    ]
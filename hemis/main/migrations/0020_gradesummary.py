@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_grade_summary(apps, schema_editor):
+    """Mavjud baholardan (quarter_grade) yig'indini to'ldirish"""
+    Grade = apps.get_model('main', 'Grade')
+    GradeSummary = apps.get_model('main', 'GradeSummary')
+    rows = Grade.objects.filter(quarter_grade__isnull=False).order_by().values('student', 'subject').annotate(
+        marks_sum=models.Sum('quarter_grade'),
+        marks_count=models.Count('id'),
+    )
+    GradeSummary.objects.bulk_create(
+        (
+            GradeSummary(
+                student_id=row['student'],
+                subject_id=row['subject'],
+                marks_sum=row['marks_sum'],
+                marks_count=row['marks_count'],
+                average_score=round(row['marks_sum'] / row['marks_count'], 2),
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_curriculum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marks_sum', models.PositiveIntegerField(default=0)),
+                ('marks_count', models.PositiveIntegerField(default=0)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.subject')),
+            ],
+            options={
+                'verbose_name': "Baholar yig'indisi",
+                'verbose_name_plural': "Baholar yig'indisi",
+                'indexes': [models.Index(fields=['subject', '-average_score'], name='grade_summary_subject_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'subject'), name='unique_grade_summary')],
+            },
+        ),
+        migrations.RunPython(fill_grade_summary, migrations.RunPython.noop),
+    ]
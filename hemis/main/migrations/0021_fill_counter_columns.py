@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_counter_columns(apps, schema_editor):
+    """student_count va teacher_count ustunlarini mavjud yozuvlardan to'ldirish"""
+    SchoolClass = apps.get_model('main', 'SchoolClass')
+    Student = apps.get_model('main', 'Student')
+    Subject = apps.get_model('main', 'Subject')
+    Teacher = apps.get_model('main', 'Teacher')
+    SchoolClass.objects.update(student_count=Coalesce(models.Subquery(
+        Student.objects.filter(school_class=models.OuterRef('pk')).order_by().values('school_class').annotate(
+            count=models.Count('*')
+        ).values('count')
+    ), 0))
+    Subject.objects.update(teacher_count=Coalesce(models.Subquery(
+        Teacher.subjects.through.objects.filter(subject=models.OuterRef('pk')).order_by().values('subject').annotate(
+            count=models.Count('*')
+        ).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_gradesummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counter_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+def copy_marks(apps, schema_editor):
+    """0020 dan beri baholar quarter_grade da saqlangan va GradeSummary shundan yig'ilgan - value ga ko'chirish
+
+    quarter_grade o'zgartirilmaydi: unda haqiqiy chorak bahosi yoki jurnal bahosi ekanini ajratib bo'lmaydi.
+    """
+    Grade = apps.get_model('main', 'Grade')
+    Grade.objects.filter(quarter_grade__isnull=False).update(value=models.F('quarter_grade'))
+
+def restore_marks(apps, schema_editor):
+    Grade = apps.get_model('main', 'Grade')
+    Grade.objects.filter(quarter_grade__isnull=True).update(quarter_grade=models.F('value'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_fill_counter_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='grade',
+            name='value',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_marks, restore_marks),
+    ]
@@ -38,13 +38,56 @@ class Teacher(models.Model):
 class Grade(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    value = models.PositiveSmallIntegerField(null=True, blank=True)  # Joriy baho (1-5) - GradeSummary shundan yig'iladi
     quarter_grade = models.IntegerField(null=True, blank=True)
     yearly_grade = models.IntegerField(null=True, blank=True)
     average_score = models.FloatField(default=0.0)
     date = models.DateField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # O'quvchining fan bo'yicha baholari
+            models.Index(fields=['student', 'subject'], name='grade_student_subject_idx'),
+            # Hisobotlardagi sana oralig'i
+            models.Index(fields=['date'], name='grade_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student} - {self.subject}: {self.value}"
+    
+    def delete(self, *args, **kwargs):
+        # Yig'indi post_delete signalida emas, shu yerda yangilanadi - o'quvchi yoki fan o'chirilganda
+        # baholar tezkor kaskad bilan o'chadi, GradeSummary esa o'z FK kaskadi bilan
+        from .gradebook import refresh_grade_summary
+        result = super().delete(*args, **kwargs)
+        refresh_grade_summary(self.student_id, self.subject_id)
+        return result
+
+class GradeSummary(models.Model):
+    """O'quvchining fan bo'yicha baholari yig'indisi - har bir yangi bahoda oshiriladi
+
+    Grade yozuvlarini qayta o'qimasdan o'rtacha ball va reytinglar shu jadvaldan olinadi.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    marks_sum = models.PositiveIntegerField(default=0)
+    marks_count = models.PositiveIntegerField(default=0)
+    average_score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Baholar yig'indisi"
+        verbose_name_plural = "Baholar yig'indisi"
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'subject'], name='unique_grade_summary'),
+        ]
+        indexes = [
+            # Fan bo'yicha reyting
+            models.Index(fields=['subject', '-average_score'], name='grade_summary_subject_idx'),
+        ]
+    
     def __str__(self):
-        return f"{self.student} - {self.subject}: {self.quarter_grade}"
+        return f"{self.student} - {self.subject}: {self.average_score}"
 
 class Attendance(models.Model):
     ATTENDANCE_CHOICES = [
@@ -66,9 +109,48 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ['student', 'date', 'subject', 'period']
         ordering = ['date', 'student']
+        indexes = [
+            # O'qituvchining kunlik davomat varag'i
+            models.Index(fields=['teacher', 'date', 'subject', 'period'], name='attendance_teacher_day_idx'),
+            # Hisobot va kunlik yig'indini qayta hisoblash (sana oralig'i)
+            models.Index(fields=['date', 'subject'], name='attendance_date_subject_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.date} - {self.get_status_display()}"
+    
+    def delete(self, *args, **kwargs):
+        # Kunlik yig'indi post_delete signalida emas, shu yerda yangilanadi: Attendance uchun o'chirish
+        # signali o'quvchi yoki sinf o'chirilganda Django ning tezkor (fast) kaskad o'chirishini o'chirib qo'yadi
+        from .stats import refresh_summary_groups
+        groups = list(Attendance.objects.filter(pk=self.pk).values_list('date', 'student__school_class_id', 'subject_id'))
+        result = super().delete(*args, **kwargs)
+        refresh_summary_groups(groups)
+        return result
+
+class DailyAttendanceSummary(models.Model):
+    """Kunlik davomat yig'indisi - Attendance jadvalidan hisoblanadi"""
+    date = models.DateField()
+    school_class = models.ForeignKey(SchoolClass, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, null=True, blank=True)
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_with_reason_count = models.PositiveIntegerField(default=0)
+    absent_without_reason_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['date', 'school_class', 'subject', 'teacher']
+        ordering = ['date']
+        verbose_name = 'Kunlik davomat'
+        verbose_name_plural = 'Kunlik davomat'
+    
+    def __str__(self):
+        return f"{self.school_class} - {self.subject} - {self.date}"
+    
+    @property
+    def total_count(self):
+        return self.present_count + self.absent_with_reason_count + self.absent_without_reason_count
 
 class Announcement(models.Model):
     ANNOUNCEMENT_TYPES = [
@@ -107,6 +189,17 @@ class Announcement(models.Model):
         verbose_name = "E'lon"
         verbose_name_plural = "E'lonlar"
         ordering = ['-created_at']
+        indexes = [
+            # Admin ro'yxati (barcha e'lonlar, yangilari birinchi)
+            models.Index(fields=['-created_at'], name='announcement_created_idx'),
+            # Lentalar faqat faol e'lonlarni o'qiydi - qisman indekslar
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='announcement_active_idx'),
+            models.Index(
+                fields=['announcement_type', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='announcement_active_type_idx',
+            ),
+        ]
     
     def get_priority_class(self):
         """CSS classini olish"""
@@ -158,6 +251,35 @@ class Announcement(models.Model):
                 
         return False
 
+class ReportJob(models.Model):
+    """Fonda yaratiladigan hisobot vazifasi (run_report_worker bajaradi)"""
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('running', 'Bajarilmoqda'),
+        ('done', 'Tayyor'),
+        ('failed', 'Xatolik'),
+    ]
+    
+    report_type = models.CharField(max_length=20)
+    file_format = models.CharField(max_length=10)
+    params = models.JSONField(default=dict)
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    result_file = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Hisobot vazifasi'
+        verbose_name_plural = 'Hisobot vazifalari'
+    
+    def __str__(self):
+        return f"{self.report_type} ({self.file_format}) - {self.get_status_display()}"
+
 class Schedule(models.Model):
     DAY_CHOICES = [
         ('monday', 'Dushanba'),
@@ -204,6 +326,66 @@ class Schedule(models.Model):
             ),
         ]
 
+class Curriculum(models.Model):
+    """O'quv rejasi - sinfda fan bo'yicha haftalik dars soatlari (jadval generatori uchun)"""
+    school_class = models.ForeignKey('SchoolClass', on_delete=models.CASCADE, related_name='curriculum', verbose_name="Sinf")
+    subject = models.ForeignKey('Subject', on_delete=models.CASCADE, verbose_name="Fan")
+    weekly_hours = models.PositiveSmallIntegerField(verbose_name="Haftalik soatlar")
+    
+    class Meta:
+        verbose_name = "O'quv rejasi"
+        verbose_name_plural = "O'quv rejalari"
+        constraints = [
+            models.UniqueConstraint(fields=['school_class', 'subject'], name='unique_class_subject_hours'),
+        ]
+    
+    def __str__(self):
+        return f"{self.school_class.name} - {self.subject.name}: {self.weekly_hours} soat"
+
+class LessonPeriod(models.Model):
+    """Qo'ng'iroqlar jadvali - dars raqamining boshlanish va tugash vaqti
+
+    Kun bo'sh bo'lsa vaqt barcha kunlar uchun, aks holda faqat shu kun uchun amal qiladi.
+    """
+    day = models.CharField(
+        max_length=20, choices=Schedule.DAY_CHOICES, blank=True, default='', verbose_name="Hafta kuni"
+    )
+    number = models.IntegerField(choices=[(i, f"{i}-dars") for i in range(1, 9)], verbose_name="Dars raqami")
+    start_time = models.TimeField(verbose_name="Boshlanishi")
+    end_time = models.TimeField(verbose_name="Tugashi")
+    
+    class Meta:
+        verbose_name = "Dars vaqti"
+        verbose_name_plural = "Qo'ng'iroqlar jadvali"
+        ordering = ['day', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'number'], name='unique_lesson_period'),
+            models.CheckConstraint(condition=models.Q(end_time__gt=models.F('start_time')), name='lesson_period_end_after_start'),
+        ]
+    
+    @property
+    def time_slot(self):
+        return f"{self.start_time:%H:%M}-{self.end_time:%H:%M}"
+    
+    def __str__(self):
+        return f"{self.get_day_display() or 'Har kuni'} {self.number}-dars ({self.time_slot})"
+
+class UserAgent(models.Model):
+    """Brauzer satrlari lug'ati - har bir satr bir marta saqlanadi"""
+    value_hash = models.CharField(max_length=64, unique=True)
+    value = models.TextField()
+    
+    class Meta:
+        verbose_name = 'Brauzer'
+        verbose_name_plural = 'Brauzerlar'
+    
+    def __str__(self):
+        return self.value[:80]
+
+# Diqqat: SQLite da qidiruv indeksi (main_activitylog_fts) 0015 migratsiyasidagi triggerlar bilan yangilanadi.
+# Jadvalni qayta yaratadigan migratsiya (SQLite da ko'p AlterField/RemoveField shunday ishlaydi) triggerlarni
+# jimgina o'chirib yuboradi - bunday migratsiyada ularni 0015 dagi SQL bilan qayta yaratish kerak.
+# ActivitySearchTests.test_fts_triggers_exist buni tekshiradi.
 class ActivityLog(models.Model):
     ACTIVITY_TYPES = [
         ('user_login', 'Foydalanuvchi tizimga kirdi'),
@@ -229,11 +411,18 @@ class ActivityLog(models.Model):
     activity_type = models.CharField(max_length=50, choices=ACTIVITY_TYPES)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    agent = models.ForeignKey(UserAgent, on_delete=models.PROTECT, null=True, blank=True, related_name='activities')
+    # auto_now_add emas: buferlangan yozuvlar voqea vaqtini saqlashi kerak
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # admin_activities keyset sahifalashi uchun
+            models.Index(fields=['-created_at', '-id'], name='activitylog_created_id_idx'),
+            # Tur bo'yicha filtrlangan ro'yxat
+            models.Index(fields=['activity_type', '-created_at', '-id'], name='activitylog_type_created_idx'),
+        ]
         verbose_name = 'Faoliyat tarixi'
         verbose_name_plural = 'Faoliyat tarixi'
     
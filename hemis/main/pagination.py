@@ -0,0 +1,131 @@
+# main/pagination.py
+import base64
+from collections import deque
+from datetime import datetime
+from django.db import connection, models
+
+
+class KeysetPage:
+    """Kursor (keyset) sahifasi - OFFSET va COUNT(*) ishlatmaydi"""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(value, pk):
+    """(sana, id) juftligini URL uchun shaffof bo'lmagan satrga aylantirish"""
+    raw = f'{value.isoformat()}|{pk}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Kursorni (sana, id) ga qaytarish; buzilgan kursor uchun None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        value, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+def keyset_paginate(queryset, after=None, before=None, per_page=20, field='created_at'):
+    """(field, id) bo'yicha kamayish tartibida keyset sahifalash
+    
+    after - keyingi sahifa kursori, before - oldingi sahifa kursori.
+    Har qanday sahifa birinchi sahifa kabi indeks bo'yicha bitta so'rov bilan olinadi.
+    """
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+    
+    if before:
+        value, pk = before
+        rows = list(queryset.filter(
+            models.Q(**{f'{field}__gt': value}) | models.Q(**{field: value, 'pk__gt': pk})
+        ).order_by(field, 'pk')[:per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after:
+            value, pk = after
+            queryset = queryset.filter(
+                models.Q(**{f'{field}__lt': value}) | models.Q(**{field: value, 'pk__lt': pk})
+            )
+        rows = list(queryset.order_by(f'-{field}', '-pk')[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = after is not None
+    
+    return _keyset_page(rows, has_next, has_previous, field)
+
+def keyset_paginate_stream(items, after=None, before=None, per_page=20, field='created_at'):
+    """keyset_paginate ning (field, pk) o'sish tartibidagi oqim uchun varianti (masalan, arxiv fayli)
+
+    Xotirada ko'pi bilan per_page + 1 ta yozuv turadi; oqim kursordan keyin per_page + 1 ta
+    yozuv olingach (before) yoki kursorga yetganda (after) to'xtatiladi.
+    """
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+    key = lambda item: (getattr(item, field), item.pk)
+    
+    if before:
+        rows = []
+        for item in items:
+            if key(item) > before:
+                rows.append(item)
+                if len(rows) > per_page:
+                    break
+        has_previous = len(rows) > per_page
+        return _keyset_page(rows[:per_page][::-1], True, has_previous, field)
+    
+    # Kursordan oldingi eng yangi per_page + 1 ta yozuv
+    window = deque(maxlen=per_page + 1)
+    for item in items:
+        if after and key(item) >= after:
+            break
+        window.append(item)
+    rows = list(window)[::-1]
+    return _keyset_page(rows[:per_page], len(rows) > per_page, after is not None, field)
+
+def _keyset_page(rows, has_next, has_previous, field):
+    if not rows:
+        return KeysetPage([])
+    
+    first, last = rows[0], rows[-1]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(getattr(last, field), last.pk) if has_next else None,
+        prev_cursor=encode_cursor(getattr(first, field), first.pk) if has_previous else None,
+    )
+
+def estimate_count(model):
+    """Jadvaldagi qatorlar sonini COUNT(*) siz taxminiy hisoblash"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [model._meta.db_table])
+            row = cursor.fetchone()
+        return max(row[0], 0) if row else None
+    
+    # Boshqa bazalarda birlamchi kalit oralig'i (indeks bo'yicha ikki qidiruv)
+    bounds = model.objects.aggregate(low=models.Min('pk'), high=models.Max('pk'))
+    if bounds['low'] is None:
+        return 0
+    return bounds['high'] - bounds['low'] + 1
@@ -0,0 +1,142 @@
+# main/report_jobs.py
+import hashlib
+import json
+import os
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import ReportJob
+from .reports import REPORT_TYPES, build_report, stream_csv, stream_xlsx
+from .activity_log import activity_log_buffer
+from .utils import log_activity
+
+REPORTS_DIR = 'reports'
+REPORT_JOB_CACHE_SECONDS = getattr(settings, 'REPORT_JOB_CACHE_SECONDS', 3600)
+
+
+def _optional_id(value, label):
+    """Bo'sh qiymat - None, aks holda musbat butun son (noto'g'ri bo'lsa ValueError)"""
+    if value in (None, ''):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    if value <= 0:
+        raise ValueError(f"Noto'g'ri {label} ID!")
+    return value
+
+def report_params(report_type, file_format, date_from, date_to, class_id=None, subject_id=None):
+    """Hisobot parametrlarini kanonik ko'rinishga keltirish (ID lar noto'g'ri bo'lsa ValueError)"""
+    return {
+        'report': report_type,
+        'format': file_format,
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'class_id': _optional_id(class_id, 'sinf'),
+        'subject_id': _optional_id(subject_id, 'fan'),
+    }
+
+def report_params_hash(params):
+    """Bir xil parametrlar uchun bir xil kalit"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+def report_job_path(job):
+    """Natija faylining to'liq yo'li"""
+    return os.path.join(settings.MEDIA_ROOT, job.result_file)
+
+def enqueue_report_job(params, user=None):
+    """Hisobot vazifasini navbatga qo'yish yoki tayyor/bajarilayotganini qaytarish"""
+    params_hash = report_params_hash(params)
+    fresh_after = timezone.now() - timedelta(seconds=REPORT_JOB_CACHE_SECONDS)
+    
+    # Yaqinda tayyorlangan fayl bo'lsa darhol qaytaramiz
+    done_job = ReportJob.objects.filter(
+        params_hash=params_hash, status='done', finished_at__gte=fresh_after
+    ).order_by('-finished_at').first()
+    if done_job and os.path.exists(report_job_path(done_job)):
+        return done_job
+    
+    # Xuddi shu hisobot allaqachon navbatda yoki bajarilmoqda
+    active_job = ReportJob.objects.filter(
+        params_hash=params_hash, status__in=['pending', 'running']
+    ).order_by('created_at').first()
+    if active_job:
+        return active_job
+    
+    return ReportJob.objects.create(
+        report_type=params['report'],
+        file_format=params['format'],
+        params=params,
+        params_hash=params_hash,
+        requested_by=user,
+    )
+
+def claim_report_jobs(limit):
+    """Navbatdagi vazifalarni boshqa worker olib ketmasligi uchun band qilish"""
+    claimed = []
+    for job_id in ReportJob.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)[:limit]:
+        with transaction.atomic():
+            updated = ReportJob.objects.filter(id=job_id, status='pending').update(
+                status='running', started_at=timezone.now()
+            )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+def run_report_job(job_id):
+    """Bitta hisobot vazifasini bajarish (worker jarayonida ishlaydi)"""
+    job = ReportJob.objects.select_related('requested_by').get(pk=job_id)
+    params = job.params
+    temp_path = None
+    try:
+        date_from = date.fromisoformat(params['date_from'])
+        date_to = date.fromisoformat(params['date_to'])
+        headers, rows = build_report(
+            params['report'], date_from, date_to,
+            school_class=params.get('class_id'), subject=params.get('subject_id'),
+        )
+        
+        job.result_file = os.path.join(REPORTS_DIR, f"{job.params_hash}.{params['format']}")
+        path = report_job_path(job)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Avval vaqtinchalik faylga yozib, keyin atomar almashtiramiz
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        chunks = stream_xlsx(headers, rows) if params['format'] == 'xlsx' else stream_csv(headers, rows)
+        with open(temp_path, 'wb') as result:
+            for chunk in chunks:
+                result.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        os.replace(temp_path, path)
+        
+        job.status = 'done'
+        job.error = ''
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        # Yarim yozilgan vaqtinchalik fayl qolib ketmasin
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result_file', 'error', 'finished_at'])
+    
+    if job.status == 'done':
+        log_activity(
+            job.requested_by,
+            'report_generated',
+            f"Hisobot fonda yaratildi: {dict(REPORT_TYPES)[params['report']]} "
+            f"({params['date_from']} - {params['date_to']}, {params['format'].upper()})",
+            None
+        )
+        # Pool jarayonlari atexit ishlatmaydi, shuning uchun darhol yozamiz
+        activity_log_buffer.flush()
+    return job.status
+
+def requeue_stale_report_jobs(minutes):
+    """Uzoq vaqt 'bajarilmoqda' holatida qolgan vazifalarni qayta navbatga qo'yish"""
+    stale_before = timezone.now() - timedelta(minutes=minutes)
+    return ReportJob.objects.filter(status='running', started_at__lt=stale_before).update(
+        status='pending', started_at=None
+    )
@@ -0,0 +1,179 @@
+# main/reports.py
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from django.utils import timezone
+from .models import Attendance, Grade, ActivityLog
+
+# Server tomonidagi kursor bo'laklari hajmi
+REPORT_CHUNK_SIZE = 2000
+
+REPORT_TYPES = [
+    ('attendance', 'Davomat'),
+    ('grades', 'Baholar'),
+    ('activities', 'Faoliyat tarixi'),
+]
+
+REPORT_FORMATS = ['csv', 'xlsx']
+
+
+def attendance_report(date_from, date_to, school_class=None, subject=None):
+    """Davomat hisoboti qatorlari"""
+    statuses = dict(Attendance.ATTENDANCE_CHOICES)
+    attendance = Attendance.objects.filter(date__gte=date_from, date__lte=date_to)
+    if school_class:
+        attendance = attendance.filter(student__school_class=school_class)
+    if subject:
+        attendance = attendance.filter(subject=subject)
+
+    headers = ['Sana', 'Sinf', 'Familiya', 'Ism', 'Fan', 'Dars', 'Holat', 'Izoh']
+    rows = attendance.order_by('date', 'id').values_list(
+        'date', 'student__school_class__name', 'student__user__last_name',
+        'student__user__first_name', 'subject__name', 'period', 'status', 'comment',
+    ).iterator(chunk_size=REPORT_CHUNK_SIZE)
+
+    def generate():
+        for day, class_name, last_name, first_name, subject_name, period, status, comment in rows:
+            yield [day, class_name, last_name, first_name, subject_name, period, statuses.get(status, status), comment]
+    return headers, generate()
+
+def grades_report(date_from, date_to, school_class=None, subject=None):
+    """Baholar hisoboti qatorlari"""
+    grades = Grade.objects.filter(date__gte=date_from, date__lte=date_to)
+    if school_class:
+        grades = grades.filter(student__school_class=school_class)
+    if subject:
+        grades = grades.filter(subject=subject)
+
+    headers = ['Sana', 'Sinf', 'Familiya', 'Ism', 'Fan', 'Baho', 'Chorak bahosi', 'Yillik baho', "O'rtacha ball"]
+    rows = grades.order_by('date', 'id').values_list(
+        'date', 'student__school_class__name', 'student__user__last_name',
+        'student__user__first_name', 'subject__name', 'value', 'quarter_grade', 'yearly_grade', 'average_score',
+    ).iterator(chunk_size=REPORT_CHUNK_SIZE)
+    return headers, rows
+
+def activities_report(date_from, date_to, school_class=None, subject=None):
+    """Faoliyat tarixi hisoboti qatorlari (sinf va fan filtrlari qo'llanilmaydi)"""
+    activity_types = dict(ActivityLog.ACTIVITY_TYPES)
+    activities = ActivityLog.objects.filter(created_at__date__gte=date_from, created_at__date__lte=date_to)
+
+    headers = ['Vaqt', 'Foydalanuvchi', 'Turi', 'Tavsif', 'IP manzil']
+    rows = activities.order_by('created_at', 'id').values_list(
+        'created_at', 'user__username', 'activity_type', 'description', 'ip_address',
+    ).iterator(chunk_size=REPORT_CHUNK_SIZE)
+
+    def generate():
+        for created_at, username, activity_type, description, ip_address in rows:
+            yield [
+                timezone.localtime(created_at).strftime('%d.%m.%Y %H:%M:%S'),
+                username, activity_types.get(activity_type, activity_type), description, ip_address,
+            ]
+    return headers, generate()
+
+REPORT_BUILDERS = {
+    'attendance': attendance_report,
+    'grades': grades_report,
+    'activities': activities_report,
+}
+
+def build_report(report_type, date_from, date_to, school_class=None, subject=None):
+    """Hisobot sarlavhalari va qatorlar generatorini qaytarish"""
+    return REPORT_BUILDERS[report_type](date_from, date_to, school_class=school_class, subject=subject)
+
+
+class _Echo:
+    """csv.writer uchun yozilgan qatorni shunchaki qaytaruvchi bufer"""
+    def write(self, value):
+        return value
+
+def stream_csv(headers, rows):
+    """CSV qatorlarini birma-bir qaytarish (Excel uchun BOM bilan)"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+class _ZipStream:
+    """Seek qilinmaydigan oqim - zipfile yozgan baytlarni yig'ib beradi"""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Hisobot" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append('<c/>')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'.encode('utf-8')
+
+def stream_xlsx(headers, rows, flush_every=500):
+    """XLSX faylini xotirada to'liq yig'masdan bo'laklab qaytarish"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield stream.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(headers))
+            for index, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row))
+                if index % flush_every == 0:
+                    yield stream.pop()
+            sheet.write(b'</sheetData></worksheet>')
+    yield stream.pop()
@@ -0,0 +1,200 @@
+# main/schedule_import.py
+import csv
+import io
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+from .models import Schedule, SchoolClass, Subject, Teacher
+from .timetable import PERIOD_NUMBERS, write_timetable
+
+# Fayl ustunlari: ichki nom -> qabul qilinadigan sarlavhalar
+IMPORT_COLUMNS = {
+    'school_class': ['sinf', 'class'],
+    'subject': ['fan', 'subject'],
+    'teacher': ["o'qituvchi", 'oqituvchi', 'teacher'],
+    'day': ['kun', 'day'],
+    'period': ['dars', 'period'],
+    'room': ['xona', 'room'],
+    'notes': ['izoh', 'notes'],
+}
+REQUIRED_COLUMNS = ['school_class', 'subject', 'teacher', 'day', 'period', 'room']
+IMPORT_FORMATS = ['csv', 'xlsx']
+
+_XLSX_NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+_CELL_COLUMN = re.compile(r'^([A-Z]+)')
+
+
+class ScheduleImportError(Exception):
+    """Fayl o'qilmadi yoki jadvalda xatolar bor - barcha xatolar `errors` da"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} ta xato")
+        self.errors = errors
+
+
+def _column_index(reference):
+    index = 0
+    for letter in _CELL_COLUMN.match(reference).group(1):
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def read_xlsx_rows(data):
+    """XLSX birinchi varag'i qatorlari (shared va inline matnlar, sonlar)"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = set(archive.namelist())
+        shared = []
+        if 'xl/sharedStrings.xml' in names:
+            root = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+            shared = [''.join(node.itertext()) for node in root.iterfind('x:si', _XLSX_NS)]
+        sheet = 'xl/worksheets/sheet1.xml'
+        if sheet not in names:
+            sheet = min(name for name in names if name.startswith('xl/worksheets/sheet'))
+        root = ElementTree.fromstring(archive.read(sheet))
+
+    for row in root.iterfind('.//x:sheetData/x:row', _XLSX_NS):
+        values = []
+        for position, cell in enumerate(row.iterfind('x:c', _XLSX_NS)):
+            index = _column_index(cell.get('r')) if cell.get('r') else position
+            values.extend([''] * (index - len(values)))
+            kind = cell.get('t')
+            if kind == 'inlineStr':
+                value = ''.join(cell.find('x:is', _XLSX_NS).itertext())
+            else:
+                node = cell.find('x:v', _XLSX_NS)
+                value = node.text if node is not None and node.text else ''
+                if kind == 's' and value:
+                    value = shared[int(value)]
+                elif value.endswith('.0'):
+                    value = value[:-2]  # Excel butun sonlarni 3.0 ko'rinishida saqlaydi
+            values.append(value)
+        yield values
+
+def read_csv_rows(data):
+    """CSV qatorlari (UTF-8, BOM ixtiyoriy; ajratuvchi , yoki ;)"""
+    text = data.decode('utf-8-sig')
+    try:
+        dialect = csv.Sniffer().sniff(text[:2048], delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+    return csv.reader(io.StringIO(text), dialect)
+
+def read_schedule_file(data, filename):
+    """Yuklangan fayldan {ustun: qiymat, 'line': qator raqami} lug'atlari ro'yxati"""
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension not in IMPORT_FORMATS:
+        raise ScheduleImportError([f"Faqat CSV yoki XLSX fayl qabul qilinadi: {filename}"])
+    try:
+        rows = list(read_xlsx_rows(data) if extension == 'xlsx' else read_csv_rows(data))
+    except (zipfile.BadZipFile, ElementTree.ParseError, UnicodeDecodeError, KeyError, ValueError) as e:
+        raise ScheduleImportError([f"Faylni o'qib bo'lmadi: {e}"])
+    if not rows:
+        raise ScheduleImportError(["Fayl bo'sh"])
+
+    aliases = {alias: column for column, names in IMPORT_COLUMNS.items() for alias in names}
+    header = [aliases.get(title.strip().lower()) for title in rows[0]]
+    missing = [IMPORT_COLUMNS[column][0] for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ScheduleImportError([f"Ustunlar topilmadi: {', '.join(missing)}"])
+
+    records = []
+    for line, values in enumerate(rows[1:], start=2):
+        if not any(value.strip() for value in values):
+            continue
+        record = {
+            column: values[i].strip() if i < len(values) else ''
+            for i, column in enumerate(header) if column
+        }
+        record['line'] = line
+        records.append(record)
+    return records
+
+def build_lessons(records, replace=False):
+    """Yozuvlarni Schedule obyektlariga aylantirish va barcha to'qnashuvlarni topish
+
+    O'qituvchi, xona va sinf bandligi (kun, dars) kalitli xesh-lug'atlarda tekshiriladi.
+    replace=False bo'lsa mavjud darslar ham indekslarga oldindan qo'shiladi.
+    Qaytaradi: (darslar, xatolar)
+    """
+    classes = {name.lower(): pk for pk, name in SchoolClass.objects.values_list('id', 'name')}
+    subjects = {name.lower(): pk for pk, name in Subject.objects.values_list('id', 'name')}
+    teachers = {username.lower(): pk for pk, username in Teacher.objects.values_list('id', 'user__username')}
+    days = {}
+    for code, label in Schedule.DAY_CHOICES:
+        days[code] = days[label.lower()] = code
+
+    # (ob'ekt, kun, dars) -> qayerda band qilingan
+    busy = {'teacher': {}, 'room': {}, 'school_class': {}}
+    labels = {'teacher': "O'qituvchi", 'room': 'Xona', 'school_class': 'Sinf'}
+    if not replace:
+        existing = Schedule.objects.values_list('id', 'teacher_id', 'room', 'school_class_id', 'day', 'period')
+        for pk, teacher_id, room, class_id, day, period in existing:
+            source = f"mavjud dars #{pk}"
+            busy['teacher'][(teacher_id, day, period)] = source
+            busy['room'][(room.lower(), day, period)] = source
+            busy['school_class'][(class_id, day, period)] = source
+
+    lessons = []
+    errors = []
+    for index, record in enumerate(records, start=1):
+        line = record.get('line', index)
+        problems = []
+        class_id = classes.get(record['school_class'].lower())
+        subject_id = subjects.get(record['subject'].lower())
+        teacher_id = teachers.get(record['teacher'].lower())
+        day = days.get(record['day'].lower())
+        room = record['room']
+        if class_id is None:
+            problems.append(f"sinf topilmadi: {record['school_class']}")
+        if subject_id is None:
+            problems.append(f"fan topilmadi: {record['subject']}")
+        if teacher_id is None:
+            problems.append(f"o'qituvchi topilmadi: {record['teacher']}")
+        if day is None:
+            problems.append(f"noto'g'ri kun: {record['day']}")
+        try:
+            period = int(record['period'])
+        except ValueError:
+            period = None
+        if period not in PERIOD_NUMBERS:
+            problems.append(f"noto'g'ri dars raqami: {record['period']}")
+        if not room:
+            problems.append("xona ko'rsatilmagan")
+        if problems:
+            errors.append(f"{line}-qator: {'; '.join(problems)}")
+            continue
+
+        keys = {
+            'teacher': (teacher_id, day, period),
+            'room': (room.lower(), day, period),
+            'school_class': (class_id, day, period),
+        }
+        clashes = [
+            f"{labels[kind]} band ({busy[kind][key]})" for kind, key in keys.items() if key in busy[kind]
+        ]
+        if clashes:
+            errors.append(f"{line}-qator: {'; '.join(clashes)}")
+            continue
+        for kind, key in keys.items():
+            busy[kind][key] = f"{line}-qator"
+
+        lessons.append(Schedule(
+            school_class_id=class_id, subject_id=subject_id, teacher_id=teacher_id,
+            day=day, period=period, room=room, notes=record.get('notes') or None,
+        ))
+    return lessons, errors
+
+def import_schedule(records, replace=False, dry_run=False):
+    """Jadvalni bitta tranzaksiyada yozish - xato bo'lsa hech narsa yozilmaydi
+
+    replace=True - mavjud jadval to'liq almashtiriladi.
+    Xatolar bo'lsa ScheduleImportError ko'tariladi. Qaytaradi: yaratilgan darslar soni.
+    """
+    lessons, errors = build_lessons(records, replace=replace)
+    if errors:
+        raise ScheduleImportError(errors)
+    if dry_run:
+        return len(lessons)
+
+    write_timetable(lessons, replace=replace)
+    return len(lessons)
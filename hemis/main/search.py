@@ -0,0 +1,72 @@
+# main/search.py
+import re
+from django.contrib.auth.models import User
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+ACTIVITY_FTS_TABLE = 'main_activitylog_fts'
+# 0015 migratsiyasidagi triggerlar - FTS jadvalini main_activitylog va auth_user bilan sinxron saqlaydi
+ACTIVITY_FTS_TRIGGERS = (
+    'main_activitylog_fts_insert',
+    'main_activitylog_fts_update',
+    'main_activitylog_fts_delete',
+    'main_activitylog_fts_user_update',
+)
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_fts_tables = {}
+
+
+def _search_words(search):
+    return _WORD.findall(search)[:8]
+
+def activity_fts_available(using='default'):
+    """SQLite FTS5 jadvali mavjudligini bir marta tekshirish"""
+    if using not in _fts_tables:
+        connection = connections[using]
+        _fts_tables[using] = (
+            connection.vendor == 'sqlite'
+            and ACTIVITY_FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[using]
+
+def search_activities(queryset, search):
+    """Faoliyat tarixini tavsif va foydalanuvchi ismi bo'yicha qidirish
+    
+    Har bir so'z prefiks sifatida qidiriladi va barcha so'zlar mos kelishi kerak.
+    """
+    words = _search_words(search)
+    if not words:
+        return queryset
+    
+    using = queryset.db
+    vendor = connections[using].vendor
+    
+    if vendor == 'sqlite' and activity_fts_available(using):
+        match = ' '.join(f'"{word}"*' for word in words)
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {ACTIVITY_FTS_TABLE} WHERE {ACTIVITY_FTS_TABLE} MATCH %s', [match]
+        ))
+    
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config='simple')
+        # Foydalanuvchilar jadvali kichik - ism bo'yicha alohida qidiriladi
+        users = User.objects.all()
+        for word in words:
+            users = users.filter(
+                models.Q(username__icontains=word) |
+                models.Q(first_name__icontains=word) |
+                models.Q(last_name__icontains=word)
+            )
+        return queryset.annotate(
+            search_vector=SearchVector('description', config='simple')
+        ).filter(models.Q(search_vector=query) | models.Q(user__in=users.values('id')))
+    
+    # To'liq matnli indeks bo'lmasa - oddiy qidiruv
+    return queryset.filter(
+        models.Q(description__icontains=search) |
+        models.Q(user__username__icontains=search) |
+        models.Q(user__first_name__icontains=search) |
+        models.Q(user__last_name__icontains=search)
+    )
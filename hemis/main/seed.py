@@ -0,0 +1,227 @@
+# main/seed.py
+import random
+from datetime import timedelta
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from .models import (
+    SchoolClass, Subject, Student, Teacher, Schedule, Attendance, Grade, Announcement, ActivityLog,
+)
+from .counters import invalidate_counters
+from .gradebook import rebuild_grade_summary
+from .stats import rebuild_daily_summary
+from .utils import invalidate_announcement_feeds
+
+FIRST_NAMES = [
+    'Aziz', 'Bekzod', 'Dilshod', 'Jasur', 'Sardor', 'Otabek', 'Javlon', 'Sherzod', 'Akmal', 'Farrux',
+    'Malika', 'Dilnoza', 'Gulnora', 'Nilufar', 'Shahnoza', 'Zarina', 'Madina', 'Kamola', 'Sevara', 'Feruza',
+]
+LAST_NAMES = [
+    'Karimov', 'Rahimov', 'Toshmatov', 'Aliyev', 'Valiyev', 'Yusupov', 'Saidov', 'Nazarov', 'Qodirov', 'Ergashev',
+    'Abdullayev', 'Xolmatov', 'Ismoilov', 'Sobirov', 'Mirzayev', 'Tursunov', 'Jo\'rayev', 'Hasanov', 'Umarov', 'Olimov',
+]
+SUBJECT_NAMES = [
+    'Matematika', 'Fizika', 'Kimyo', 'Biologiya', 'Ona tili', 'Adabiyot', 'Ingliz tili', 'Tarix', 'Geografiya', 'Informatika',
+]
+CLASS_LETTERS = 'ABCDEF'
+LESSONS_PER_DAY = 5
+GRADE_MARKS = [3, 4, 4, 5, 5]  # Tasodifiy baholar taqsimoti
+DEFAULT_PASSWORD = 'parol123'
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _bulk_create(model, objects, batch_size):
+    created = []
+    for batch in _batches(objects, batch_size):
+        created.extend(model.objects.bulk_create(batch))
+    return created
+
+def _person(rng, username, password):
+    return User(
+        username=username,
+        first_name=rng.choice(FIRST_NAMES),
+        last_name=rng.choice(LAST_NAMES),
+        password=password,
+    )
+
+def _attendance_status(rng):
+    roll = rng.random()
+    if roll < 0.92:
+        return 'present'
+    return 'absent_with_reason' if roll < 0.97 else 'absent_without_reason'
+
+def school_days(days, end=None):
+    """`end` dan oldingi `days` kalendar kunidagi o'quv kunlari (yakshanbasiz)"""
+    end = end or timezone.localdate()
+    study_days = len(Schedule.DAY_CHOICES)
+    return [
+        end - timedelta(days=offset) for offset in range(days, 0, -1)
+        if (end - timedelta(days=offset)).weekday() < study_days
+    ]
+
+def seed_attendance(date_from, date_to, lessons_per_day=1, seed=1, batch_size=2000):
+    """Sana oralig'i uchun jadvaldagi birinchi `lessons_per_day` ta darsga davomat yaratish
+
+    Oraliqlar bir-biriga bog'liq emas - alohida jarayonlarda parallel chaqirish mumkin.
+    Mavjud yozuvlar o'tkazib yuboriladi. Qaytaradi: yuborilgan qatorlar soni.
+    """
+    rng = random.Random(f'{seed}:{date_from.isoformat()}')
+    days_of_week = [day for day, _ in Schedule.DAY_CHOICES]
+    lessons = {}
+    for class_id, day, period, subject_id, teacher_id in Schedule.objects.filter(
+        period__lte=lessons_per_day
+    ).values_list('school_class_id', 'day', 'period', 'subject_id', 'teacher_id'):
+        lessons.setdefault((class_id, day), []).append((period, subject_id, teacher_id))
+    students = list(Student.objects.order_by('id').values_list('id', 'school_class_id'))
+
+    def rows():
+        for current in school_days((date_to - date_from).days + 1, end=date_to + timedelta(days=1)):
+            weekday = days_of_week[current.weekday()]
+            for student_id, class_id in students:
+                for period, subject_id, teacher_id in lessons.get((class_id, weekday), ()):
+                    yield Attendance(
+                        student_id=student_id, teacher_id=teacher_id, subject_id=subject_id,
+                        date=current, period=period, status=_attendance_status(rng),
+                    )
+
+    # Har bir partiya bitta tranzaksiya: parallel jarayonlar yozish qulfini qisqa ushlaydi
+    created = 0
+    for batch in _batches(rows(), batch_size):
+        with transaction.atomic():
+            Attendance.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    return created
+
+@transaction.atomic
+def seed_school(classes=2, students=58, teachers=6, days=0, attendance_lessons=1, grades_per_subject=1,
+                seed=1, batch_size=2000):
+    """Namuna maktab ma'lumotlarini bulk_create bilan yaratish
+
+    Sinflar, fanlar, o'qituvchilar, o'quvchilar, haftalik jadval, oxirgi `days` kunlik
+    davomat, baholar, e'lonlar va faoliyat tarixi yaratiladi.
+    Natija seed bo'yicha takrorlanadi. Qaytaradi: asosiy yaratilgan obyektlar lug'ati.
+    """
+    rng = random.Random(seed)
+    password = make_password(DEFAULT_PASSWORD)  # Bir marta xeshlanadi
+
+    admin = User.objects.filter(username='admin').first()
+    if admin is None:
+        admin = User.objects.create(
+            username='admin', first_name='Admin', is_staff=True, is_superuser=True, password=password,
+        )
+
+    # Fanlar - har bir fanning kamida bitta o'qituvchisi bo'lishi uchun
+    subjects = Subject.objects.bulk_create(
+        Subject(name=name) for name in SUBJECT_NAMES[:max(1, min(len(SUBJECT_NAMES), teachers))]
+    )
+
+    room_offset = 100 + SchoolClass.objects.count()  # Qayta ishga tushirilganda xonalar to'qnashmasligi uchun
+    school_classes = SchoolClass.objects.bulk_create(
+        SchoolClass(name=f'{1 + i // len(CLASS_LETTERS)}-"{CLASS_LETTERS[i % len(CLASS_LETTERS)]}" sinfi')
+        for i in range(classes)
+    )
+
+    # O'qituvchilar
+    teacher_users = _bulk_create(User, (
+        _person(rng, f'teacher{seed}_{i + 1}', password) for i in range(teachers)
+    ), batch_size)
+    teacher_objects = Teacher.objects.bulk_create(Teacher(user=user) for user in teacher_users)
+    teachers_by_subject = {subject.id: [] for subject in subjects}
+    for i, teacher in enumerate(teacher_objects):
+        teachers_by_subject[subjects[i % len(subjects)].id].append(teacher)
+    Teacher.subjects.through.objects.bulk_create(
+        Teacher.subjects.through(teacher_id=teacher.id, subject_id=subject_id)
+        for subject_id, subject_teachers in teachers_by_subject.items()
+        for teacher in subject_teachers
+    )
+    for subject in subjects:
+        subject.teacher_count = len(teachers_by_subject[subject.id])
+    Subject.objects.bulk_update(subjects, ['teacher_count'])
+
+    # O'quvchilar sinflarga teng taqsimlanadi
+    student_users = _bulk_create(User, (
+        _person(rng, f'student{seed}_{i + 1}', password) for i in range(students)
+    ), batch_size)
+    student_objects = _bulk_create(Student, (
+        Student(user=user, school_class=school_classes[i % classes]) for i, user in enumerate(student_users)
+    ), batch_size)
+    for c, school_class in enumerate(school_classes):
+        school_class.student_count = len(range(c, students, classes))
+    SchoolClass.objects.bulk_update(school_classes, ['student_count'])
+
+    # Haftalik jadval: o'qituvchi bir vaqtda faqat bitta sinfda
+    lessons = []
+    busy = set()
+    for c, school_class in enumerate(school_classes):
+        for d, (day, _) in enumerate(Schedule.DAY_CHOICES):
+            for period in range(1, LESSONS_PER_DAY + 1):
+                subject = subjects[(c + d + period) % len(subjects)]
+                candidates = teachers_by_subject[subject.id]
+                for k in range(len(candidates)):
+                    teacher = candidates[(c // len(subjects) + k) % len(candidates)]
+                    if (teacher.id, day, period) not in busy:
+                        busy.add((teacher.id, day, period))
+                        lessons.append(Schedule(
+                            school_class=school_class, subject=subject, teacher=teacher,
+                            day=day, period=period, room=str(room_offset + c),
+                        ))
+                        break
+    _bulk_create(Schedule, lessons, batch_size)
+
+    # Davomat - har kuni birinchi `attendance_lessons` ta dars
+    days_list = school_days(days)
+    if days_list:
+        seed_attendance(days_list[0], days_list[-1], attendance_lessons, seed=seed, batch_size=batch_size)
+        rebuild_daily_summary(days_list[0], days_list[-1], batch_size=batch_size)
+
+    # Baholar - har bir o'quvchiga har bir fandan `grades_per_subject` ta (o'rtacha ball GradeSummary da)
+    def grade_rows():
+        for student in student_objects:
+            for subject in subjects:
+                for _ in range(grades_per_subject):
+                    yield Grade(student=student, subject=subject, value=rng.choice(GRADE_MARKS))
+    _bulk_create(Grade, grade_rows(), batch_size)
+    rebuild_grade_summary(batch_size=batch_size)
+
+    announcement_types = [code for code, _ in Announcement.ANNOUNCEMENT_TYPES]
+    announcements = Announcement.objects.bulk_create(
+        Announcement(
+            title=f'E\'lon #{i + 1}',
+            content='Namuna e\'lon matni',
+            author=admin,
+            announcement_type=announcement_types[i % len(announcement_types)],
+            target_class=school_classes[i % classes] if i % 3 == 0 else None,
+        )
+        for i in range(max(5, classes))
+    )
+    invalidate_announcement_feeds()  # bulk_create signal yubormaydi
+    invalidate_counters()
+
+    now = timezone.now()
+    activity_types = [code for code, _ in ActivityLog.ACTIVITY_TYPES]
+    _bulk_create(ActivityLog, (
+        ActivityLog(
+            user=rng.choice(teacher_users + [admin]),
+            activity_type=rng.choice(activity_types),
+            description='Namuna faoliyat',
+            ip_address='127.0.0.1',
+            created_at=now - timedelta(minutes=7 * i),
+        )
+        for i in range(max(50, days * 20))
+    ), batch_size)
+
+    return {
+        'admin': admin,
+        'classes': school_classes,
+        'subjects': subjects,
+        'teachers': teacher_objects,
+        'students': student_objects,
+        'announcements': announcements,
+        'school_days': days_list,
+    }
@@ -0,0 +1,206 @@
+# main/signals.py
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.contrib.auth.models import User
+from django.db.models import Max, Min
+from django.dispatch import receiver
+from .models import Announcement, Teacher, Attendance, Student, Schedule, SchoolClass, Subject, LessonPeriod, Grade
+from .counters import adjust_class_size, adjust_subject_teachers, invalidate_counters_on_commit
+from .gradebook import invalidate_grade_rankings, refresh_grade_summary
+from .stats import defer_class_summary_refresh, refresh_daily_summary
+from .timetable import invalidate_bell_schedule, invalidate_class_timetables
+from .utils import invalidate_announcement_feeds, invalidate_teacher_timetable, invalidate_teacher_timetables
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def announcement_changed(sender, **kwargs):
+    """E'lon o'zgarganda lentalar keshini yangilash"""
+    invalidate_announcement_feeds()
+
+@receiver(m2m_changed, sender=Teacher.subjects.through)
+def teacher_subjects_changed(sender, action, **kwargs):
+    """O'qituvchi fanlari o'zgarganda lentalar keshini yangilash"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_announcement_feeds()
+
+@receiver(pre_save, sender=Attendance)
+def attendance_before_save(sender, instance, **kwargs):
+    """Sana yoki fan o'zgarsa, eski kunlik yig'indini ham yangilash uchun eslab qolish"""
+    instance._previous_summary_key = None
+    if instance.pk:
+        instance._previous_summary_key = Attendance.objects.filter(
+            pk=instance.pk
+        ).values_list('date', 'subject_id').first()
+
+@receiver(post_save, sender=Attendance)
+def attendance_changed(sender, instance, **kwargs):
+    """Bitta davomat yozuvi saqlanganda kunlik yig'indini yangilash
+
+    O'chirish uchun signal yo'q (Attendance.delete ga qarang) - aks holda kaskad o'chirish qatorma-qator ketadi.
+    """
+    class_ids = list(
+        Student.objects.filter(pk=instance.student_id).values_list('school_class_id', flat=True)
+    )
+    refresh_daily_summary(instance.date, class_ids, instance.subject_id)
+    
+    previous = getattr(instance, '_previous_summary_key', None)
+    if previous and previous != (instance.date, instance.subject_id):
+        refresh_daily_summary(previous[0], class_ids, previous[1])
+
+@receiver(pre_save, sender=Grade)
+def grade_before_save(sender, instance, **kwargs):
+    """Baho boshqa o'quvchi yoki fanga o'tkazilsa, eski yig'indini ham yangilash uchun"""
+    instance._previous_summary_key = None
+    if instance.pk:
+        instance._previous_summary_key = Grade.objects.filter(
+            pk=instance.pk
+        ).values_list('student_id', 'subject_id').first()
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Subject)
+def grades_cascaded(sender, **kwargs):
+    """Baholar va yig'indilar kaskad bilan o'chgan - reytinglarni eskirgan deb belgilash"""
+    invalidate_grade_rankings()
+
+@receiver(post_save, sender=Grade)
+def grade_changed(sender, instance, **kwargs):
+    """Bitta baho (admin orqali) saqlanganda yig'indini qayta hisoblash - record_grades bulk_create ishlatadi
+
+    O'chirish uchun signal yo'q (Grade.delete ga qarang).
+    """
+    refresh_grade_summary(instance.student_id, instance.subject_id)
+    
+    previous = getattr(instance, '_previous_summary_key', None)
+    if previous and previous != (instance.student_id, instance.subject_id):
+        refresh_grade_summary(*previous)
+
+
+@receiver(pre_save, sender=Schedule)
+def schedule_before_save(sender, instance, **kwargs):
+    """Dars boshqa o'qituvchiga o'tkazilsa, eski o'qituvchi keshini ham tozalash uchun"""
+    instance._previous_teacher_id = None
+    if instance.pk:
+        instance._previous_teacher_id = Schedule.objects.filter(
+            pk=instance.pk
+        ).values_list('teacher_id', flat=True).first()
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def schedule_changed(sender, instance, **kwargs):
+    """Dars o'zgarganda o'qituvchi va sinflar jadvallari keshini tozalash"""
+    invalidate_teacher_timetable(instance.teacher_id)
+    invalidate_class_timetables()
+    
+    previous = getattr(instance, '_previous_teacher_id', None)
+    if previous and previous != instance.teacher_id:
+        invalidate_teacher_timetable(previous)
+
+@receiver(post_save, sender=SchoolClass)
+@receiver(post_save, sender=Subject)
+def timetable_names_changed(sender, created, **kwargs):
+    """Sinf yoki fan nomi jadval keshida saqlanadi"""
+    if not created:
+        invalidate_teacher_timetables()
+        invalidate_class_timetables()
+
+@receiver(post_save, sender=User)
+def teacher_name_changed(sender, instance, created, update_fields, **kwargs):
+    """O'qituvchi ismi sinflar jadvallari keshida saqlanadi"""
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    if Teacher.objects.filter(user=instance).exists():
+        invalidate_class_timetables()
+
+@receiver(post_save, sender=LessonPeriod)
+@receiver(post_delete, sender=LessonPeriod)
+def lesson_period_changed(sender, **kwargs):
+    """Dars vaqti o'zgarganda qo'ng'iroqlar jadvalini qayta yuklatish"""
+    invalidate_bell_schedule()
+
+
+@receiver(pre_save, sender=Student)
+def student_before_save(sender, instance, **kwargs):
+    """O'quvchi boshqa sinfga o'tkazilsa, eski sinf hisoblagichini kamaytirish uchun"""
+    instance._previous_class_id = None
+    if instance.pk:
+        instance._previous_class_id = Student.objects.filter(
+            pk=instance.pk
+        ).values_list('school_class_id', flat=True).first()
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    """O'quvchilar soni va sinf hajmi (SchoolClass.student_count)"""
+    if created:
+        invalidate_counters_on_commit()
+        adjust_class_size(instance.school_class_id, 1)
+        return
+    previous = getattr(instance, '_previous_class_id', None)
+    if previous and previous != instance.school_class_id:
+        adjust_class_size(previous, -1)
+        adjust_class_size(instance.school_class_id, 1)
+
+@receiver(pre_delete, sender=Student)
+def student_before_delete(sender, instance, **kwargs):
+    """Davomat signalsiz (tezkor) o'chadi - sinf yig'indisining qaysi oralig'i o'zgarishini eslab qolish"""
+    instance._attendance_range = Attendance.objects.filter(student=instance).aggregate(
+        first=Min('date'), last=Max('date')
+    )
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    invalidate_counters_on_commit()
+    adjust_class_size(instance.school_class_id, -1)
+    
+    dates = getattr(instance, '_attendance_range', None)
+    if dates and dates['first']:
+        defer_class_summary_refresh(instance.school_class_id, dates['first'], dates['last'])
+
+@receiver(post_save, sender=Teacher)
+def teacher_created(sender, instance, created, **kwargs):
+    if created:
+        invalidate_counters_on_commit()
+
+@receiver(pre_delete, sender=Teacher)
+def teacher_before_delete(sender, instance, **kwargs):
+    """Bog'lovchi jadval yozuvlari signalsiz o'chadi - fanlarni oldindan eslab qolish"""
+    instance._subject_ids = list(instance.subjects.values_list('id', flat=True))
+
+@receiver(post_delete, sender=Teacher)
+def teacher_deleted(sender, instance, **kwargs):
+    invalidate_counters_on_commit()
+    adjust_subject_teachers(getattr(instance, '_subject_ids', []), -1)
+
+@receiver(m2m_changed, sender=Teacher.subjects.through)
+def teacher_subjects_counted(sender, instance, action, reverse, pk_set, **kwargs):
+    """Subject.teacher_count (teacher.subjects va subject.teacher_set tomonlaridan)
+
+    post_add dagi pk_set faqat haqiqatan qo'shilganlar, remove da esa so'ralgan ID lar -
+    shuning uchun o'chiriladiganlar (hozir bog'langanlari) pre_remove da aniqlanadi.
+    """
+    if action in ('pre_clear', 'pre_remove'):
+        related = instance.teacher_set if reverse else instance.subjects
+        if action == 'pre_remove':
+            related = related.filter(id__in=pk_set)
+        instance._removed_ids = set(related.values_list('id', flat=True))
+        return
+    if action in ('post_clear', 'post_remove'):
+        pk_set, delta = getattr(instance, '_removed_ids', set()), -1
+    elif action == 'post_add':
+        delta = 1
+    else:
+        return
+    if reverse:
+        adjust_subject_teachers([instance.pk], delta * len(pk_set))
+    else:
+        adjust_subject_teachers(pk_set, delta)
+
+@receiver(post_save, sender=SchoolClass)
+@receiver(post_save, sender=Subject)
+def class_or_subject_created(sender, created, **kwargs):
+    if created:
+        invalidate_counters_on_commit()
+
+@receiver(post_delete, sender=SchoolClass)
+@receiver(post_delete, sender=Subject)
+def class_or_subject_deleted(sender, **kwargs):
+    invalidate_counters_on_commit()
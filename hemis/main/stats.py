@@ -0,0 +1,188 @@
+# main/stats.py
+import threading
+from datetime import timedelta
+from itertools import islice
+from django.db import models, transaction
+from .models import Attendance, DailyAttendanceSummary
+
+
+def _summary_rows(attendance):
+    """Attendance yozuvlarini (sana, sinf, fan, o'qituvchi) bo'yicha guruhlash"""
+    rows = attendance.order_by().values(
+        'date', 'student__school_class', 'subject', 'teacher'
+    ).annotate(
+        present=models.Count('id', filter=models.Q(status='present')),
+        with_reason=models.Count('id', filter=models.Q(status='absent_with_reason')),
+        without_reason=models.Count('id', filter=models.Q(status='absent_without_reason')),
+    )
+    for row in rows.iterator(chunk_size=2000):
+        yield DailyAttendanceSummary(
+            date=row['date'],
+            school_class_id=row['student__school_class'],
+            subject_id=row['subject'],
+            teacher_id=row['teacher'],
+            present_count=row['present'],
+            absent_with_reason_count=row['with_reason'],
+            absent_without_reason_count=row['without_reason'],
+        )
+
+def refresh_daily_summary(date, school_class_ids, subject_id):
+    """Saqlangan davomat sahifasi uchun kunlik yig'indini qayta hisoblash
+    
+    Faqat bitta kun, fan va tegishli sinflar qayta hisoblanadi.
+    """
+    school_class_ids = list(school_class_ids)
+    if not school_class_ids:
+        return
+    
+    attendance = Attendance.objects.filter(
+        date=date, subject_id=subject_id, student__school_class_id__in=school_class_ids
+    )
+    with transaction.atomic():
+        DailyAttendanceSummary.objects.filter(
+            date=date, subject_id=subject_id, school_class_id__in=school_class_ids
+        ).delete()
+        DailyAttendanceSummary.objects.bulk_create(_summary_rows(attendance))
+
+def refresh_class_summary(school_class_id, date_from, date_to):
+    """Bitta sinfning sana oralig'idagi kunlik yig'indisini qayta qurish (o'quvchi o'chirilganda)"""
+    with transaction.atomic():
+        DailyAttendanceSummary.objects.filter(
+            school_class_id=school_class_id, date__gte=date_from, date__lte=date_to
+        ).delete()
+        DailyAttendanceSummary.objects.bulk_create(_summary_rows(Attendance.objects.filter(
+            student__school_class_id=school_class_id, date__gte=date_from, date__lte=date_to
+        )), batch_size=1000)
+
+# O'chirilgan o'quvchilar sinflari: {sinf: (eng erta sana, eng kech sana)} - tranzaksiya oxirida bir marta qayta quriladi
+_pending = threading.local()
+
+def defer_class_summary_refresh(school_class_id, date_from, date_to):
+    """Sinf yig'indisini tranzaksiya yakunida qayta qurish uchun navbatga qo'yish (kaskad o'chirishda bir marta)"""
+    ranges = _pending.__dict__.setdefault('ranges', {})
+    if school_class_id in ranges:
+        first, last = ranges[school_class_id]
+        date_from, date_to = min(first, date_from), max(last, date_to)
+    ranges[school_class_id] = (date_from, date_to)
+    transaction.on_commit(flush_class_summary_refreshes)
+
+def flush_class_summary_refreshes():
+    """Navbatdagi sinflarni qayta qurish - keyingi chaqiruvlar bo'sh navbatni topadi"""
+    ranges, _pending.ranges = getattr(_pending, 'ranges', {}), {}
+    for school_class_id, (date_from, date_to) in ranges.items():
+        refresh_class_summary(school_class_id, date_from, date_to)
+
+def refresh_summary_groups(groups):
+    """(sana, sinf, fan) guruhlarini bittadan qayta hisoblash - admin orqali o'chirilgan yozuvlar uchun"""
+    for date, school_class_id, subject_id in set(groups):
+        refresh_daily_summary(date, [school_class_id], subject_id)
+
+def rebuild_daily_summary(date_from=None, date_to=None, batch_size=1000):
+    """Berilgan sana oralig'i uchun kunlik yig'indini to'liq qayta qurish
+    
+    Qayta qurilgan yig'indi qatorlari sonini qaytaradi.
+    """
+    attendance = Attendance.objects.all()
+    summaries = DailyAttendanceSummary.objects.all()
+    if date_from:
+        attendance = attendance.filter(date__gte=date_from)
+        summaries = summaries.filter(date__gte=date_from)
+    if date_to:
+        attendance = attendance.filter(date__lte=date_to)
+        summaries = summaries.filter(date__lte=date_to)
+    
+    created = 0
+    with transaction.atomic():
+        summaries.delete()
+        rows = _summary_rows(attendance)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            DailyAttendanceSummary.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+def month_bounds(current_date):
+    """Oyning birinchi kuni va keyingi oyning birinchi kunini qaytarish"""
+    start_of_month = current_date.replace(day=1)
+    next_month = (start_of_month + timedelta(days=32)).replace(day=1)
+    return start_of_month, next_month
+
+def get_attendance_stats(date_from, date_to, teacher=None, school_class=None, subject=None):
+    """Sana oralig'i bo'yicha davomat statistikasi (kunlik yig'indi jadvalidan)
+    
+    teacher, school_class va subject obyekt yoki ID bo'lishi mumkin.
+    """
+    summaries = DailyAttendanceSummary.objects.filter(date__gte=date_from, date__lte=date_to)
+    if teacher:
+        summaries = summaries.filter(teacher=teacher)
+    if school_class:
+        summaries = summaries.filter(school_class=school_class)
+    if subject:
+        summaries = summaries.filter(subject=subject)
+    
+    # Har bir dars (sana, sinf, fan) uchun bitta qator - bir nechta o'qituvchi yozuvlari qo'shiladi.
+    # Eng ko'p va o'rtacha qatnashuv shu darslar bo'yicha (sinf hajmi bilan solishtiriladigan son),
+    # jami qiymatlar esa bitta so'rovda shu guruhlar ustidan hisoblanadi.
+    lessons = summaries.order_by().values('date', 'school_class', 'subject').annotate(
+        lesson_present=models.Sum('present_count'),
+        lesson_with_reason=models.Sum('absent_with_reason_count'),
+        lesson_without_reason=models.Sum('absent_without_reason_count'),
+    )
+    totals = lessons.aggregate(
+        present=models.Sum('lesson_present'),
+        with_reason=models.Sum('lesson_with_reason'),
+        without_reason=models.Sum('lesson_without_reason'),
+        days=models.Count('date', distinct=True),
+        max_present=models.Max('lesson_present'),
+        average_present=models.Avg('lesson_present'),
+    )
+    
+    present = totals['present'] or 0
+    absent_with_reason = totals['with_reason'] or 0
+    absent_without_reason = totals['without_reason'] or 0
+    total = present + absent_with_reason + absent_without_reason
+    
+    return {
+        'attendance_rate': round(present / total * 100) if total else 0,
+        'absent_without_reason': absent_without_reason,
+        'absent_with_reason': absent_with_reason,
+        'total_days': totals['days'],
+        'max_attendance': totals['max_present'] or 0,
+        'average_attendance': round(totals['average_present'] or 0),
+    }
+
+def get_monthly_attendance_stats(current_date, teacher=None, school_class=None, subject=None):
+    """Oylik davomat statistikasi"""
+    start_of_month, next_month = month_bounds(current_date)
+    return get_attendance_stats(
+        start_of_month, next_month - timedelta(days=1),
+        teacher=teacher, school_class=school_class, subject=subject,
+    )
+
+def get_class_attendance_summary(date_from, date_to):
+    """Sinflar kesimida davomat (kunlik yig'indi jadvalidan)"""
+    rows = DailyAttendanceSummary.objects.filter(
+        date__gte=date_from, date__lte=date_to
+    ).order_by('school_class__name').values('school_class_id', 'school_class__name').annotate(
+        present=models.Sum('present_count'),
+        with_reason=models.Sum('absent_with_reason_count'),
+        without_reason=models.Sum('absent_without_reason_count'),
+        days=models.Count('date', distinct=True),
+    )
+    
+    summary = []
+    for row in rows:
+        total = row['present'] + row['with_reason'] + row['without_reason']
+        summary.append({
+            'class_id': row['school_class_id'],
+            'class_name': row['school_class__name'],
+            'present': row['present'],
+            'absent_with_reason': row['with_reason'],
+            'absent_without_reason': row['without_reason'],
+            'total_days': row['days'],
+            'attendance_rate': round(row['present'] / total * 100) if total else 0,
+        })
+    return summary
+
@@ -1,3 +1,1197 @@
-from django.test import TestCase
+import json
+import os
+import re
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    SchoolClass, Subject, Student, Teacher, Schedule, Announcement, Attendance, Grade,
+    DailyAttendanceSummary, ActivityLog, UserAgent, LessonPeriod, Curriculum, GradeSummary,
+)
+from . import timetable, urls
+from .activity_log import activity_log_buffer
+from .analytics import school_analytics
+from .counters import get_totals, reconcile_counts
+from .benchmarks import (
+    BENCHMARK_SCALES, BENCHMARK_SETTINGS, ROUTES, benchmark_fixtures, compare_with_baseline,
+    load_baseline, naive_school_analytics, run_benchmarks,
+)
+from .gradebook import get_class_rankings, grade_level, record_grades
+from .archive import _append_records, archived_activities
+from .pagination import encode_cursor, keyset_paginate, keyset_paginate_stream
+from .search import ACTIVITY_FTS_TRIGGERS, activity_fts_available, search_activities
+from .seed import seed_school
+from .report_jobs import claim_report_jobs, run_report_job
+from .reports import stream_csv, stream_xlsx
+from .schedule_import import ScheduleImportError, import_schedule, read_schedule_file
+from .stats import get_monthly_attendance_stats
+from .timetable import current_lesson, get_bell_schedule, get_class_timetable
+from .timetable_solver import TimetableError, generate
+from .utils import get_cached_user_announcements, get_teacher_timetable, log_activity
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnnouncementsProcessorQueryTests(TestCase):
+    """E'lonlar context processori so'rovlar sonini tekshirish"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='9-"A" sinfi')
+        cls.subject = Subject.objects.create(name='Matematika')
+
+        cls.admin = User.objects.create_user('admin', password='parol', is_staff=True)
+        cls.teacher_user = User.objects.create_user('teacher', password='parol')
+        cls.student_user = User.objects.create_user('student', password='parol')
+
+        cls.teacher = Teacher.objects.create(user=cls.teacher_user)
+        cls.teacher.subjects.add(cls.subject)
+        Student.objects.create(user=cls.student_user, school_class=cls.school_class)
+
+        cls.schedule = Schedule.objects.create(
+            school_class=cls.school_class, subject=cls.subject, teacher=cls.teacher,
+            day='saturday', period=8, room='101',
+        )
+        cls.announcement = Announcement.objects.create(
+            title="Umumiy e'lon", content='Matn', author=cls.admin,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def announcement_queries(self, user, url):
+        """Sahifani ochib, e'lonlar jadvaliga yuborilgan so'rovlarni qaytarish"""
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return [q['sql'] for q in queries.captured_queries if 'main_announcement' in q['sql']]
+
+    def test_pages_without_announcements_run_no_announcement_queries(self):
+        routes = [
+            (self.student_user, reverse('student_grades')),
+            (self.student_user, reverse('student_schedule')),
+            (self.student_user, reverse('student_attendance')),
+            (self.student_user, reverse('student_library')),
+            (self.teacher_user, reverse('teacher_grades')),
+            (self.teacher_user, reverse('teacher_attendance')),
+            (self.teacher_user, reverse('teacher_create_announcement')),
+            (self.admin, reverse('admin_users')),
+            (self.admin, reverse('admin_add_user')),
+            (self.admin, reverse('admin_edit_user', args=[self.student_user.id])),
+            (self.admin, reverse('admin_delete_user', args=[self.student_user.id])),
+            (self.admin, reverse('admin_reports')),
+            (self.admin, reverse('admin_activities')),
+            (self.admin, reverse('admin_classes')),
+            (self.admin, reverse('admin_add_class')),
+            (self.admin, reverse('admin_edit_class', args=[self.school_class.id])),
+            (self.admin, reverse('admin_delete_class', args=[self.school_class.id])),
+            (self.admin, reverse('admin_add_subject')),
+            (self.admin, reverse('admin_edit_subject', args=[self.subject.id])),
+            (self.admin, reverse('admin_delete_subject', args=[self.subject.id])),
+            (self.admin, reverse('admin_schedule')),
+            (self.admin, reverse('admin_schedule_class', args=[self.school_class.id])),
+            (self.admin, reverse('admin_add_schedule')),
+            (self.admin, reverse('admin_edit_schedule', args=[self.schedule.id])),
+            (self.admin, reverse('admin_delete_schedule', args=[self.schedule.id])),
+            (self.admin, reverse('admin_create_announcement')),
+        ]
+        for user, url in routes:
+            with self.subTest(url=url):
+                cache.clear()
+                self.assertEqual(self.announcement_queries(user, url), [])
+
+    def test_pages_with_announcements_query_once_then_use_cache(self):
+        routes = [
+            (self.student_user, reverse('student_dashboard')),
+            (self.student_user, reverse('student_announcements')),
+            (self.teacher_user, reverse('teacher_dashboard')),
+            (self.admin, reverse('admin_dashboard')),
+        ]
+        for user, url in routes:
+            with self.subTest(url=url):
+                cache.clear()
+                self.assertEqual(len(self.announcement_queries(user, url)), 1)
+                self.assertEqual(self.announcement_queries(user, url), [])
+
+    def test_feed_cache_holds_only_template_fields(self):
+        User.objects.filter(pk=self.admin.pk).update(first_name='Aziz', last_name='Karimov')
+        feed = get_cached_user_announcements(User.objects.get(pk=self.student_user.pk))
+        self.assertEqual(feed[0]['author'], {'get_full_name': 'Aziz Karimov'})
+        self.assertEqual(feed[0]['get_priority_display'], "O'rta")
+        self.assertNotIn('password', repr(feed))
+
+        self.client.force_login(self.student_user)
+        self.assertContains(self.client.get(reverse('student_dashboard')), 'Aziz Karimov')
+
+
+class SaveAttendanceTests(TestCase):
+    """Davomatni ommaviy saqlash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='9-"A" sinfi')
+        cls.subject = Subject.objects.create(name='Matematika')
+        cls.teacher_user = User.objects.create_user('teacher', password='parol')
+        cls.teacher = Teacher.objects.create(user=cls.teacher_user)
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create(username=f'student{i}'),
+                school_class=cls.school_class,
+            )
+            for i in range(35)
+        ]
+
+    def post_attendance(self, status, extra_rows=()):
+        rows = [{'student_id': s.id, 'status': status, 'comment': ''} for s in self.students]
+        payload = {
+            'date': '2025-11-10',
+            'class_id': self.school_class.id,
+            'subject_id': self.subject.id,
+            'period': 1,
+            'attendance_data': rows + list(extra_rows),
+        }
+        return self.client.post(
+            reverse('save_attendance'), data=json.dumps(payload), content_type='application/json'
+        ).json()
+
+    def test_whole_class_is_upserted_with_constant_queries(self):
+        self.client.force_login(self.teacher_user)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.post_attendance('present')
+        self.assertTrue(data['success'])
+        self.assertEqual(data['saved_count'], 35)
+        self.assertLess(len(queries.captured_queries), 20)
+
+        data = self.post_attendance('absent_with_reason', [{'student_id': 0, 'status': 'present'}])
+        self.assertEqual(data['saved_count'], 35)
+        self.assertEqual(data['results'][-1], {'student_id': 0, 'success': False, 'error': "O'quvchi topilmadi"})
+        self.assertEqual(Attendance.objects.count(), 35)
+        self.assertFalse(Attendance.objects.exclude(status='absent_with_reason').exists())
+
+    def test_attendance_sheet_query_count_does_not_grow_with_class(self):
+        self.client.force_login(self.teacher_user)
+        Schedule.objects.create(
+            school_class=self.school_class, subject=self.subject, teacher=self.teacher,
+            day='monday', period=1, room='101',
+        )
+        self.post_attendance('absent_without_reason')
+        get_bell_schedule()  # Qo'ng'iroqlar jadvali jarayon xotirasiga oldindan yuklanadi
+        url = reverse('teacher_attendance') + (
+            f'?date=2025-11-10&class_id={self.school_class.id}&subject_id={self.subject.id}&period=1'
+        )
+        with CaptureQueriesContext(connection) as full_class:
+            response = self.client.get(url)
+        self.assertEqual(response.context['absent_without_reason_count'], 35)
+        self.assertEqual(response.context['present_count'], 0)
+
+        Student.objects.filter(id__in=[s.id for s in self.students[5:]]).delete()
+        with CaptureQueriesContext(connection) as small_class:
+            self.client.get(url)
+        self.assertEqual(len(full_class.captured_queries), len(small_class.captured_queries))
+
+    def test_monthly_stats_follow_saved_attendance(self):
+        self.client.force_login(self.teacher_user)
+        self.post_attendance('present')
+        self.post_attendance('absent_with_reason', [])
+        rows = [{'student_id': s.id, 'status': 'present'} for s in self.students[:10]]
+        self.client.post(reverse('save_attendance'), data=json.dumps({
+            'date': '2025-11-11', 'subject_id': self.subject.id, 'period': 2, 'attendance_data': rows,
+        }), content_type='application/json')
+
+        stats = get_monthly_attendance_stats(date(2025, 11, 20), teacher=self.teacher)
+        self.assertEqual(stats, {
+            'attendance_rate': 22,
+            'absent_without_reason': 0,
+            'absent_with_reason': 35,
+            'total_days': 2,
+            'max_attendance': 10,
+            'average_attendance': 5,
+        })
+
+    def test_max_and_average_are_per_lesson(self):
+        self.client.force_login(self.teacher_user)
+        self.post_attendance('present')
+        physics = Subject.objects.create(name='Fizika')
+        rows = [{'student_id': s.id, 'status': 'present'} for s in self.students[:25]]
+        self.client.post(reverse('save_attendance'), data=json.dumps({
+            'date': '2025-11-10', 'subject_id': physics.id, 'period': 2, 'attendance_data': rows,
+        }), content_type='application/json')
+
+        # Bir kunda ikki dars: 35 va 25 o'quvchi - kunlik yig'indi (60) sinf hajmidan oshmasligi kerak
+        stats = get_monthly_attendance_stats(date(2025, 11, 20), school_class=self.school_class)
+        self.assertEqual((stats['total_days'], stats['max_attendance'], stats['average_attendance']), (1, 35, 30))
+
+    def test_single_saves_and_rebuild_keep_daily_summary_in_sync(self):
+        attendance = Attendance.objects.create(
+            student=self.students[0], teacher=self.teacher, subject=self.subject,
+            date=date(2025, 11, 10), period=1, status='absent_without_reason',
+        )
+        summary = DailyAttendanceSummary.objects.get()
+        self.assertEqual(summary.absent_without_reason_count, 1)
+
+        attendance.date = date(2025, 11, 11)
+        attendance.save()
+        self.assertEqual(list(DailyAttendanceSummary.objects.values_list('date', flat=True)), [date(2025, 11, 11)])
+
+        DailyAttendanceSummary.objects.all().delete()
+        call_command('rebuild_attendance_summary', '--from', '2025-11-01', stdout=StringIO())
+        self.assertEqual(DailyAttendanceSummary.objects.get().absent_without_reason_count, 1)
+
+        attendance.delete()
+        self.assertFalse(DailyAttendanceSummary.objects.exists())
+
+    def test_cascade_delete_refreshes_summary_once_per_class(self):
+        self.client.force_login(self.teacher_user)
+        self.post_attendance('absent_without_reason')
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                Student.objects.filter(id__in=[s.id for s in self.students[5:]]).delete()
+        # Davomat bitta DELETE bilan o'chadi, yig'indi qatorma-qator emas
+        attendance_deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "main_attendance"')]
+        self.assertEqual(len(attendance_deletes), 1)
+        self.assertFalse([q for q in queries.captured_queries if 'main_dailyattendancesummary' in q['sql']])
+        self.assertEqual(DailyAttendanceSummary.objects.get().absent_without_reason_count, 5)
+
+
+@override_settings(ACTIVITY_LOG_MODE='sync')
+class ReportExportTests(TestCase):
+    """Hisobotlarni oqim bilan yuklab olish"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='parol', is_staff=True)
+        school_class = SchoolClass.objects.create(name='9-"A" sinfi')
+        subject = Subject.objects.create(name='Matematika')
+        teacher = Teacher.objects.create(user=User.objects.create(username='teacher'))
+        student = Student.objects.create(
+            user=User.objects.create(username='student', first_name='Ali', last_name='Valiyev'),
+            school_class=school_class,
+        )
+        Attendance.objects.create(
+            student=student, teacher=teacher, subject=subject,
+            date=date(2025, 11, 10), period=1, status='absent_with_reason',
+        )
+
+    def export(self, file_format):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_report_export'), {
+            'report': 'attendance', 'format': file_format,
+            'date_from': '2025-11-01', 'date_to': '2025-11-30',
+        })
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_export_streams_rows_and_logs_activity(self):
+        content = self.export('csv').decode('utf-8-sig')
+        self.assertIn('2025-11-10,"9-""A"" sinfi",Valiyev,Ali,Matematika,1,Sababli,', content)
+        self.assertTrue(ActivityLog.objects.filter(activity_type='report_generated').exists())
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        with zipfile.ZipFile(BytesIO(self.export('xlsx'))) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('Valiyev', sheet)
+
+    def test_background_job_is_cached_by_parameters(self):
+        self.client.force_login(self.admin)
+        params = {'report': 'attendance', 'format': 'csv', 'date_from': '2025-11-01', 'date_to': '2025-11-30'}
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            job = self.client.post(reverse('admin_report_job_create'), params).json()
+            self.assertEqual(job['status'], 'pending')
+            self.assertEqual(claim_report_jobs(5), [job['job_id']])
+            self.assertEqual(run_report_job(job['job_id']), 'done')
+
+            status = self.client.get(job['status_url']).json()
+            self.assertEqual(status['status'], 'done')
+            repeat = self.client.post(reverse('admin_report_job_create'), params).json()
+            self.assertEqual(repeat['job_id'], job['job_id'])
+
+            response = self.client.get(status['download_url'])
+            self.assertIn('Valiyev', b''.join(response.streaming_content).decode('utf-8-sig'))
+
+    def test_export_rejects_bad_ids(self):
+        self.client.force_login(self.admin)
+        for params in ({'class_id': 'abc'}, {'subject_id': 'x'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('admin_report_export'), {'report': 'attendance', **params})
+                self.assertRedirects(response, reverse('admin_reports'), fetch_redirect_response=False)
+        self.assertFalse(ActivityLog.objects.filter(activity_type='report_generated').exists())
+
+    def test_bad_ids_and_failed_jobs(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin_report_job_create'), {'report': 'attendance', 'class_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+        def failing_stream(headers, rows):
+            yield 'sarlavha\n'
+            raise OSError("Disk to'ldi")
+
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            job = self.client.post(reverse('admin_report_job_create'), {'report': 'attendance'}).json()
+            claim_report_jobs(5)
+            with mock.patch('main.report_jobs.stream_csv', failing_stream):
+                self.assertEqual(run_report_job(job['job_id']), 'failed')
+            self.assertEqual(os.listdir(os.path.join(media_root, 'reports')), [])
+
+
+class ActivityPaginationTests(TestCase):
+    """Faoliyat tarixini kursor bo'yicha sahifalash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        moment = timezone.now()
+        # Bir xil vaqtli yozuvlar ham tartib bo'yicha yo'qolmasligi kerak
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=cls.admin, activity_type='user_login', description=f'{i}-kirish',
+                        created_at=moment - timedelta(minutes=i // 3))
+            for i in range(25)
+        ])
+
+    def test_cursor_pages_cover_every_row_once(self):
+        queryset = ActivityLog.objects.all()
+        expected = list(queryset.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        seen, page = [], keyset_paginate(queryset, per_page=10)
+        seen += [activity.id for activity in page]
+        while page.has_next:
+            page = keyset_paginate(queryset, after=page.next_cursor, per_page=10)
+            seen += [activity.id for activity in page]
+        self.assertEqual(seen, expected)
+
+        previous = keyset_paginate(queryset, before=page.prev_cursor, per_page=10)
+        self.assertEqual([activity.id for activity in previous], expected[10:20])
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(reverse('admin_activities'))
+        cursor = response.context['activities'].next_cursor
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(reverse('admin_activities'), {'after': cursor})
+        self.assertEqual(len(deep), len(first))
+        self.assertEqual(response.context['estimated_total'], 25)
+        self.assertTrue(response.context['activities'].has_previous)
+
+
+class ActivitySearchTests(TestCase):
+    """Faoliyat tarixini to'liq matnli indeks orqali qidirish"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.teacher = User.objects.create(username='alisher', first_name='Alisher', last_name='Navoiy')
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=cls.admin, activity_type='class_created', description='9-"A" sinfi yaratildi'),
+            ActivityLog(user=cls.teacher, activity_type='user_login', description='Tizimga kirdi'),
+            ActivityLog(user=None, activity_type='report_generated', description='Davomat hisoboti yaratildi'),
+        ])
+
+    def search(self, text):
+        return set(search_activities(ActivityLog.objects.all(), text).values_list('description', flat=True))
+
+    def test_search_matches_description_and_user_prefixes(self):
+        self.assertEqual(self.search('yarat'), {'9-"A" sinfi yaratildi', 'Davomat hisoboti yaratildi'})
+        self.assertEqual(self.search('davomat yarat'), {'Davomat hisoboti yaratildi'})
+        self.assertEqual(self.search('navo'), {'Tizimga kirdi'})
+        self.assertEqual(self.search('"*'), set(ActivityLog.objects.values_list('description', flat=True)))
+
+    def test_index_follows_updates_and_deletes(self):
+        self.teacher.last_name = 'Qodiriy'
+        self.teacher.save()
+        self.assertEqual(self.search('qodir'), {'Tizimga kirdi'})
+        ActivityLog.objects.filter(user=self.teacher).delete()
+        self.assertEqual(self.search('qodir'), set())
+
+    def test_fts_triggers_exist(self):
+        if not activity_fts_available():
+            self.skipTest("SQLite FTS5 mavjud emas")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            triggers = {name for name, in cursor.fetchall()}
+        # Jadval qayta yaratilganda (migratsiyada) triggerlar yo'qoladi
+        self.assertEqual(set(ACTIVITY_FTS_TRIGGERS) - triggers, set())
+
+    def test_admin_activities_search_uses_index(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_activities'), {'search': 'hisob'})
+        self.assertEqual([a.description for a in response.context['activities']], ['Davomat hisoboti yaratildi'])
+
+
+@override_settings(ACTIVITY_LOG_MODE='sync')
+class ActivityArchiveTests(TestCase):
+    """Eski faoliyat yozuvlarini arxivga ko'chirish"""
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_login(self.admin)
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.enterContext(self.settings(ACTIVITY_ARCHIVE_DIR=archive_dir.name))
+
+    def test_user_agents_are_stored_once(self):
+        for _ in range(3):
+            self.client.get(reverse('admin_report_export'), {'report': 'grades', 'format': 'csv'}, HTTP_USER_AGENT='Mozilla/5.0')
+        self.assertEqual(UserAgent.objects.count(), 1)
+        self.assertEqual(ActivityLog.objects.filter(agent__value='Mozilla/5.0').count(), 3)
+
+    def test_old_rows_move_to_monthly_archives_and_stay_queryable(self):
+        old = timezone.now() - timedelta(days=400)
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(user=self.admin, activity_type='user_login', description=f'{i}-kirish', created_at=old)
+             for i in range(5)]
+            + [ActivityLog(user=self.admin, activity_type='user_logout', description='Yangi chiqish')]
+        )
+        call_command('archive_activity_log', days=180, chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(list(ActivityLog.objects.values_list('description', flat=True)), ['Yangi chiqish'])
+        month = timezone.localtime(old).strftime('%Y-%m')
+        response = self.client.get(reverse('admin_activities'), {'archive': month, 'search': '3-kir'})
+        self.assertEqual([a.description for a in response.context['activities']], ['3-kirish'])
+        self.assertEqual(response.context['activities'].object_list[0].user, self.admin)
+
+    def test_archive_pages_are_streamed(self):
+        old = (timezone.now() - timedelta(days=400)).replace(day=10)
+        ActivityLog.objects.bulk_create(
+            ActivityLog(user=self.admin, activity_type='user_login', description=f'{i}-kirish',
+                        created_at=old + timedelta(minutes=i))
+            for i in range(45)
+        )
+        call_command('archive_activity_log', days=180, chunk_size=10, stdout=StringIO())
+        month = timezone.localtime(old).strftime('%Y-%m')
+        # To'xtab qolgan ko'chirishdan qolgan takroriy bo'lak
+        records = [{'id': a.id, 'created_at': a.created_at.isoformat(), 'user_id': self.admin.id, 'username': 'admin',
+                    'activity_type': a.activity_type, 'description': a.description, 'ip_address': None, 'user_agent': ''}
+                   for a in list(archived_activities(month))[:10]]
+        _append_records(month, records)
+
+        pages, params = [], {'archive': month}
+        while True:
+            page = self.client.get(reverse('admin_activities'), params).context['activities']
+            pages.append([a.description for a in page])
+            if not page.has_next:
+                break
+            params = {'archive': month, 'after': page.next_cursor}
+        self.assertEqual([len(p) for p in pages], [20, 20, 5])
+        self.assertEqual(sum(pages, []), [f'{i}-kirish' for i in reversed(range(45))])
+
+        previous = self.client.get(reverse('admin_activities'), {'archive': month, 'before': page.prev_cursor})
+        self.assertEqual([a.description for a in previous.context['activities']], pages[1])
+
+        # Kursordan keyin per_page + 1 ta yozuv olingach oqim to'xtaydi
+        consumed = []
+        def stream():
+            for activity in archived_activities(month):
+                consumed.append(activity)
+                yield activity
+        tenth = list(archived_activities(month))[10]
+        page = keyset_paginate_stream(stream(), before=encode_cursor(tenth.created_at, tenth.pk), per_page=5)
+        self.assertEqual([a.description for a in page], [f'{i}-kirish' for i in range(15, 10, -1)])
+        self.assertEqual(len(consumed), 11 + 6)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryPlanTests(TestCase):
+    """Asosiy sahifalar so'rovlari katta jadvallarni to'liq skanerlamasligi kerak"""
+
+    HOT_TABLES = ['main_activitylog', 'main_attendance', 'main_grade', 'main_announcement', 'main_dailyattendancesummary']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='9-"A" sinfi')
+        cls.subject = Subject.objects.create(name='Matematika')
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.teacher_user = User.objects.create(username='teacher')
+        cls.teacher = Teacher.objects.create(user=cls.teacher_user)
+        cls.teacher.subjects.add(cls.subject)
+        cls.student_user = User.objects.create(username='student')
+        student = Student.objects.create(user=cls.student_user, school_class=cls.school_class)
+        Announcement.objects.create(title='Majlis', content='Ertaga', author=cls.admin)
+        Attendance.objects.create(student=student, teacher=cls.teacher, subject=cls.subject, date=date(2025, 11, 10), period=1)
+        Grade.objects.create(student=student, subject=cls.subject, value=5)
+        ActivityLog.objects.create(user=cls.admin, activity_type='user_login', description='Tizimga kirdi')
+
+    def full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            plan = [row[3] for row in cursor.fetchall()]
+        pattern = re.compile(r'^SCAN (%s)\b(?!.*USING)' % '|'.join(self.HOT_TABLES))
+        return [step for step in plan if pattern.match(step)]
+
+    def test_hot_views_use_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN faqat SQLite uchun')
+        pages = [
+            (self.admin, 'admin_dashboard', {}),
+            (self.admin, 'admin_activities', {}),
+            (self.admin, 'admin_activities', {'type': 'user_login'}),
+            (self.admin, 'admin_activities', {'search': 'kirdi'}),
+            (self.admin, 'admin_reports', {}),
+            (self.admin, 'admin_announcements', {}),
+            (self.admin, 'admin_announcements', {'type': 'general', 'status': 'active'}),
+            (self.teacher_user, 'teacher_dashboard', {}),
+            (self.teacher_user, 'teacher_attendance', {
+                'class_id': self.school_class.id, 'subject_id': self.subject.id, 'period': 1, 'date': '2025-11-10',
+            }),
+            (self.teacher_user, 'teacher_announcements', {}),
+            (self.student_user, 'student_dashboard', {}),
+            (self.student_user, 'student_announcements', {}),
+        ]
+        for user, name, params in pages:
+            self.client.force_login(user)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse(name), params).status_code, 200)
+            for query in queries.captured_queries:
+                if query['sql'].startswith('SELECT'):
+                    with self.subTest(view=name, params=params, sql=query['sql']):
+                        self.assertEqual(self.full_scans(query['sql']), [])
+
+
+class SeedDataTests(TestCase):
+    """seed_data buyrug'i parametrlari"""
+
+    def test_density_parameters_shape_generated_rows(self):
+        call_command(
+            'seed_data', classes=2, students=10, teachers=3, years=0.05,
+            attendance_density=2, grade_density=2, batch_size=7, stdout=StringIO(),
+        )
+        days = Attendance.objects.values('date').distinct().count()
+        self.assertGreater(days, 0)
+        self.assertEqual(Attendance.objects.count(), days * 10 * 2)
+        self.assertEqual(Grade.objects.count(), 10 * 3 * 2)
+        self.assertEqual(
+            sum(summary.total_count for summary in DailyAttendanceSummary.objects.all()),
+            Attendance.objects.count(),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TeacherTimetableTests(TestCase):
+    """teacher_schedule: jadval bitta so'rov bilan, o'zgarguncha keshda"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='7-"A" sinfi')
+        cls.subject = Subject.objects.create(name='Fizika')
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('teacher', password='parol'))
+        cls.other = Teacher.objects.create(user=User.objects.create_user('other', password='parol'))
+        cls.lessons = [
+            Schedule.objects.create(
+                school_class=cls.school_class, subject=cls.subject, teacher=cls.teacher,
+                day=day, period=period, room=f'{day}-{period}',
+            )
+            for day, _ in Schedule.DAY_CHOICES for period in (1, 2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.teacher.user)
+
+    def schedule_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('teacher_schedule'))
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries.captured_queries if 'main_schedule' in q['sql']]
+
+    def test_timetable_is_one_query_then_cached(self):
+        response, queries = self.schedule_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['weekly_lessons_count'], 12)
+        self.assertEqual(response.context['busiest_day_count'], 2)
+        self.assertEqual(response.context['classes_count'], 1)
+        self.assertEqual(self.schedule_queries()[1], [])
+
+    def test_schedule_change_invalidates_old_and_new_teacher(self):
+        self.schedule_queries()
+        lesson = self.lessons[0]
+        lesson.teacher = self.other
+        lesson.save()
+
+        response, queries = self.schedule_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['weekly_lessons_count'], 11)
+
+        self.client.force_login(self.other.user)
+        self.assertEqual(self.schedule_queries()[0].context['weekly_lessons_count'], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BellScheduleTests(TestCase):
+    """Qo'ng'iroqlar jadvali: kunga xos vaqtlar, joriy dars va keshni yangilash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        school_class = SchoolClass.objects.create(name='8-"B" sinfi')
+        subject = Subject.objects.create(name='Tarix')
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('teacher', password='parol'))
+        cls.lesson = Schedule.objects.create(
+            school_class=school_class, subject=subject, teacher=cls.teacher, day='monday', period=2, room='205',
+        )
+        # Shanba kuni 2-dars qisqartirilgan
+        LessonPeriod.objects.create(day='saturday', number=2, start_time=time(8, 50), end_time=time(9, 20))
+
+    def setUp(self):
+        cache.clear()
+        # Yangi vaqt asosidagi versiya oldingi testning oshirilgan versiyasiga teng chiqishi mumkin
+        timetable._bell_schedule = None
+
+    def test_period_lookup_uses_day_overrides(self):
+        bell = get_bell_schedule()
+        self.assertEqual(bell.period_at('monday', time(9, 30)), 2)
+        self.assertIsNone(bell.period_at('monday', time(8, 50)))  # Tanaffus
+        self.assertIsNone(bell.period_at('monday', time(7, 0)))
+        self.assertEqual(bell.period_at('saturday', time(8, 55)), 2)
+        self.assertIsNone(bell.period_at('saturday', time(9, 30)))
+        self.assertEqual(bell.time_slot('saturday', 2), '08:50-09:20')
+        self.assertEqual([period['number'] for period in bell.periods('saturday')], list(range(1, 9)))
+
+    def test_current_lesson_for_teacher_room_and_class(self):
+        monday = timezone.make_aware(datetime(2026, 10, 19, 9, 10))
+        self.assertEqual(current_lesson(monday, teacher=self.teacher), self.lesson)
+        self.assertEqual(current_lesson(monday, room='205'), self.lesson)
+        self.assertEqual(current_lesson(monday, school_class=self.lesson.school_class), self.lesson)
+        self.assertIsNone(current_lesson(monday + timedelta(hours=1), teacher=self.teacher))
+
+    def test_period_change_reloads_bell_schedule(self):
+        self.assertEqual(get_bell_schedule().time_slot('monday', 1), '08:00-08:45')
+        with self.assertNumQueries(0):
+            get_bell_schedule()
+        LessonPeriod.objects.filter(day='', number=1).get().delete()
+        LessonPeriod.objects.create(number=1, start_time=time(8, 30), end_time=time(9, 0))
+        self.assertEqual(get_bell_schedule().time_slot('monday', 1), '08:30-09:00')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ClassTimetableTests(TestCase):
+    """Sinf jadvali matritsasi: o'quvchi va admin sahifalari keshdan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='5-"A" sinfi')
+        cls.subject = Subject.objects.create(name='Kimyo')
+        cls.teacher = Teacher.objects.create(
+            user=User.objects.create_user('teacher', password='parol', first_name='Anvar', last_name='Qodirov')
+        )
+        cls.admin = User.objects.create_user('admin', password='parol', is_staff=True)
+        cls.student_user = User.objects.create_user('student', password='parol')
+        Student.objects.create(user=cls.student_user, school_class=cls.school_class)
+        cls.lesson = Schedule.objects.create(
+            school_class=cls.school_class, subject=cls.subject, teacher=cls.teacher,
+            day='tuesday', period=3, room='310',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matrix_is_indexed_by_day_and_period(self):
+        timetable = get_class_timetable(self.school_class.id)
+        self.assertEqual(len(timetable['matrix']), 6)
+        self.assertEqual({len(day) for day in timetable['matrix']}, {8})
+        self.assertEqual(timetable['matrix'][1][2]['teacher'], 'Anvar Qodirov')
+        self.assertEqual(timetable['subject_counts'], [('Kimyo', 1)])
+        with self.assertNumQueries(0):
+            get_class_timetable(self.school_class.id)
+
+    def test_student_schedule_renders_cached_matrix(self):
+        self.client.force_login(self.student_user)
+        response = self.client.get(reverse('student_schedule'))
+        self.assertContains(response, 'Anvar Qodirov')
+        self.assertEqual(response.context['lessons_count'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('student_schedule'))
+        self.assertFalse([q for q in queries.captured_queries if 'main_schedule' in q['sql']])
+
+    def test_schedule_change_bumps_version(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin_schedule_class', args=[self.school_class.id])
+        self.assertContains(self.client.get(url), '310')
+
+        self.lesson.room = '404'
+        self.lesson.save()
+        response = self.client.get(url)
+        self.assertContains(response, '404')
+        self.assertNotContains(response, '310')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ACTIVITY_LOG_MODE='sync')
+class ScheduleImportTests(TestCase):
+    """Jadvalni fayldan yuklash: to'qnashuvlar bazaga yozishdan oldin"""
+
+    HEADER = ['sinf', 'fan', "o'qituvchi", 'kun', 'dars', 'xona']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_a = SchoolClass.objects.create(name='6-A')
+        cls.class_b = SchoolClass.objects.create(name='6-B')
+        Subject.objects.create(name='Matematika')
+        for username in ('karimov', 'aliyeva'):
+            Teacher.objects.create(user=User.objects.create_user(username, password='parol'))
+        cls.admin = User.objects.create_user('admin', password='parol', is_staff=True)
+
+    def csv_file(self, rows, name='jadval.csv'):
+        content = ''.join(stream_csv(self.HEADER, rows)).encode('utf-8')
+        return SimpleUploadedFile(name, content)
+
+    def test_all_clashes_are_reported_and_nothing_is_written(self):
+        rows = [
+            ['6-A', 'Matematika', 'karimov', 'monday', 1, '101'],
+            ['6-B', 'Matematika', 'karimov', 'Dushanba', 1, '102'],  # O'qituvchi band
+            ['6-B', 'Matematika', 'aliyeva', 'monday', 1, '101'],    # Xona band
+            ['6-A', 'Matematika', 'aliyeva', 'monday', 1, '103'],    # Sinf band
+            ['6-C', 'Matematika', 'aliyeva', 'monday', 9, '104'],    # Sinf va dars noto'g'ri
+        ]
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin_import_schedule'), {'file': self.csv_file(rows)})
+        errors = response.context['import_errors']
+        self.assertEqual(len(errors), 4)
+        self.assertIn("O'qituvchi band (2-qator)", errors[0])
+        self.assertIn('Xona band (2-qator)', errors[1])
+        self.assertIn('Sinf band (2-qator)', errors[2])
+        self.assertFalse(Schedule.objects.exists())
+
+    def test_xlsx_import_bulk_creates_and_checks_existing_lessons(self):
+        existing = Schedule.objects.create(
+            school_class=self.class_a, subject=Subject.objects.get(), teacher=Teacher.objects.first(),
+            day='friday', period=2, room='201',
+        )
+        rows = [
+            ['6-A', 'Matematika', 'aliyeva', 'tuesday', period, str(200 + period)] for period in range(1, 6)
+        ]
+        content = b''.join(stream_xlsx(self.HEADER, rows))
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin_import_schedule'), {
+                'file': SimpleUploadedFile('jadval.xlsx', content),
+            })
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "main_schedule"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertRedirects(response, reverse('admin_schedule'))
+        self.assertEqual(Schedule.objects.filter(day='tuesday').count(), 5)
+
+        clash = self.csv_file([['6-B', 'Matematika', 'aliyeva', 'friday', 2, '201']])
+        with self.assertRaises(ScheduleImportError) as raised:
+            import_schedule(read_schedule_file(clash.read(), clash.name))
+        self.assertIn(f'mavjud dars #{existing.id}', raised.exception.errors[0])
+
+    def test_concurrent_clash_is_reported_not_500(self):
+        rows = [['6-A', 'Matematika', 'karimov', 'monday', 1, '101']]
+        self.client.force_login(self.admin)
+        # Tekshiruvdan keyin, yozish paytida boshqa so'rov shu vaqtga dars qo'shgan
+        with mock.patch('main.views.import_schedule', side_effect=IntegrityError('UNIQUE constraint failed')):
+            response = self.client.post(reverse('admin_import_schedule'), {'file': self.csv_file(rows)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['import_errors']), 1)
+
+    def test_command_replaces_timetable(self):
+        aliyeva = Teacher.objects.get(user__username='aliyeva')
+        Schedule.objects.create(
+            school_class=self.class_b, subject=Subject.objects.get(), teacher=aliyeva,
+            day='friday', period=2, room='201',
+        )
+        self.assertEqual(sum(map(len, get_teacher_timetable(aliyeva.id)['days'].values())), 1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'jadval.csv')
+            with open(path, 'wb') as source:
+                source.write(self.csv_file([['6-B', 'Matematika', 'karimov', 'friday', 2, '201']]).read())
+            call_command('import_schedule', path, replace=True, stdout=StringIO())
+        self.assertEqual(Schedule.objects.get().teacher.user.username, 'karimov')
+        # Eski jadval signalsiz o'chiriladi - keshlar yozishdan keyin bir marta tozalanadi
+        self.assertEqual(sum(map(len, get_teacher_timetable(aliyeva.id)['days'].values())), 0)
+
+
+class TimetableSolverTests(TestCase):
+    """Avtomatik jadval: unique cheklovlar va haftalik soatlar bajariladi"""
+
+    def assertValidTimetable(self, lessons, groups):
+        for fields in (('teacher_id',), ('room',), ('school_class_id',)):
+            slots = [tuple(lesson[f] for f in fields + ('day', 'period')) for lesson in lessons]
+            self.assertEqual(len(slots), len(set(slots)))
+        hours = {}
+        for lesson in lessons:
+            key = (lesson['school_class_id'], lesson['subject_id'])
+            hours[key] = hours.get(key, 0) + 1
+        self.assertEqual(hours, {(c, s): h for c, s, h in groups})
+
+    def test_tight_problem_is_solved(self):
+        # 12 sinf x 5 fan x 6 soat = 30 o'rinning hammasi; har bir fanga 4 ta o'qituvchi, 11 ta xona
+        problem = {
+            'groups': [(c, s, 6) for c in range(12) for s in range(5)],
+            'teachers': {s: [s * 10 + k for k in range(4)] for s in range(5)},
+            'rooms': [str(100 + r) for r in range(11)],
+            'days': [day for day, _ in Schedule.DAY_CHOICES],
+            'periods': [1, 2, 3, 4, 5],
+        }
+        with self.assertRaises(TimetableError):
+            generate(problem, time_limit=5)  # 12 ta sinfga 11 ta xona yetmaydi
+
+        problem['rooms'].append('112')
+        result = generate(problem, time_limit=30)
+        self.assertEqual(len(result['lessons']), 360)
+        self.assertValidTimetable(result['lessons'], problem['groups'])
+
+    def test_command_rebuilds_seeded_school(self):
+        school = seed_school(classes=3, students=6, teachers=6)
+        old_lessons = list(Schedule.objects.values_list('school_class_id', 'subject_id'))
+        call_command('generate_timetable', from_schedule=True, rooms='201,202,203', stdout=StringIO())
+        lessons = list(Schedule.objects.values(
+            'school_class_id', 'subject_id', 'teacher_id', 'day', 'period', 'room',
+        ))
+        groups = {}
+        for key in old_lessons:
+            groups[key] = groups.get(key, 0) + 1
+        self.assertValidTimetable(lessons, [(c, s, h) for (c, s), h in groups.items()])
+        self.assertEqual({lesson['room'] for lesson in lessons}, {'201', '202', '203'})
+
+        # O'quv rejasidan: faqat bitta sinf, bitta fan
+        Curriculum.objects.create(school_class=school['classes'][0], subject=school['subjects'][0], weekly_hours=4)
+        out = StringIO()
+        call_command('generate_timetable', dry_run=True, stdout=out)
+        self.assertIn('4 ta dars', out.getvalue())
+        self.assertEqual(Schedule.objects.count(), len(lessons))
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GradeBookTests(TestCase):
+    """Baholar: yig'indi har bir yangi bahoda oshiriladi, reytinglar yig'indidan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_class = SchoolClass.objects.create(name='8-A')
+        cls.subject = Subject.objects.create(name='Kimyo')
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('teacher', password='parol'))
+        Schedule.objects.create(
+            school_class=cls.school_class, subject=cls.subject, teacher=cls.teacher,
+            day='monday', period=1, room='101',
+        )
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(f'student{i}', password='parol', last_name=name),
+                school_class=cls.school_class,
+            )
+            for i, name in enumerate(['Aliyev', 'Karimov', 'Saidov', 'Umarov'])
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def record(self, values):
+        marks = [{'student_id': student.id, 'value': value} for student, value in zip(self.students, values)]
+        with CaptureQueriesContext(connection) as queries:
+            results = record_grades(self.subject.id, marks, class_id=self.school_class.id)
+        return results, len(queries.captured_queries)
+
+    def test_running_average_is_incremental(self):
+        Grade.objects.create(student=self.students[0], subject=self.subject, value=3)  # admin orqali
+        summary = GradeSummary.objects.get()
+        self.assertEqual((summary.marks_sum, summary.marks_count), (3, 1))
+
+        _, two_students = self.record([5, 4])
+        _, four_students = self.record([4, 4, 3, 5])
+        self.assertEqual(two_students, four_students)
+
+        summary.refresh_from_db()
+        self.assertEqual((summary.marks_sum, summary.marks_count, summary.average_score), (12, 3, 4.0))
+        # Baho Grade.value da, chorak bahosi va o'rtacha ball jurnal yozuvlariga yozilmaydi
+        self.assertEqual(
+            list(Grade.objects.filter(student=self.students[0]).values_list('value', 'quarter_grade', 'average_score')),
+            [(3, None, 0.0), (5, None, 0.0), (4, None, 0.0)],
+        )
+        self.assertEqual(GradeSummary.objects.get(student=self.students[1]).average_score, 4.0)
+
+        results, _ = self.record([6, 'a'])
+        self.assertEqual([result['success'] for result in results], [False, False])
+        self.assertEqual(Grade.objects.count(), 7)
+
+        Grade.objects.filter(student=self.students[0]).first().delete()
+        summary.refresh_from_db()
+        self.assertEqual((summary.marks_sum, summary.marks_count), (9, 2))
+
+    def test_teacher_can_grade_only_own_lessons(self):
+        other_subject = Subject.objects.create(name='Fizika')
+        self.client.force_login(self.teacher.user)
+        marks = [{'student_id': self.students[0].id, 'value': 5}]
+        for payload, status in [
+            ({'class_id': self.school_class.id, 'subject_id': other_subject.id}, 403),
+            ({'subject_id': self.subject.id}, 400),
+        ]:
+            response = self.client.post(
+                reverse('save_grades'), json.dumps({**payload, 'marks': marks}), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, status)
+        self.assertFalse(Grade.objects.exists())
+
+    def test_student_delete_cascades_grades_in_bulk(self):
+        self.record([5, 4, 4, 3])
+        self.record([5, 4, 4, 3])
+        self.assertEqual(get_class_rankings(self.school_class.id)['overall'][0]['student_id'], self.students[0].id)
+        with CaptureQueriesContext(connection) as queries:
+            self.students[0].delete()
+        grade_deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "main_grade"')]
+        self.assertEqual(len(grade_deletes), 1)
+        self.assertEqual(GradeSummary.objects.count(), 3)
+        self.assertEqual(len(get_class_rankings(self.school_class.id)['overall']), 3)
+
+    def test_pages_use_cached_rankings(self):
+        self.record([5, 4, 4, 3])
+        rankings = get_class_rankings(self.school_class.id)
+        self.assertEqual([row['rank'] for row in rankings['overall']], [1, 2, 2, 4])
+
+        self.client.force_login(self.teacher.user)
+        response = self.client.post(reverse('save_grades'), json.dumps({
+            'class_id': self.school_class.id, 'subject_id': self.subject.id,
+            'marks': [{'student_id': self.students[3].id, 'value': 5}],
+        }), content_type='application/json')
+        self.assertEqual(response.json()['saved_count'], 1)
+
+        response = self.client.get(reverse('teacher_grades'), {
+            'class_id': self.school_class.id, 'subject_id': self.subject.id,
+        })
+        self.assertEqual([student.rank for student in response.context['students']], [1, 2, 2, 2])
+        self.assertEqual(response.context['subject_ranking'][0]['average'], 4.2)
+
+        self.client.force_login(self.students[3].user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('student_grades'))
+        self.assertEqual(response.context['rank'], 2)
+        self.assertEqual(response.context['subjects'][0]['recent_marks'], [(3, 'grade-satisfactory'), (5, 'grade-excellent')])
+        self.assertEqual(grade_level(2.4), ('Qoniqarsiz', 'grade-poor'))
+        self.assertFalse([q for q in queries.captured_queries if 'main_gradesummary' in q['sql'] and 'school_class' in q['sql']])
+
+class AnalyticsTests(TestCase):
+    """NumPy tahlil moduli: kvartillar, taqsimot va ORM sikli versiyasi bilan mosligi"""
+
+    def test_matches_naive_orm_version(self):
+        seed_school(classes=2, students=20, teachers=4, days=10, grades_per_subject=3)
+        today = timezone.localdate()
+        analytics = school_analytics(today - timedelta(days=10), today)
+        self.assertEqual(analytics, naive_school_analytics(today - timedelta(days=10), today))
+        self.assertEqual(analytics['attendance']['students'], 20)
+        self.assertEqual(sum(row['count'] for row in analytics['class_grades']), Grade.objects.count())
+
+    def test_percentiles_and_correlation(self):
+        school_class = SchoolClass.objects.create(name='9-A')
+        subject = Subject.objects.create(name='Fizika')
+        teacher = Teacher.objects.create(user=User.objects.create_user('teacher', password='parol'))
+        today = timezone.localdate()
+        for i, (mark, absences) in enumerate([(5, 0), (4, 1), (3, 3), (2, 6)]):
+            student = Student.objects.create(
+                user=User.objects.create_user(f'student{i}', password='parol'), school_class=school_class,
+            )
+            Grade.objects.create(student=student, subject=subject, value=mark)
+            for day in range(10):
+                Attendance.objects.create(
+                    student=student, teacher=teacher, date=today - timedelta(days=day),
+                    status='absent_without_reason' if day < absences else 'present',
+                )
+
+        analytics = school_analytics(today - timedelta(days=30), today)
+        self.assertEqual(analytics['class_grades'], [
+            {'name': '9-A', 'count': 4, 'mean': 3.5, 'p25': 2.75, 'median': 3.5, 'p75': 4.25},
+        ])
+        self.assertEqual(analytics['attendance']['median_rate'], 80.0)
+        self.assertEqual([row['count'] for row in analytics['attendance']['histogram']], [1, 0, 0, 1, 0, 2])
+        self.assertLess(analytics['absences']['correlation'], -0.9)
+        self.assertEqual([row['students'] for row in analytics['absences']['buckets']], [1, 1, 1, 1, 0])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CounterTests(TestCase):
+    """Hisoblagichlar: umumiy sonlar keshda, sinf/fan sonlari ustunlarda - signallar bilan doim to'g'ri"""
+
+    def setUp(self):
+        cache.clear()
+        self.classes = [SchoolClass.objects.create(name=name) for name in ['5-A', '5-B']]
+        self.subjects = [Subject.objects.create(name=name) for name in ['Tarix', 'Biologiya']]
+
+    def assertCountsMatchDatabase(self):
+        self.assertEqual(reconcile_counts(dry_run=True), {'classes': 0, 'subjects': 0})
+        cached = (
+            get_totals(),
+            dict(SchoolClass.objects.filter(id__in=[c.id for c in self.classes]).values_list('id', 'student_count')),
+            dict(Subject.objects.filter(id__in=[s.id for s in self.subjects]).values_list('id', 'teacher_count')),
+        )
+        cache.clear()
+        self.assertEqual(cached[0], get_totals())
+        self.assertEqual(
+            (cached[0]['students'], cached[0]['teachers']), (Student.objects.count(), Teacher.objects.count())
+        )
+        return cached
+
+    def test_signals_keep_counts_in_sync(self):
+        self.assertCountsMatchDatabase()  # Keshni to'ldirish
+        with self.captureOnCommitCallbacks(execute=True):
+            students = [
+                Student.objects.create(user=User.objects.create_user(f'student{i}'), school_class=self.classes[i % 2])
+                for i in range(3)
+            ]
+            teacher = Teacher.objects.create(user=User.objects.create_user('teacher'))
+            teacher.subjects.add(*self.subjects)
+            other = Teacher.objects.create(user=User.objects.create_user('other'))
+            self.subjects[0].teacher_set.add(other)
+        totals, class_counts, subject_counts = self.assertCountsMatchDatabase()
+        self.assertEqual(totals['students'], 3)
+        self.assertEqual(class_counts, {self.classes[0].id: 2, self.classes[1].id: 1})
+        self.assertEqual(subject_counts, {self.subjects[0].id: 2, self.subjects[1].id: 1})
+
+        self.assertCountsMatchDatabase()
+        with self.captureOnCommitCallbacks(execute=True):
+            students[0].school_class = self.classes[1]
+            students[0].save()
+            teacher.subjects.remove(self.subjects[1])
+            teacher.subjects.remove(self.subjects[1])  # Bog'lanmagan fan - hisoblagich o'zgarmaydi
+            self.subjects[1].teacher_set.remove(other)
+            self.subjects[0].teacher_set.clear()
+            students[1].user.delete()
+            other.user.delete()
+        totals, class_counts, subject_counts = self.assertCountsMatchDatabase()
+        self.assertEqual((totals['students'], totals['teachers']), (2, 1))
+        self.assertEqual(class_counts, {self.classes[0].id: 1, self.classes[1].id: 1})
+        self.assertEqual(subject_counts, {self.subjects[0].id: 0, self.subjects[1].id: 0})
+
+        self.assertCountsMatchDatabase()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classes.pop().delete()
+        self.assertEqual(self.assertCountsMatchDatabase()[0]['classes'], 1)
+
+    def test_rolled_back_changes_leave_totals_alone(self):
+        self.assertEqual(get_totals('classes'), {'classes': 2})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    SchoolClass.objects.create(name='5-C')
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_totals('classes'), {'classes': 2})
+
+    def test_dashboard_counts_without_queries_when_cached(self):
+        admin = User.objects.create_user('admin', password='parol', is_staff=True)
+        Student.objects.create(user=User.objects.create_user('student'), school_class=self.classes[0])
+        self.client.force_login(admin)
+        self.client.get(reverse('admin_dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['students_count'], 1)
+        self.assertEqual(response.context['classes_count'], 2)
+        # Oylik davomat statistikasi (kunlik yig'indidan) hisoblagichlarga kirmaydi
+        self.assertFalse([
+            q for q in queries.captured_queries
+            if 'COUNT(' in q['sql'] and 'main_dailyattendancesummary' not in q['sql']
+        ])
+
+    def test_reconcile_fixes_drift(self):
+        Student.objects.create(user=User.objects.create_user('student'), school_class=self.classes[0])
+        SchoolClass.objects.update(student_count=7)
+        Subject.objects.filter(pk=self.subjects[0].pk).update(teacher_count=-1)
+        out = StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=out)
+        self.assertIn('Sinflar: 2 ta', out.getvalue())
+        self.assertEqual(reconcile_counts(), {'classes': 2, 'subjects': 1})
+        self.assertEqual(list(SchoolClass.objects.order_by('id').values_list('student_count', flat=True)), [1, 0])
+        self.assertEqual(reconcile_counts(), {'classes': 0, 'subjects': 0})
+
+
+class AdminUsersTests(TestCase):
+    """Foydalanuvchilar ro'yxati: server tomonida filtrlar, qidiruv va JSON bo'laklar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='parol', is_staff=True)
+        cls.classes = [SchoolClass.objects.create(name=name) for name in ['6-A', '6-B']]
+        subjects = [Subject.objects.create(name=name) for name in ['Ona tili', 'Geografiya']]
+        joined = timezone.now() - timedelta(days=1)
+        for i in range(60):
+            user = User.objects.create_user(
+                f'student{i}', first_name='Aziz' if i % 10 == 0 else 'Bobur', last_name=f'Familiya{i}',
+                is_active=i % 3 != 0,
+            )
+            User.objects.filter(pk=user.pk).update(date_joined=joined + timedelta(minutes=i))
+            Student.objects.create(user=user, school_class=cls.classes[i % 2])
+        for i in range(3):
+            teacher = Teacher.objects.create(user=User.objects.create_user(f'teacher{i}', first_name='Ustoz'))
+            teacher.subjects.set(subjects[:i + 1])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def usernames(self, response):
+        return [account.username for account in response.context['users']]
+
+    def test_filters_and_search_run_on_server(self):
+        response = self.client.get(reverse('admin_users'), {'role': 'teacher'})
+        self.assertEqual(self.usernames(response), ['teacher2', 'teacher1', 'teacher0'])
+        self.assertContains(response, 'Geografiya')
+
+        response = self.client.get(reverse('admin_users'), {'search': 'aziz familiya1'})
+        self.assertEqual(self.usernames(response), ['student10'])
+
+        response = self.client.get(reverse('admin_users'), {
+            'role': 'student', 'class_id': self.classes[1].id, 'status': 'inactive',
+        })
+        self.assertEqual(self.usernames(response), [f'student{i}' for i in range(57, 0, -1) if i % 6 == 3])
+
+    def test_pages_load_as_json_fragments(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_users'))
+        first_page = self.usernames(response)
+        self.assertEqual(len(first_page), 50)
+        listing = [q['sql'] for q in queries.captured_queries if 'main_student' in q['sql'] or 'main_teacher_subjects' in q['sql']]
+        self.assertEqual(len(listing), 2)  # Sahifa va o'qituvchi fanlari - qatorlar soniga bog'liq emas
+        self.assertNotIn('password', listing[0])
+
+        cursor = response.context['users'].next_cursor
+        data = self.client.get(reverse('admin_users'), {'after': cursor, 'format': 'json'}).json()
+        self.assertIsNone(data['next_cursor'])
+        remaining = re.findall(r'data-username="([^"]+)"', data['html'])
+        self.assertEqual(len(remaining), 13)
+        self.assertFalse(set(remaining) & set(first_page))
+
+
+@override_settings(**BENCHMARK_SETTINGS)
+class RouteBenchmarkTests(TestCase):
+    """Barcha manzillar so'rovlar soni checked-in baseline dan oshmasligi kerak
+
+    Vaqt bo'yicha to'liq solishtirish: python manage.py benchmark_routes --scale full
+    """
+
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual({route.name for route in ROUTES}, {pattern.name for pattern in urls.urlpatterns})
+
+    def test_query_counts_do_not_regress(self):
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            school = seed_school(**BENCHMARK_SCALES['small'])
+            results = run_benchmarks(benchmark_fixtures(school), repeat=1)
+        self.assertEqual(compare_with_baseline(results, load_baseline('small'), check_timing=False), [])
+
+
+@override_settings(ACTIVITY_LOG_MODE='buffered')
+class BufferedActivityLogTests(TransactionTestCase):
+    """Faoliyat tarixini buferlab yozish"""
+
+    def test_buffered_entries_are_written_in_one_batch(self):
+        user = User.objects.create(username='admin')
+        for i in range(3):
+            log_activity(user, 'user_login', f'{i}-kirish')
+        activity_log_buffer.flush()
+        self.assertEqual(
+            list(ActivityLog.objects.order_by('id').values_list('description', flat=True)),
+            ['0-kirish', '1-kirish', '2-kirish'],
+        )
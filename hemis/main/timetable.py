@@ -0,0 +1,180 @@
+# main/timetable.py
+from bisect import bisect_right
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import LessonPeriod, Schedule, SchoolClass
+from .utils import bump_cache_version, get_cache_version, invalidate_teacher_timetables
+
+BELL_SCHEDULE_VERSION_KEY = 'bell_schedule:version'
+
+# Sinflar jadvallari keshi - har qanday dars o'zgarganda versiya oshadi
+CLASS_TIMETABLE_VERSION_KEY = 'class_timetable:version'
+CLASS_TIMETABLE_TIMEOUT = getattr(settings, 'CLASS_TIMETABLE_TIMEOUT', 24 * 3600)
+
+WEEK_DAYS = [day for day, _ in Schedule.DAY_CHOICES]
+PERIOD_NUMBERS = [number for number, _ in Schedule._meta.get_field('period').choices]
+
+# Jarayon ichidagi nusxa: (versiya, BellSchedule)
+_bell_schedule = None
+
+
+def weekday_name(value):
+    """Sana uchun Schedule.day qiymati (yakshanba - '')"""
+    weekday = value.weekday()
+    return WEEK_DAYS[weekday] if weekday < len(WEEK_DAYS) else ''
+
+
+class BellSchedule:
+    """Qo'ng'iroqlar jadvali: har bir kun uchun boshlanish vaqti bo'yicha saralangan oraliqlar
+
+    Kunga xos vaqtlar umumiy (kun bo'sh) vaqtlarning ustidan yoziladi.
+    """
+
+    def __init__(self, periods):
+        common = {}
+        by_day = {}
+        for period in periods:
+            target = by_day.setdefault(period.day, {}) if period.day else common
+            target[period.number] = (period.start_time, period.end_time)
+
+        self._days = {}
+        for day in [''] + WEEK_DAYS:
+            slots = sorted(
+                (start, end, number) for number, (start, end) in {**common, **by_day.get(day, {})}.items()
+            )
+            self._days[day] = (
+                [start for start, _, _ in slots],  # bisect uchun indeks
+                slots,
+                {number: (start, end) for start, end, number in slots},
+            )
+
+    def periods(self, day=''):
+        """Kunning darslari: [{'number', 'time_slot', 'start', 'end'}]"""
+        _, slots, _ = self._days.get(day, self._days[''])
+        return [
+            {'number': number, 'time_slot': f'{start:%H:%M}-{end:%H:%M}', 'start': start, 'end': end}
+            for start, end, number in slots
+        ]
+
+    def time_slot(self, day, number):
+        _, _, by_number = self._days.get(day, self._days[''])
+        if number not in by_number:
+            return ''
+        start, end = by_number[number]
+        return f'{start:%H:%M}-{end:%H:%M}'
+
+    def period_at(self, day, at):
+        """`at` vaqtida davom etayotgan dars raqami yoki None - O(log n)"""
+        starts, slots, _ = self._days.get(day, self._days[''])
+        index = bisect_right(starts, at) - 1
+        if index >= 0 and at < slots[index][1]:
+            return slots[index][2]
+        return None
+
+
+def get_bell_schedule():
+    """Qo'ng'iroqlar jadvali - versiya o'zgarmaguncha jarayon xotirasidan"""
+    global _bell_schedule
+    version = get_cache_version(BELL_SCHEDULE_VERSION_KEY)
+    if _bell_schedule is None or _bell_schedule[0] != version:
+        _bell_schedule = (version, BellSchedule(LessonPeriod.objects.all()))
+    return _bell_schedule[1]
+
+def invalidate_bell_schedule():
+    """Barcha jarayonlarda qo'ng'iroqlar jadvalini qayta yuklatish"""
+    bump_cache_version(BELL_SCHEDULE_VERSION_KEY)
+
+def current_period(at=None):
+    """`at` (standart - hozir) uchun (kun, dars raqami) - dars bo'lmasa raqam None"""
+    at = timezone.localtime(at)
+    day = weekday_name(at)
+    if not day:
+        return day, None
+    return day, get_bell_schedule().period_at(day, at.time())
+
+def current_lesson(at=None, **lookup):
+    """O'qituvchi, sinf yoki xona uchun joriy dars
+
+    Masalan: current_lesson(teacher=teacher), current_lesson(school_class_id=5), current_lesson(room='101').
+    Dars raqami bisect bilan topiladi, dars esa (kun, dars) bo'yicha unique indeksdan olinadi.
+    """
+    day, number = current_period(at)
+    if number is None:
+        return None
+    return Schedule.objects.filter(day=day, period=number, **lookup).select_related(
+        'school_class', 'subject', 'teacher__user'
+    ).first()
+
+def compile_class_timetable(class_id):
+    """Sinf haftasini [kun][dars] o'lchamli matritsaga yig'ish - sinf nomi va darslar uchun ikki so'rov
+
+    Katakda dars lug'ati yoki None. Sinf topilmasa None qaytariladi.
+    """
+    class_name = SchoolClass.objects.filter(pk=class_id).values_list('name', flat=True).first()
+    if class_name is None:
+        return None
+
+    matrix = [[None] * len(PERIOD_NUMBERS) for _ in WEEK_DAYS]
+    day_index = {day: i for i, day in enumerate(WEEK_DAYS)}
+    period_index = {number: i for i, number in enumerate(PERIOD_NUMBERS)}
+    subject_counts = {}
+    rows = Schedule.objects.filter(school_class_id=class_id).values_list(
+        'id', 'day', 'period', 'subject__name', 'teacher__user__first_name', 'teacher__user__last_name', 'room',
+    )
+    for pk, day, period, subject, first_name, last_name, room in rows:
+        if day not in day_index or period not in period_index:
+            continue
+        matrix[day_index[day]][period_index[period]] = {
+            'id': pk,
+            'period': period,
+            'subject': subject,
+            'teacher': f'{first_name} {last_name}'.strip(),
+            'room': room,
+        }
+        subject_counts[subject] = subject_counts.get(subject, 0) + 1
+
+    return {
+        'class_name': class_name,
+        'matrix': matrix,
+        'subject_counts': sorted(subject_counts.items(), key=lambda item: (-item[1], item[0])),
+        'lessons_count': sum(subject_counts.values()),
+    }
+
+def get_class_timetable(class_id):
+    """Sinf jadvali matritsasini keshdan olish"""
+    key = f'class_timetable:{get_cache_version(CLASS_TIMETABLE_VERSION_KEY)}:{class_id}'
+    timetable = cache.get(key)
+    if timetable is None:
+        timetable = compile_class_timetable(class_id)
+        cache.set(key, timetable, CLASS_TIMETABLE_TIMEOUT)
+    return timetable
+
+def invalidate_class_timetables():
+    """Barcha sinflar jadvallarini eskirgan deb belgilash"""
+    bump_cache_version(CLASS_TIMETABLE_VERSION_KEY)
+
+def write_timetable(lessons, replace=False):
+    """Darslarni bitta bulk_create bilan tranzaksiyada yozish (replace=True - eski jadval o'chiriladi)"""
+    with transaction.atomic():
+        if replace:
+            # Signal yubormasdan bitta DELETE (Schedule ga FK yo'q) - keshlar pastda bir marta tozalanadi
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(Schedule._meta.db_table)}')
+        Schedule.objects.bulk_create(lessons)
+    # bulk_create va to'g'ridan-to'g'ri DELETE signal yubormaydi
+    invalidate_class_timetables()
+    invalidate_teacher_timetables()
+
+def timetable_rows(matrix, bell_schedule=None):
+    """Matritsani jadval qatorlariga aylantirish: [{'number', 'time_slot', 'cells': [kun bo'yicha]}]"""
+    bell_schedule = bell_schedule or get_bell_schedule()
+    return [
+        {
+            'number': number,
+            'time_slot': bell_schedule.time_slot('', number),
+            'cells': [day_lessons[p] for day_lessons in matrix],
+        }
+        for p, number in enumerate(PERIOD_NUMBERS)
+    ]
@@ -0,0 +1,306 @@
+# main/timetable_solver.py
+import multiprocessing
+import random
+import time
+
+# Yechuvchi yadrosi faqat oddiy Python ma'lumotlari bilan ishlaydi va spawn jarayonlarida
+# django.setup() siz import qilinadi, shuning uchun modellar funksiyalar ichida import qilinadi.
+
+DEFAULT_PERIODS_PER_DAY = 6
+DEFAULT_TIME_LIMIT = 60
+
+
+class TimetableError(Exception):
+    """Jadval tuzib bo'lmaydi - sabablar `errors` da"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} ta xato")
+        self.errors = errors
+
+
+def check_problem(problem):
+    """Yechishdan oldin aniq bajarib bo'lmaydigan talablarni topish"""
+    slots = len(problem['days']) * len(problem['periods'])
+    errors = []
+    class_hours = {}
+    for class_id, subject_id, hours in problem['groups']:
+        class_hours[class_id] = class_hours.get(class_id, 0) + hours
+        if not problem['teachers'].get(subject_id):
+            errors.append(f"Fan #{subject_id} uchun o'qituvchi yo'q")
+    for class_id, hours in class_hours.items():
+        if hours > slots:
+            errors.append(f"Sinf #{class_id}: {hours} soat, haftada faqat {slots} ta dars o'rni bor")
+    total = sum(class_hours.values())
+    if total > slots * len(problem['rooms']):
+        errors.append(f"{len(problem['rooms'])} ta xona {total} ta dars uchun yetmaydi")
+    return sorted(set(errors))
+
+def _assign_teachers(problem, rng, capacity):
+    """Har bir (sinf, fan) juftiga bitta o'qituvchi - eng kam yuklangani"""
+    load = {}
+    assignment = []
+    groups = list(problem['groups'])
+    rng.shuffle(groups)
+    groups.sort(key=lambda group: -group[2])
+    for class_id, subject_id, hours in groups:
+        candidates = list(problem['teachers'][subject_id])
+        rng.shuffle(candidates)
+        teacher_id = min(candidates, key=lambda teacher: load.get(teacher, 0))
+        if load.get(teacher_id, 0) + hours > capacity:
+            return None
+        load[teacher_id] = load.get(teacher_id, 0) + hours
+        assignment.append((class_id, subject_id, teacher_id, hours))
+    return assignment
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def solve(problem, seed=1):
+    """Bitta urinish: MRV tartibida ochko'z joylash, to'siqda Kempe zanjiri bilan ta'mirlash
+
+    Vaqt o'rni = kun * darslar + dars. Sinf va o'qituvchi bandligi, xonalari to'lgan o'rinlar
+    butun sonli bit-niqoblarda saqlanadi. Sinf va o'qituvchining umumiy bo'sh o'rni qolmasa,
+    o'qituvchidan boshlanadigan a/b almashinuvchi zanjir (ikki tomonlama graf bo'yash) almashtiriladi.
+    Qaytaradi: (darslar yoki None, ta'mirlashlar soni)
+    """
+    rng = random.Random(seed)
+    per_day = len(problem['periods'])
+    slot_count = len(problem['days']) * per_day
+    full = (1 << slot_count) - 1
+    room_count = len(problem['rooms'])
+
+    groups = _assign_teachers(problem, rng, slot_count)
+    if groups is None:
+        return None, 0
+    classes = [group[0] for group in groups]
+    teachers = [group[2] for group in groups]
+    remaining = [group[3] for group in groups]
+    tie_break = [rng.random() for _ in groups]
+
+    class_busy = dict.fromkeys(classes, 0)
+    teacher_busy = dict.fromkeys(teachers, 0)
+    class_at = {}    # (sinf, o'rin) -> guruh
+    teacher_at = {}  # (o'qituvchi, o'rin) -> guruh
+    room_used = [0] * slot_count
+    room_full = 0
+    placed = [[] for _ in groups]
+
+    def add(g, slot):
+        nonlocal room_full
+        bit = 1 << slot
+        class_busy[classes[g]] |= bit
+        teacher_busy[teachers[g]] |= bit
+        class_at[classes[g], slot] = g
+        teacher_at[teachers[g], slot] = g
+        placed[g].append(slot)
+        room_used[slot] += 1
+        if room_used[slot] == room_count:
+            room_full |= bit
+
+    def remove(g, slot):
+        nonlocal room_full
+        bit = 1 << slot
+        class_busy[classes[g]] &= ~bit
+        teacher_busy[teachers[g]] &= ~bit
+        del class_at[classes[g], slot]
+        del teacher_at[teachers[g], slot]
+        placed[g].remove(slot)
+        room_used[slot] -= 1
+        room_full &= ~bit
+
+    def choose():
+        """Eng kam zaxirali (umumiy bo'sh o'rinlar - qolgan soatlar) guruh"""
+        best = None
+        best_key = None
+        for g, hours in enumerate(remaining):
+            if not hours:
+                continue
+            free = full & ~(class_busy[classes[g]] | teacher_busy[teachers[g]] | room_full)
+            key = (free.bit_count() - hours, tie_break[g])
+            if best_key is None or key < best_key:
+                best, best_key = g, key
+        return best
+
+    def best_slot(g, free):
+        # Avval fan hali bo'lmagan kunlar, keyin bo'sh xonasi ko'p o'rinlar
+        days = {slot // per_day for slot in placed[g]}
+        return min(_bits(free), key=lambda slot: (slot // per_day in days, room_used[slot], rng.random()))
+
+    def kempe(g):
+        """Sinf bo'sh (a) va o'qituvchi bo'sh (b) o'rinlar zanjirini almashtirib `a` ni bo'shatish"""
+        class_free = full & ~class_busy[classes[g]]
+        teacher_free = full & ~teacher_busy[teachers[g]]
+        for a in _bits(class_free):
+            for b in _bits(teacher_free):
+                path = []
+                teacher = teachers[g]
+                while True:
+                    edge = teacher_at.get((teacher, a))
+                    if edge is None:
+                        break
+                    path.append((edge, a, b))
+                    edge = class_at.get((classes[edge], b))
+                    if edge is None:
+                        break
+                    path.append((edge, b, a))
+                    teacher = teachers[edge]
+                moved_to_b = sum(1 for _, old, _ in path if old == a)
+                moved_to_a = len(path) - moved_to_b
+                if (room_used[a] - moved_to_b + moved_to_a + 1 > room_count
+                        or room_used[b] + moved_to_b - moved_to_a > room_count):
+                    continue
+                for edge, old, _ in path:
+                    remove(edge, old)
+                for edge, _, new in path:
+                    add(edge, new)
+                return a
+        return None
+
+    repairs = 0
+    while True:
+        g = choose()
+        if g is None:
+            break
+        free = full & ~(class_busy[classes[g]] | teacher_busy[teachers[g]] | room_full)
+        if free:
+            slot = best_slot(g, free)
+        else:
+            slot = kempe(g)
+            repairs += 1
+            if slot is None:
+                return None, repairs
+        add(g, slot)
+        remaining[g] -= 1
+
+    return _with_rooms(problem, groups, placed, per_day), repairs
+
+def _with_rooms(problem, groups, placed, per_day):
+    """Har bir o'ringa xona berish - iloji bo'lsa sinfning doimiy xonasi"""
+    rooms = problem['rooms']
+    class_order = sorted({group[0] for group in groups})
+    home = {class_id: rooms[i % len(rooms)] for i, class_id in enumerate(class_order)}
+    by_slot = {}
+    for g, slots in enumerate(placed):
+        for slot in slots:
+            by_slot.setdefault(slot, []).append(g)
+
+    lessons = []
+    for slot, slot_groups in by_slot.items():
+        taken = set()
+        waiting = []
+        for g in slot_groups:
+            room = home[groups[g][0]]
+            if room in taken:
+                waiting.append(g)
+            else:
+                taken.add(room)
+                lessons.append((g, slot, room))
+        spare = (room for room in rooms if room not in taken)
+        for g in waiting:
+            lessons.append((g, slot, next(spare)))
+
+    day_names = problem['days']
+    periods = problem['periods']
+    return [
+        {
+            'school_class_id': groups[g][0],
+            'subject_id': groups[g][1],
+            'teacher_id': groups[g][2],
+            'day': day_names[slot // per_day],
+            'period': periods[slot % per_day],
+            'room': room,
+        }
+        for g, slot, room in sorted(lessons, key=lambda item: (groups[item[0]][0], item[1]))
+    ]
+
+def _solve_until(problem, seed, step, deadline):
+    """Urug'larni seed, seed+step, ... tartibida muddat tugaguncha sinab ko'rish"""
+    attempts = 0
+    repairs = 0
+    while time.monotonic() < deadline:
+        attempts += 1
+        lessons, used = solve(problem, seed)
+        repairs += used
+        if lessons is not None:
+            return lessons, attempts, repairs, seed
+        seed += step
+    return None, attempts, repairs, None
+
+def _solve_task(args):
+    return _solve_until(*args)
+
+def generate(problem, seed=1, workers=1, time_limit=DEFAULT_TIME_LIMIT):
+    """Jadval tuzish - qayta boshlashlar `workers` ta jarayonda parallel
+
+    Qaytaradi: {'lessons', 'seconds', 'attempts', 'repairs', 'seed'}
+    Yechim topilmasa yoki talablar bajarib bo'lmas bo'lsa TimetableError.
+    """
+    errors = check_problem(problem)
+    if errors:
+        raise TimetableError(errors)
+
+    started = time.monotonic()
+    deadline = started + time_limit
+    if workers <= 1:
+        results = [_solve_until(problem, seed, 1, deadline)]
+    else:
+        # Pool (ProcessPoolExecutor emas): yechim topilganda qolgan jarayonlar terminate() bilan to'xtatiladi
+        tasks = [(problem, seed + i, workers, deadline) for i in range(workers)]
+        results = []
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            for result in pool.imap_unordered(_solve_task, tasks):
+                results.append(result)
+                if result[0] is not None:
+                    break
+
+    solved = [result for result in results if result[0] is not None]
+    attempts = sum(result[1] for result in results)
+    repairs = sum(result[2] for result in results)
+    if not solved:
+        raise TimetableError([f"{time_limit} soniyada jadval topilmadi ({attempts} ta urinish)"])
+    lessons, _, _, solved_seed = solved[0]
+    return {
+        'lessons': lessons,
+        'seconds': round(time.monotonic() - started, 2),
+        'attempts': attempts,
+        'repairs': repairs,
+        'seed': solved_seed,
+    }
+
+def load_problem(periods_per_day=DEFAULT_PERIODS_PER_DAY, rooms=None, from_schedule=False):
+    """Bazadan masala: o'quv rejasi (yoki joriy jadvaldagi soatlar), Teacher.subjects va xonalar"""
+    from django.db.models import Count
+    from .models import Curriculum, Schedule, Teacher
+
+    if from_schedule:
+        groups = [
+            (row['school_class'], row['subject'], row['hours'])
+            for row in Schedule.objects.values('school_class', 'subject').annotate(hours=Count('id'))
+        ]
+    else:
+        groups = list(Curriculum.objects.filter(weekly_hours__gt=0).values_list(
+            'school_class_id', 'subject_id', 'weekly_hours'
+        ))
+    teachers = {}
+    for teacher_id, subject_id in Teacher.subjects.through.objects.values_list('teacher_id', 'subject_id'):
+        teachers.setdefault(subject_id, []).append(teacher_id)
+    if not rooms:
+        rooms = sorted(Schedule.objects.values_list('room', flat=True).distinct())
+
+    return {
+        'groups': sorted(groups),
+        'teachers': {subject_id: sorted(ids) for subject_id, ids in teachers.items()},
+        'rooms': list(rooms),
+        'days': [day for day, _ in Schedule.DAY_CHOICES],
+        'periods': list(range(1, periods_per_day + 1)),
+    }
+
+def save_generated(lessons):
+    """Yaratilgan jadval bilan mavjud jadvalni almashtirish"""
+    from .models import Schedule
+    from .timetable import write_timetable
+
+    write_timetable([Schedule(**lesson) for lesson in lessons], replace=True)
@@ -18,6 +18,7 @@ urlpatterns = [
     # Teacher URLs
     path('teacher/', views.teacher_dashboard, name='teacher_dashboard'),
     path('teacher/grades/', views.teacher_grades, name='teacher_grades'),
+    path('teacher/grades/save/', views.save_grades, name='save_grades'),
     path('teacher/attendance/', views.teacher_attendance, name='teacher_attendance'),
     path('teacher/attendance/save/', views.save_attendance, name='save_attendance'), 
     path('teacher/schedule/', views.teacher_schedule, name='teacher_schedule'),
@@ -33,6 +34,10 @@ urlpatterns = [
     path('admin/users/toggle-active/<int:user_id>/', views.admin_toggle_active, name='admin_toggle_active'),
     path('admin/classes/', views.admin_classes, name='admin_classes'),
     path('admin/reports/', views.admin_reports, name='admin_reports'),
+    path('admin/reports/export/', views.admin_report_export, name='admin_report_export'),
+    path('admin/reports/jobs/', views.admin_report_job_create, name='admin_report_job_create'),
+    path('admin/reports/jobs/<int:job_id>/', views.admin_report_job_status, name='admin_report_job_status'),
+    path('admin/reports/jobs/<int:job_id>/download/', views.admin_report_job_download, name='admin_report_job_download'),
     # Admin e'lon URLlari
     path('admin/announcements/', views.admin_announcements, name='admin_announcements'),
     path('admin/announcements/create/', views.admin_create_announcement, name='admin_create_announcement'),
@@ -52,6 +57,7 @@ urlpatterns = [
         # Dars Jadvali URL lari
     path('admin/schedule/', views.admin_schedule, name='admin_schedule'),
     path('admin/schedule/class/<int:class_id>/', views.admin_schedule_class, name='admin_schedule_class'),
+    path('admin/schedule/import/', views.admin_import_schedule, name='admin_import_schedule'),
     path('admin/schedule/add/', views.admin_add_schedule, name='admin_add_schedule'),
     path('admin/schedule/edit/<int:schedule_id>/', views.admin_edit_schedule, name='admin_edit_schedule'),
     path('admin/schedule/delete/<int:schedule_id>/', views.admin_delete_schedule, name='admin_delete_schedule'),
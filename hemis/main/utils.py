@@ -1,25 +1,62 @@
 # main/utils.py
-from .models import ActivityLog,Announcement
+from .models import ActivityLog,Announcement,Attendance,Schedule,Student,UserAgent
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+from .activity_log import activity_log_buffer
+from .stats import refresh_daily_summary
+import hashlib
+import time
+
+# E'lonlar lentasi keshi sozlamalari
+ANNOUNCEMENT_FEED_VERSION_KEY = 'announcements:feed:version'
+ANNOUNCEMENT_FEED_TIMEOUT = getattr(settings, 'ANNOUNCEMENT_FEED_TIMEOUT', 300)
+
+# O'qituvchi haftalik jadvali keshi
+TEACHER_TIMETABLE_VERSION_KEY = 'teacher_timetable:version'
+TEACHER_TIMETABLE_TIMEOUT = getattr(settings, 'TEACHER_TIMETABLE_TIMEOUT', 24 * 3600)
+
+# Brauzer satri xeshi -> UserAgent.id (jarayon ichidagi kesh)
+_user_agent_ids = {}
+USER_AGENT_CACHE_SIZE = 1000
 
 
 def log_activity(user, activity_type, description, request=None):
     """Faoliyatni log qilish funksiyasi"""
     ip_address = None
-    user_agent = ""
+    agent_id = None
     
     if request:
         ip_address = get_client_ip(request)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
+        agent_id = get_user_agent_id(request.META.get('HTTP_USER_AGENT', '')[:500])
     
-    ActivityLog.objects.create(
+    entry = ActivityLog(
         user=user,
         activity_type=activity_type,
         description=description,
         ip_address=ip_address,
-        user_agent=user_agent
+        agent_id=agent_id
     )
+    
+    # Buferlangan rejimda so'rov yozuv bazaga tushishini kutmaydi
+    if getattr(settings, 'ACTIVITY_LOG_MODE', 'sync') == 'buffered':
+        activity_log_buffer.add(entry)
+    else:
+        entry.save()
+
+def get_user_agent_id(value):
+    """Brauzer satrini lug'at jadvalidagi id ga aylantirish"""
+    if not value:
+        return None
+    value_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    agent_id = _user_agent_ids.get(value_hash)
+    if agent_id is None:
+        agent, _ = UserAgent.objects.get_or_create(value_hash=value_hash, defaults={'value': value})
+        if len(_user_agent_ids) >= USER_AGENT_CACHE_SIZE:
+            _user_agent_ids.clear()
+        agent_id = _user_agent_ids[value_hash] = agent.id
+    return agent_id
 
 def get_client_ip(request):
     """Client IP manzilini olish"""
@@ -102,4 +139,230 @@ def create_announcement(author, title, content, announcement_type='general',
         None
     )
     
-    return announcement
\ No newline at end of file
+    return announcement
+
+def get_announcement_audience(user):
+    """E'lonlar keshi uchun foydalanuvchi auditoriyasini aniqlash"""
+    if user.is_staff:
+        return 'staff'
+    
+    # O'qituvchi lentasida o'z e'lonlari ham bor, shuning uchun kalitda user id
+    if hasattr(user, 'teacher'):
+        return f'teacher:{user.pk}'
+    
+    # Bir sinf o'quvchilari bitta lentani bo'lishadi
+    if hasattr(user, 'student'):
+        return f'student:{user.student.school_class_id}'
+    
+    return None
+
+def get_cache_version(key):
+    """Kesh versiyasini olish (yo'q bo'lsa yangisini yaratish)"""
+    version = cache.get(key)
+    if version is None:
+        # Eski versiyadagi yozuvlar qayta tirilmasligi uchun vaqtdan foydalanamiz
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+def bump_cache_version(key):
+    """Kesh versiyasini oshirish - eski versiyadagi yozuvlar endi o'qilmaydi"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_cache_version(key)
+
+def get_announcement_feed_version():
+    """Lentalar keshi versiyasini olish (yo'q bo'lsa yangisini yaratish)"""
+    return get_cache_version(ANNOUNCEMENT_FEED_VERSION_KEY)
+
+def invalidate_announcement_feeds():
+    """Barcha e'lonlar lentalarini eskirgan deb belgilash"""
+    bump_cache_version(ANNOUNCEMENT_FEED_VERSION_KEY)
+
+def get_cached_user_announcements(user):
+    """Foydalanuvchi e'lonlarini keshdan olish (so'rov davomida bir marta)"""
+    # Bitta so'rov ichida context processor va view bir xil ro'yxatni ishlatadi
+    feed = getattr(user, '_announcement_feed', None)
+    if feed is not None:
+        return feed
+    
+    audience = get_announcement_audience(user)
+    if audience is None:
+        feed = []
+    else:
+        key = f'announcements:feed:{get_announcement_feed_version()}:{audience}'
+        feed = cache.get(key)
+        if feed is None:
+            feed = announcement_feed_items(get_user_announcements(user))
+            cache.set(key, feed, _announcement_feed_timeout(feed))
+    
+    user._announcement_feed = feed
+    return feed
+
+def announcement_feed_items(announcements):
+    """Lenta keshi uchun e'lonlar - faqat shablonlar o'qiydigan maydonlar lug'at ko'rinishida
+
+    Model obyektlari keshga yozilmaydi: ular bilan birga muallif (User, parol xeshi bilan) ham saqlanar edi.
+    """
+    priorities = dict(Announcement.PRIORITY_LEVELS)
+    types = dict(Announcement.ANNOUNCEMENT_TYPES)
+    rows = announcements.values(
+        'id', 'title', 'content', 'priority', 'announcement_type', 'created_at', 'expiry_date',
+        'author__first_name', 'author__last_name', 'target_class_id', 'target_class__name',
+        'target_subject_id', 'target_subject__name',
+    )
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'priority': row['priority'],
+            'get_priority_display': priorities.get(row['priority'], row['priority']),
+            'announcement_type': row['announcement_type'],
+            'get_announcement_type_display': types.get(row['announcement_type'], row['announcement_type']),
+            'created_at': row['created_at'],
+            'expiry_date': row['expiry_date'],
+            'author': {'get_full_name': f"{row['author__first_name']} {row['author__last_name']}".strip()},
+            'target_class': {'id': row['target_class_id'], 'name': row['target_class__name']} if row['target_class_id'] else None,
+            'target_subject': {'id': row['target_subject_id'], 'name': row['target_subject__name']} if row['target_subject_id'] else None,
+        }
+        for row in rows
+    ]
+
+def _announcement_feed_timeout(feed):
+    """Lenta keshi muddati - eng yaqin e'lon muddati tugaguncha"""
+    timeout = ANNOUNCEMENT_FEED_TIMEOUT
+    now = timezone.now()
+    for announcement in feed:
+        if announcement['expiry_date']:
+            seconds = int((announcement['expiry_date'] - now).total_seconds()) + 1
+            timeout = min(timeout, max(seconds, 1))
+    return timeout
+
+def _teacher_timetable_key(teacher_id):
+    return f'teacher_timetable:{get_cache_version(TEACHER_TIMETABLE_VERSION_KEY)}:{teacher_id}'
+
+def build_teacher_timetable(teacher_id):
+    """O'qituvchining haftalik jadvali va statistikasi - bitta so'rov bilan"""
+    days = {day: [] for day, _ in Schedule.DAY_CHOICES}
+    lessons = Schedule.objects.filter(teacher_id=teacher_id).select_related(
+        'school_class', 'subject'
+    ).order_by('day', 'period')
+    for lesson in lessons:
+        days.setdefault(lesson.day, []).append(lesson)
+
+    all_lessons = [lesson for day_lessons in days.values() for lesson in day_lessons]
+    return {
+        'days': days,
+        'weekly_lessons_count': len(all_lessons),
+        'classes_count': len({lesson.school_class_id for lesson in all_lessons}),
+        'subjects_count': len({lesson.subject_id for lesson in all_lessons}),
+        'busiest_day_count': max(len(day_lessons) for day_lessons in days.values()),
+    }
+
+def get_teacher_timetable(teacher_id):
+    """O'qituvchi jadvalini keshdan olish (jadval o'zgarguncha saqlanadi)"""
+    key = _teacher_timetable_key(teacher_id)
+    timetable = cache.get(key)
+    if timetable is None:
+        timetable = build_teacher_timetable(teacher_id)
+        cache.set(key, timetable, TEACHER_TIMETABLE_TIMEOUT)
+    return timetable
+
+def invalidate_teacher_timetable(teacher_id):
+    """Bitta o'qituvchi jadvali keshini o'chirish"""
+    cache.delete(_teacher_timetable_key(teacher_id))
+
+def invalidate_teacher_timetables():
+    """Barcha o'qituvchilar jadvallarini eskirgan deb belgilash (sinf yoki fan nomi o'zgarganda)"""
+    bump_cache_version(TEACHER_TIMETABLE_VERSION_KEY)
+
+def bulk_save_attendance(teacher, date, subject_id, period, attendance_data, class_id=None):
+    """Butun sinf davomatini bitta tranzaksiyada saqlash
+    
+    Har bir qator uchun {'student_id', 'success', 'error'} natijasi qaytariladi.
+    """
+    valid_statuses = {status for status, _ in Attendance.ATTENDANCE_CHOICES}
+    
+    # Barcha o'quvchilarni bitta so'rovda tekshirish
+    requested_ids = set()
+    for item in attendance_data:
+        try:
+            requested_ids.add(int(item.get('student_id')))
+        except (TypeError, ValueError):
+            pass
+    students = Student.objects.filter(id__in=requested_ids)
+    if class_id:
+        students = students.filter(school_class_id=class_id)
+    student_classes = dict(students.values_list('id', 'school_class_id'))
+    known_ids = set(student_classes)
+    
+    results = []
+    records = {}
+    for item in attendance_data:
+        student_id = item.get('student_id')
+        status = item.get('status')
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            results.append({'student_id': student_id, 'success': False, 'error': "Noto'g'ri o'quvchi ID"})
+            continue
+        
+        if student_id not in known_ids:
+            results.append({'student_id': student_id, 'success': False, 'error': "O'quvchi topilmadi"})
+            continue
+        if status not in valid_statuses:
+            results.append({'student_id': student_id, 'success': False, 'error': f"Noto'g'ri holat: {status}"})
+            continue
+        
+        # Bir o'quvchi takrorlansa oxirgi qiymat saqlanadi
+        records[student_id] = Attendance(
+            student_id=student_id,
+            teacher=teacher,
+            subject_id=subject_id,
+            date=date,
+            period=period,
+            status=status,
+            comment=item.get('comment', '') or '',
+        )
+        results.append({'student_id': student_id, 'success': True, 'error': None})
+    
+    update_fields = ['status', 'comment', 'teacher', 'updated_at']
+    with transaction.atomic():
+        if subject_id and period:
+            # unique_together kaliti bo'yicha bitta upsert
+            Attendance.objects.bulk_create(
+                records.values(),
+                update_conflicts=True,
+                unique_fields=['student', 'date', 'subject', 'period'],
+                update_fields=update_fields,
+            )
+        elif records:
+            # NULL kalitlar UNIQUE cheklovida to'qnashmaydi, shuning uchun mavjudlarini yangilaymiz
+            existing = {
+                attendance.student_id: attendance
+                for attendance in Attendance.objects.filter(
+                    student_id__in=records.keys(), date=date, subject_id=subject_id, period=period
+                )
+            }
+            now = timezone.now()
+            to_update = []
+            for student_id, record in list(records.items()):
+                attendance = existing.get(student_id)
+                if attendance:
+                    attendance.status = record.status
+                    attendance.comment = record.comment
+                    attendance.teacher = teacher
+                    attendance.updated_at = now
+                    to_update.append(attendance)
+                    del records[student_id]
+            Attendance.objects.bulk_update(to_update, update_fields)
+            Attendance.objects.bulk_create(records.values())
+        
+        # Kunlik yig'indini faqat tegishli sinflar uchun yangilash
+        saved_classes = {student_classes[r['student_id']] for r in results if r['success']}
+        refresh_daily_summary(date, saved_classes, subject_id)
+    
+    return results
+
@@ -1,18 +1,32 @@
 # main/views.py
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import HttpResponse, HttpResponseForbidden,JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden,JsonResponse,StreamingHttpResponse,FileResponse
 from django.contrib.auth import logout,authenticate,login
 from django.contrib import messages
-from django.db import transaction, models
+from django.db import IntegrityError, transaction, models
 from django.utils import timezone
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from .models import SchoolClass, Student, Teacher, Subject, ActivityLog,Schedule,Announcement,Attendance
+from .models import SchoolClass, Student, Teacher, Subject, ActivityLog,Schedule,Announcement,Attendance,ReportJob,Grade,GradeSummary
+from .analytics import get_school_analytics
+from .archive import archive_months, archived_activities, attach_users
+from .counters import get_totals
+from .pagination import keyset_paginate, keyset_paginate_stream, estimate_count
+from .gradebook import GRADE_VALUES, RECENT_MARKS, get_class_rankings, get_subject_ranking, grade_level, record_grades
 from .forms import UserForm, StudentForm, TeacherForm,SubjectForm,SchoolClassForm,ScheduleForm,TeacherAnnouncementForm,AnnouncementForm
-from .utils import log_activity, get_recent_activities ,get_user_announcements # Yangi qo'shildi
+from .report_jobs import enqueue_report_job, report_job_path, report_params
+from .schedule_import import ScheduleImportError, import_schedule, read_schedule_file
+from .search import search_activities
+from .timetable import WEEK_DAYS, get_bell_schedule, get_class_timetable, timetable_rows, weekday_name
+from .reports import REPORT_BUILDERS, REPORT_FORMATS, REPORT_TYPES, build_report, stream_csv, stream_xlsx
+from .stats import get_monthly_attendance_stats, get_attendance_stats, get_class_attendance_summary, month_bounds
+from .utils import log_activity, get_recent_activities ,get_user_announcements, get_cached_user_announcements, bulk_save_attendance, get_teacher_timetable # Yangi qo'shildi
 from datetime import datetime, timedelta
 import json
+import os
+from urllib.parse import urlencode
 from django.views.decorators.csrf import csrf_exempt
 
 def home(request):
@@ -70,28 +84,17 @@ def login_view(request):
             login(request, user)
 
             # 🔥 tizimga kirganini logga yozamiz
-            ip = request.META.get('REMOTE_ADDR')
-            ua = request.META.get('HTTP_USER_AGENT', '')
-            ActivityLog.objects.create(
-                user=user,
-                activity_type='user_login',
-                description=f"{user.username} tizimga kirdi.",
-                ip_address=ip,
-                user_agent=ua
-            )
+            log_activity(user, 'user_login', f"{user.username} tizimga kirdi.", request)
 
             return redirect("dashboard")  # yoki sizdagi asosiy sahifa
 
         else:
             # ❌ foydalanuvchi noto‘g‘ri parol yoki login kiritgan
-            ip = request.META.get('REMOTE_ADDR')
-            ua = request.META.get('HTTP_USER_AGENT', '')
-            ActivityLog.objects.create(
-                user=None,
-                activity_type='user_status_changed',
-                description=f"'{username}' tizimga kirishga urindi, ammo xato.",
-                ip_address=ip,
-                user_agent=ua
+            log_activity(
+                None,
+                'user_status_changed',
+                f"'{username}' tizimga kirishga urindi, ammo xato.",
+                request
             )
 
             # ixtiyoriy: xabar ko‘rsatish uchun kontekst
@@ -121,7 +124,7 @@ def student_dashboard(request):
         return redirect('home')
     
     # ✅ E'lonlarni qo'shamiz
-    recent_announcements = get_user_announcements(request.user)[:5]  # So'nggi 5 ta e'lon
+    recent_announcements = get_cached_user_announcements(request.user)[:5]  # So'nggi 5 ta e'lon
     
     return render(request, 'student/index.html', {
         'recent_announcements': recent_announcements  # ✅ Qo'shildi
@@ -131,13 +134,86 @@ def student_dashboard(request):
 def student_grades(request):
     if not hasattr(request.user, 'student'):
         return redirect('home')
-    return render(request, 'student/baholar.html')
+    
+    student = request.user.student
+    rankings = get_class_rankings(student.school_class_id)
+    
+    # Har bir fan bo'yicha so'nggi baholar
+    recent = {}
+    for subject_id, value in Grade.objects.filter(
+        student=student, value__isnull=False
+    ).order_by('-date', '-id').values_list('subject_id', 'value')[:200]:
+        marks = recent.setdefault(subject_id, [])
+        if len(marks) < RECENT_MARKS:
+            marks.append(value)
+    
+    subjects = []
+    for summary in GradeSummary.objects.filter(student=student).select_related('subject').order_by('subject__name'):
+        ranking = rankings['subjects'].get(summary.subject_id, [])
+        row = next((row for row in ranking if row['student_id'] == student.id), None)
+        label, css_class = grade_level(summary.average_score)
+        subjects.append({
+            'name': summary.subject.name,
+            'average': summary.average_score,
+            'marks_count': summary.marks_count,
+            'recent_marks': [(mark, grade_level(mark)[1]) for mark in reversed(recent.get(summary.subject_id, []))],
+            'rank': row['rank'] if row else None,
+            'class_size': len(ranking),
+            'label': label,
+            'css_class': css_class,
+            'percent': round(summary.average_score * 20),
+        })
+    
+    overall = next((row for row in rankings['overall'] if row['student_id'] == student.id), None)
+    average = overall['average'] if overall else 0
+    context = {
+        'subjects': subjects,
+        'average': average,
+        'average_label': grade_level(average)[0],
+        'rank': overall['rank'] if overall else None,
+        'class_size': len(rankings['overall']),
+        'marks_count': sum(subject['marks_count'] for subject in subjects),
+        'excellent_count': sum(1 for subject in subjects if subject['average'] >= 4.5),
+        'low_count': sum(1 for subject in subjects if 0 < subject['average'] < 2.5),
+    }
+    return render(request, 'student/baholar.html', context)
 
 @login_required
 def student_schedule(request):
     if not hasattr(request.user, 'student'):
         return redirect('home')
-    return render(request, 'student/jadval.html')
+    
+    # Sinf jadvali keshdan - so'rovlar soni o'quvchilar soniga bog'liq emas
+    timetable = get_class_timetable(request.user.student.school_class_id)
+    bell_schedule = get_bell_schedule()
+    
+    # Bugungi darslar va ularning holati
+    now = timezone.localtime()
+    today = weekday_name(now)
+    today_lessons = []
+    if today:
+        periods = {period['number']: period for period in bell_schedule.periods(today)}
+        current_number = bell_schedule.period_at(today, now.time())
+        for lesson in timetable['matrix'][WEEK_DAYS.index(today)]:
+            if lesson is None:
+                continue
+            period = periods.get(lesson['period'])
+            today_lessons.append({
+                **lesson,
+                'time_slot': period['time_slot'] if period else '',
+                'is_current': lesson['period'] == current_number,
+                'is_finished': period is not None and period['end'] <= now.time(),
+            })
+    
+    context = {
+        'class_name': timetable['class_name'],
+        'rows': timetable_rows(timetable['matrix'], bell_schedule),
+        'today_name': dict(Schedule.DAY_CHOICES).get(today, 'Yakshanba'),
+        'today_lessons': today_lessons,
+        'subject_counts': timetable['subject_counts'],
+        'lessons_count': timetable['lessons_count'],
+    }
+    return render(request, 'student/jadval.html', context)
 
 @login_required
 def student_attendance(request):
@@ -154,7 +230,7 @@ def student_announcements(request):
     student = request.user.student
     
     # Studentga tegishli e'lonlar
-    announcements = get_user_announcements(request.user)
+    announcements = get_cached_user_announcements(request.user)
     
     context = {
         'announcements': announcements,
@@ -177,7 +253,7 @@ def teacher_dashboard(request):
     teacher = request.user.teacher
     
     # ✅ E'lonlarni qo'shamiz
-    recent_announcements = get_user_announcements(request.user)[:5]  # So'nggi 5 ta e'lon
+    recent_announcements = get_cached_user_announcements(request.user)[:5]  # So'nggi 5 ta e'lon
     
     context = {
         'teacher': teacher,
@@ -197,11 +273,85 @@ def teacher_grades(request):
         return redirect('home')
     
     teacher = request.user.teacher
+    
+    # Sinflar va fanlar o'qituvchining keshlangan jadvalidan
+    lessons = [lesson for day_lessons in get_teacher_timetable(teacher.id)['days'].values() for lesson in day_lessons]
+    classes = sorted({lesson.school_class for lesson in lessons}, key=lambda school_class: school_class.name)
+    subjects = sorted({lesson.subject for lesson in lessons}, key=lambda subject: subject.name)
+    
+    selected_class = next((c for c in classes if str(c.id) == request.GET.get('class_id')), None)
+    selected_subject = next((s for s in subjects if str(s.id) == request.GET.get('subject_id')), None)
+    
+    students = []
+    class_ranking = []
+    stats = {}
+    if selected_class and selected_subject:
+        class_ranking = get_class_rankings(selected_class.id)['subjects'].get(selected_subject.id, [])
+        ranks = {row['student_id']: row for row in class_ranking}
+        students = list(Student.objects.filter(school_class=selected_class).select_related('user').order_by(
+            'user__last_name', 'user__first_name'
+        ))
+        for student in students:
+            row = ranks.get(student.id)
+            student.average = row['average'] if row else 0
+            student.marks_count = row['marks_count'] if row else 0
+            student.rank = row['rank'] if row else None
+            student.grade_label, student.grade_class = grade_level(student.average)
+        
+        averages = [row['average'] for row in class_ranking]
+        stats = {
+            'average': round(sum(averages) / len(averages), 2) if averages else 0,
+            'excellent_count': sum(1 for average in averages if average >= 4.5),
+            'low_count': sum(1 for average in averages if average < 2.5),
+            'graded_percent': round(len(averages) / len(students) * 100) if students else 0,
+            'students_count': len(students),
+        }
+    
     context = {
         'teacher': teacher,
+        'classes': classes,
+        'subjects': subjects,
+        'selected_class': selected_class,
+        'selected_subject': selected_subject,
+        'students': students,
+        'stats': stats,
+        'subject_ranking': get_subject_ranking(selected_subject.id) if selected_subject else [],
+        'grade_values': GRADE_VALUES,
     }
     return render(request, 'teacher/teacher-grades.html', context)
 
+@login_required
+def save_grades(request):
+    """Butun sinf baholarini bitta so'rovda saqlash (JSON)"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Faqat POST so\'rovi qabul qilinadi'})
+    if not hasattr(request.user, 'teacher'):
+        return JsonResponse({'success': False, 'error': 'Faqat o\'qituvchilar baho qo\'yishi mumkin'})
+    
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return JsonResponse({'success': False, 'error': f'JSON dekodlash xatosi: {str(e)}'})
+    
+    try:
+        subject_id = int(data.get('subject_id'))
+        class_id = int(data.get('class_id'))
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Sinf va fan ko\'rsatilishi kerak'}, status=400)
+    
+    # O'qituvchi faqat jadvalida bor sinf va fanga baho qo'ya oladi (teacher_grades bilan bir xil)
+    if not Schedule.objects.filter(teacher=request.user.teacher, school_class_id=class_id, subject_id=subject_id).exists():
+        return JsonResponse({'success': False, 'error': 'Siz bu sinfga ushbu fandan dars bermaysiz'}, status=403)
+    
+    results = record_grades(subject_id, data.get('marks', []), class_id=class_id)
+    saved_count = sum(1 for result in results if result['success'])
+    return JsonResponse({
+        'success': True,
+        'message': f'{saved_count} ta baho saqlandi',
+        'saved_count': saved_count,
+        'results': results,
+    })
+
 @login_required
 def teacher_attendance(request):
     if not hasattr(request.user, 'teacher'):
@@ -243,56 +393,56 @@ def teacher_attendance(request):
     
     # O'quvchilar
     students = []
+    absent_with_reason_count = 0
+    absent_without_reason_count = 0
     if selected_class_id:
-        students = Student.objects.filter(
+        students = list(Student.objects.filter(
             school_class_id=selected_class_id
-        ).select_related('user', 'school_class')
+        ).select_related('user', 'school_class'))
+        
+        # Butun sinf davomati bitta so'rovda
+        attendance_records = Attendance.objects.filter(
+            student__school_class_id=selected_class_id,
+            date=current_date,
+            subject_id=selected_subject_id or None,
+            period=selected_period or None,
+            teacher=teacher
+        )
+        attendance_by_student = {
+            attendance.student_id: attendance for attendance in attendance_records
+        }
         
         # Davomat ma'lumotlarini qo'shish
         for student in students:
-            try:
-                attendance = Attendance.objects.filter(
-                    student=student,
-                    date=current_date,
-                    subject_id=selected_subject_id,
-                    period=selected_period,
-                    teacher=teacher
-                ).first()
-                
-                if attendance:
-                    student.attendance_status = attendance.status
-                    student.comment = attendance.comment
-                    student.last_updated = attendance.updated_at.strftime('%d.%m.%Y %H:%M')
-                else:
-                    student.attendance_status = 'present'  # Default holat
-                    student.comment = ''
-                    student.last_updated = '-'
-                    
-            except Exception as e:
-                student.attendance_status = 'present'
+            attendance = attendance_by_student.get(student.id)
+            if attendance:
+                student.attendance_status = attendance.status
+                student.comment = attendance.comment
+                student.last_updated = attendance.updated_at.strftime('%d.%m.%Y %H:%M')
+            else:
+                student.attendance_status = 'present'  # Default holat
                 student.comment = ''
                 student.last_updated = '-'
+        
+        # Sababli/sababsiz sonlari bitta aggregate so'rovida
+        absent_counts = attendance_records.aggregate(
+            with_reason=models.Count('id', filter=models.Q(status='absent_with_reason')),
+            without_reason=models.Count('id', filter=models.Q(status='absent_without_reason')),
+        )
+        absent_with_reason_count = absent_counts['with_reason']
+        absent_without_reason_count = absent_counts['without_reason']
     
-    # Statistik ma'lumotlar
+    # Statistik ma'lumotlar (yozuvi yo'q o'quvchilar "keldi" hisoblanadi)
     total_students = len(students)
-    present_count = len([s for s in students if getattr(s, 'attendance_status', 'present') == 'present'])
-    absent_with_reason_count = len([s for s in students if getattr(s, 'attendance_status', 'present') == 'absent_with_reason'])
-    absent_without_reason_count = len([s for s in students if getattr(s, 'attendance_status', 'present') == 'absent_without_reason'])
+    present_count = total_students - absent_with_reason_count - absent_without_reason_count
     
     # Foizlarni hisoblash
     present_percentage = round((present_count / total_students * 100)) if total_students > 0 else 0
     absent_with_reason_percentage = round((absent_with_reason_count / total_students * 100)) if total_students > 0 else 0
     absent_without_reason_percentage = round((absent_without_reason_count / total_students * 100)) if total_students > 0 else 0
     
-    # Oylik statistika (demo)
-    monthly_stats = {
-        'attendance_rate': 94,
-        'absent_without_reason': 2,
-        'absent_with_reason': 5,
-        'total_days': 22,
-        'max_attendance': 18,
-        'average_attendance': 15,
-    }
+    # Oylik statistika
+    monthly_stats = get_monthly_stats(teacher, current_date, selected_class_id, selected_subject_id)
     
     # Sana navigatsiyasi
     prev_date = (current_date - timedelta(days=1)).strftime('%Y-%m-%d')
@@ -332,12 +482,7 @@ def teacher_attendance(request):
         'selected_period': selected_period,
         'selected_class': classes.filter(id=selected_class_id).first() if selected_class_id else None,
         'selected_subject': subjects.filter(id=selected_subject_id).first() if selected_subject_id else None,
-        'periods': [
-            {'number': 1, 'time_slot': '08:00-08:45'},
-            {'number': 2, 'time_slot': '09:00-09:45'},
-            {'number': 3, 'time_slot': '10:00-10:45'},
-            {'number': 4, 'time_slot': '11:00-11:45'},
-        ],
+        'periods': get_bell_schedule().periods(weekday_name(current_date)),
         'present_count': present_count,
         'absent_with_reason_count': absent_with_reason_count,
         'absent_without_reason_count': absent_without_reason_count,
@@ -354,70 +499,45 @@ def teacher_attendance(request):
 @login_required
 @csrf_exempt
 def save_attendance(request):
-    """Davomat ma'lumotlarini saqlash"""
+    """Davomat ma'lumotlarini saqlash (butun sinf bitta tranzaksiyada)"""
     if request.method == 'POST':
+        if not hasattr(request.user, 'teacher'):
+            return JsonResponse({
+                'success': False, 
+                'error': 'Faqat o\'qituvchilar davomat saqlashi mumkin'
+            })
+        
         try:
             # JSON ma'lumotlarini o'qish
             data = json.loads(request.body.decode('utf-8'))
             date_str = data.get('date')
             class_id = data.get('class_id')
-            subject_id = data.get('subject_id')
-            period = data.get('period')
+            subject_id = data.get('subject_id') or None
+            period = data.get('period') or None
             attendance_data = data.get('attendance_data', [])
             
-            print(f"Saqlash so'rovi: {data}")  # Debug uchun
-            
             # Sana formatini o'zgartirish
-            from datetime import datetime
             date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            if period is not None:
+                period = int(period)
             
-            saved_count = 0
+            # Fanni tekshirish
+            if subject_id and not Subject.objects.filter(id=subject_id).exists():
+                return JsonResponse({
+                    'success': False, 
+                    'error': f'Fan topilmadi: {subject_id}'
+                })
             
-            # Har bir o'quvchi uchun davomatni saqlash
-            for item in attendance_data:
-                student_id = item.get('student_id')
-                status = item.get('status')
-                comment = item.get('comment', '')
-                
-                # O'quvchini topish
-                try:
-                    student = Student.objects.get(id=student_id)
-                    
-                    # Fan va sinfni tekshirish
-                    subject = None
-                    if subject_id:
-                        subject = Subject.objects.get(id=subject_id)
-                    
-                    # Davomat yaratish yoki yangilash
-                    attendance, created = Attendance.objects.update_or_create(
-                        student=student,
-                        date=date,
-                        subject=subject,
-                        period=period if period else None,
-                        defaults={
-                            'status': status,
-                            'comment': comment,
-                            'teacher': request.user.teacher
-                        }
-                    )
-                    
-                    saved_count += 1
-                    print(f"Saqlandi: {student.user.get_full_name()} - {status}")
-                    
-                except Student.DoesNotExist:
-                    print(f"O'quvchi topilmadi: {student_id}")
-                    continue
-                except Subject.DoesNotExist:
-                    print(f"Fan topilmadi: {subject_id}")
-                    continue
-                except Exception as e:
-                    print(f"Xatolik: {str(e)}")
-                    continue
+            results = bulk_save_attendance(
+                request.user.teacher, date, subject_id, period, attendance_data, class_id=class_id
+            )
+            saved_count = sum(1 for result in results if result['success'])
             
             return JsonResponse({
                 'success': True, 
                 'message': f'{saved_count} ta davomat saqlandi',
-                'saved_count': saved_count
+                'saved_count': saved_count,
+                'results': results,
             })
             
         except json.JSONDecodeError as e:
@@ -436,31 +556,25 @@ def save_attendance(request):
         'error': 'Noto\'g\'ri so\'rov usuli. Faqat POST so\'rovi qabul qilinadi.'
     })
 
-def get_monthly_stats(teacher, current_date):
-    # Oylik statistikani hisoblash
-    start_of_month = current_date.replace(day=1)
-    if current_date.month == 12:
-        end_of_month = current_date.replace(year=current_date.year + 1, month=1, day=1) - timedelta(days=1)
-    else:
-        end_of_month = current_date.replace(month=current_date.month + 1, day=1) - timedelta(days=1)
-    
-    # Demo ma'lumotlar - haqiqiy loyihada database dan olinadi
-    return {
-        'attendance_rate': 94,
-        'absent_without_reason': 2,
-        'absent_with_reason': 5,
-        'total_days': 22,
-        'max_attendance': 18,
-        'average_attendance': 15,
-    }
+def get_monthly_stats(teacher, current_date, school_class_id=None, subject_id=None):
+    """Oylik davomat statistikasi (kunlik yig'indi jadvalidan)"""
+    return get_monthly_attendance_stats(
+        current_date, teacher=teacher, school_class=school_class_id, subject=subject_id
+    )
+
+@login_required
 def teacher_schedule(request):
+    """O'qituvchi haftalik dars jadvali"""
+    if not hasattr(request.user, 'teacher'):
+        return redirect('home')
+    
     teacher = request.user.teacher
     
     # Hafta parametrini olish
     week_offset = int(request.GET.get('week', 0))
     
     # Joriy sanani olish
-    today = timezone.now().date()
+    today = timezone.localdate()
     
     # Hafta boshi (Dushanba) ni hisoblash
     start_of_week = today - timedelta(days=today.weekday()) + timedelta(weeks=week_offset)
@@ -484,48 +598,23 @@ def teacher_schedule(request):
     else:
         week_dates = f"{start_of_week.day} {month_names[start_of_week.month]} - {end_of_week.day} {month_names[end_of_week.month]} {start_of_week.year}"
     
-    # O'qituvchining dars jadvalini olish
-    schedules = Schedule.objects.filter(teacher=teacher).select_related(
-        'school_class', 'subject'
-    )
-    
-    # Kunlar bo'yicha guruhlash
-    schedule_data = {
-        'monday': schedules.filter(day='monday').order_by('period'),
-        'tuesday': schedules.filter(day='tuesday').order_by('period'),
-        'wednesday': schedules.filter(day='wednesday').order_by('period'),
-        'thursday': schedules.filter(day='thursday').order_by('period'),
-        'friday': schedules.filter(day='friday').order_by('period'),
-        'saturday': schedules.filter(day='saturday').order_by('period'),
-    }
-    
-    # Dars soatlari
-    periods = [
-        {'number': 1, 'time_slot': '08:00-08:45'},
-        {'number': 2, 'time_slot': '09:00-09:45'},
-        {'number': 3, 'time_slot': '10:00-10:45'},
-        {'number': 4, 'time_slot': '11:00-11:45'},
-        {'number': 5, 'time_slot': '12:00-12:45'},
-        {'number': 6, 'time_slot': '13:00-13:45'},
-        {'number': 7, 'time_slot': '14:00-14:45'},
-        {'number': 8, 'time_slot': '15:00-15:45'},
-    ]
+    # Jadval va statistika bitta so'rovdan, o'qituvchi bo'yicha keshlanadi
+    timetable = get_teacher_timetable(teacher.id)
+    schedule_data = timetable['days']
+    bell_schedule = get_bell_schedule()
+    periods = bell_schedule.periods()
     
     # Bugungi darslar
-    today_name = today.strftime('%A').lower()
-    today_lessons = schedules.filter(day=today_name).order_by('period')
+    today_name = weekday_name(today)
+    today_lessons = schedule_data.get(today_name, [])
     
-    # Joriy darsni aniqlash
-    current_time = timezone.now().time()
+    # Joriy darsni aniqlash (qo'ng'iroqlar jadvalidan bisect bilan)
+    current_number = bell_schedule.period_at(today_name, timezone.localtime().time())
     for lesson in today_lessons:
-        lesson_time = datetime.strptime(lesson.time_slot.split('-')[0], '%H:%M').time()
-        lesson.is_current = (lesson_time <= current_time)
+        lesson.time_slot = bell_schedule.time_slot(today_name, lesson.period)
+        lesson.is_current = lesson.period == current_number
     
-    # Statistik ma'lumotlar
-    weekly_lessons_count = schedules.count()
-    classes_count = schedules.values('school_class').distinct().count()
-    subjects_count = schedules.values('subject').distinct().count()
-    weekly_hours = round(weekly_lessons_count * 0.75, 1)
+    weekly_lessons_count = timetable['weekly_lessons_count']
     
     context = {
         'teacher': teacher,
@@ -536,11 +625,11 @@ def teacher_schedule(request):
         'current_week_number': week_number,
         'current_week_offset': week_offset,
         'weekly_lessons_count': weekly_lessons_count,
-        'classes_count': classes_count,
-        'subjects_count': subjects_count,
-        'weekly_hours': weekly_hours,
+        'classes_count': timetable['classes_count'],
+        'subjects_count': timetable['subjects_count'],
+        'weekly_hours': round(weekly_lessons_count * 0.75, 1),
         'empty_slots_count': len(periods) * 6 - weekly_lessons_count,
-        'busiest_day_count': max([schedule_data[day].count() for day in schedule_data]),
+        'busiest_day_count': timetable['busiest_day_count'],
     }
     
     return render(request, 'teacher/teacher-schedule.html', context)
@@ -557,7 +646,7 @@ def teacher_announcements(request):
     my_announcements = Announcement.objects.filter(author=request.user)
     
     # O'qituvchiga tegishli e'lonlar
-    relevant_announcements = get_user_announcements(request.user)
+    relevant_announcements = get_cached_user_announcements(request.user)
     
     context = {
         'teacher': teacher,
@@ -622,32 +711,95 @@ def admin_required(function):
 @admin_required
 def admin_dashboard(request):
     """Admin asosiy sahifasi"""
-    # Statistik ma'lumotlarni hisoblash
-    students_count = Student.objects.count()
-    teachers_count = Teacher.objects.count()
-    classes_count = SchoolClass.objects.count()
+    # Umumiy sonlar signallar bilan yangilanadigan keshdan
+    totals = get_totals('students', 'teachers', 'classes')
     
     # So'nggi faoliyatlarni olish
     recent_activities = get_recent_activities(5)
     
+    # Joriy oy davomati (kunlik yig'indi jadvalidan)
+    today = timezone.localdate()
+    attendance_stats = get_monthly_attendance_stats(today)
+    
+    # Joriy oy tahlili (baholar kvartillari, davomat taqsimoti)
+    analytics = get_school_analytics(month_bounds(today)[0], today)
+    
     context = {
-        'students_count': students_count,
-        'teachers_count': teachers_count,
-        'classes_count': classes_count,
+        'students_count': totals['students'],
+        'teachers_count': totals['teachers'],
+        'classes_count': totals['classes'],
         'recent_activities': recent_activities,
+        'attendance_stats': attendance_stats,
+        'analytics': analytics,
     }
     return render(request, 'admin/admin-index.html', context)
 
 @login_required
 @admin_required
 def admin_users(request):
-    """Barcha foydalanuvchilarni ko'rsatish"""
-    students = Student.objects.select_related('user', 'school_class').all()
-    teachers = Teacher.objects.select_related('user').prefetch_related('subjects').all()
+    """Foydalanuvchilar ro'yxati - server tomonida filtrlash va keyset sahifalash
+    
+    format=json bo'lsa keyingi sahifa qatorlari HTML bo'lagi sifatida qaytariladi (cheksiz aylantirish).
+    """
+    role = request.GET.get('role', 'all')
+    status = request.GET.get('status', 'all')
+    class_id = request.GET.get('class_id', '')
+    search = request.GET.get('search', '').strip()
+    
+    # Jadvalda ko'rsatiladigan maydonlargina o'qiladi
+    users = User.objects.select_related('student__school_class', 'teacher').only(
+        'username', 'first_name', 'last_name', 'email', 'is_active', 'date_joined',
+        'student__phone_number', 'student__school_class__name', 'teacher__phone_number',
+    ).prefetch_related(
+        models.Prefetch('teacher__subjects', queryset=Subject.objects.only('name'))
+    )
+    
+    if role == 'student':
+        users = users.filter(student__isnull=False)
+    elif role == 'teacher':
+        users = users.filter(teacher__isnull=False)
+    else:
+        users = users.filter(models.Q(student__isnull=False) | models.Q(teacher__isnull=False))
+    
+    if class_id.isdigit():
+        users = users.filter(student__school_class_id=class_id)
+    
+    if status in ('active', 'inactive'):
+        users = users.filter(is_active=status == 'active')
+    
+    for term in search.split():
+        users = users.filter(
+            models.Q(username__icontains=term) | models.Q(first_name__icontains=term) | models.Q(last_name__icontains=term)
+        )
+    
+    # Eng yangi foydalanuvchilar birinchi
+    users_page = keyset_paginate(
+        users, after=request.GET.get('after'), per_page=50, field='date_joined',
+    )
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'html': render_to_string('admin/admin-users-rows.html', {'users': users_page}, request=request),
+            'next_cursor': users_page.next_cursor,
+        })
+    
+    filter_query = urlencode({
+        key: value for key, value in {
+            'role': role if role != 'all' else '',
+            'status': status if status != 'all' else '',
+            'class_id': class_id,
+            'search': search,
+        }.items() if value
+    })
     
     context = {
-        'students': students,
-        'teachers': teachers,
+        'users': users_page,
+        'classes': SchoolClass.objects.only('name'),
+        'current_role': role,
+        'current_status': status,
+        'current_class': class_id,
+        'search': search,
+        'filter_query': filter_query,
     }
     return render(request, 'admin/admin-users.html', context)
 
@@ -656,8 +808,133 @@ def admin_users(request):
 @admin_required
 def admin_reports(request):
     """Hisobotlar"""
-    return render(request, 'admin/admin-reports.html')
+    date_from, date_to = get_report_date_range(request)
+    
+    # Davomat kunlik yig'indi jadvalidan o'qiladi
+    context = {
+        'date_from': date_from,
+        'date_to': date_to,
+        'attendance_stats': get_attendance_stats(date_from, date_to),
+        'class_attendance': get_class_attendance_summary(date_from, date_to),
+        'analytics': get_school_analytics(date_from, date_to),
+        'report_types': REPORT_TYPES,
+        'classes': SchoolClass.objects.all(),
+        'subjects': Subject.objects.all(),
+        'report_jobs': ReportJob.objects.filter(requested_by=request.user)[:5],
+    }
+    return render(request, 'admin/admin-reports.html', context)
+
+@login_required
+@admin_required
+def admin_report_export(request):
+    """Hisobotni CSV/XLSX ko'rinishida oqim bilan yuklab berish"""
+    report_type = request.GET.get('report', 'attendance')
+    file_format = request.GET.get('format', 'csv')
+    if report_type not in REPORT_BUILDERS or file_format not in REPORT_FORMATS:
+        messages.error(request, 'Noto\'g\'ri hisobot turi yoki formati!')
+        return redirect('admin_reports')
+    
+    date_from, date_to = get_report_date_range(request)
+    try:
+        params = report_params(
+            report_type, file_format, date_from, date_to,
+            class_id=request.GET.get('class_id'), subject_id=request.GET.get('subject_id'),
+        )
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('admin_reports')
+    
+    headers, rows = build_report(
+        report_type, date_from, date_to, school_class=params['class_id'], subject=params['subject_id']
+    )
+    
+    # Faoliyat tarixiga yozish
+    log_activity(
+        request.user,
+        'report_generated',
+        f"Hisobot yaratildi: {dict(REPORT_TYPES)[report_type]} ({date_from} - {date_to}, {file_format.upper()})",
+        request
+    )
+    
+    if file_format == 'xlsx':
+        response = StreamingHttpResponse(
+            stream_xlsx(headers, rows),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    else:
+        response = StreamingHttpResponse(stream_csv(headers, rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{report_type}_{date_from}_{date_to}.{file_format}"'
+    return response
 
+@login_required
+@admin_required
+def admin_report_job_create(request):
+    """Katta hisobotni fonda yaratish uchun navbatga qo'yish"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Faqat POST so\'rovi qabul qilinadi.'})
+    
+    report_type = request.POST.get('report', 'attendance')
+    file_format = request.POST.get('format', 'csv')
+    if report_type not in REPORT_BUILDERS or file_format not in REPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Noto\'g\'ri hisobot turi yoki formati!'})
+    
+    date_from, date_to = get_report_date_range(request, request.POST)
+    try:
+        params = report_params(
+            report_type, file_format, date_from, date_to,
+            class_id=request.POST.get('class_id'), subject_id=request.POST.get('subject_id'),
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    job = enqueue_report_job(params, user=request.user)
+    return JsonResponse({'success': True, **report_job_payload(job)})
+
+@login_required
+@admin_required
+def admin_report_job_status(request, job_id):
+    """Hisobot vazifasi holati (sahifa so'rab turadi)"""
+    job = ReportJob.objects.filter(id=job_id).only('id', 'status', 'error').first()
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Vazifa topilmadi'}, status=404)
+    return JsonResponse({'success': True, **report_job_payload(job)})
+
+@login_required
+@admin_required
+def admin_report_job_download(request, job_id):
+    """Tayyor hisobot faylini yuklab berish"""
+    job = get_object_or_404(ReportJob, id=job_id, status='done')
+    path = report_job_path(job)
+    if not os.path.exists(path):
+        messages.error(request, 'Hisobot fayli topilmadi, qaytadan yarating!')
+        return redirect('admin_reports')
+    
+    params = job.params
+    filename = f"{params['report']}_{params['date_from']}_{params['date_to']}.{params['format']}"
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
+def report_job_payload(job):
+    """Vazifa holatining JSON ko'rinishi"""
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'error': job.error,
+        'status_url': reverse('admin_report_job_status', args=[job.id]),
+        'download_url': reverse('admin_report_job_download', args=[job.id]) if job.status == 'done' else None,
+    }
+
+def get_report_date_range(request, data=None):
+    """Hisobot uchun sana oralig'i (standart - joriy oy)"""
+    data = request.GET if data is None else data
+    start_of_month, next_month = month_bounds(timezone.localdate())
+    try:
+        date_from = datetime.strptime(data.get('date_from', ''), '%Y-%m-%d').date()
+    except ValueError:
+        date_from = start_of_month
+    try:
+        date_to = datetime.strptime(data.get('date_to', ''), '%Y-%m-%d').date()
+    except ValueError:
+        date_to = next_month - timedelta(days=1)
+    return date_from, date_to
 
 
 @login_required
@@ -852,37 +1129,59 @@ def admin_activities(request):
     date_to = request.GET.get('date_to')
     search = request.GET.get('search', '')
     
-    # Faoliyatlarni olish
-    activities = ActivityLog.objects.select_related('user').all()
-    
-    # Filtrlash
-    if activity_type != 'all':
-        activities = activities.filter(activity_type=activity_type)
-    
-    if date_from:
-        activities = activities.filter(created_at__gte=date_from)
-    
-    if date_to:
-        activities = activities.filter(created_at__lte=date_to)
-    
-    if search:
-        activities = activities.filter(
-            models.Q(description__icontains=search) |
-            models.Q(user__username__icontains=search) |
-            models.Q(user__first_name__icontains=search) |
-            models.Q(user__last_name__icontains=search)
+    # Arxiv oyi tanlansa yozuvlar bazadan emas, arxiv faylidan o'qiladi
+    months = archive_months()
+    archive = request.GET.get('archive', '')
+    if archive not in months:
+        archive = ''
+    
+    if archive:
+        activities_page = keyset_paginate_stream(
+            archived_activities(archive, activity_type, date_from, date_to, search),
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            per_page=20,
         )
-    
-    # Sahifalash
-    page = request.GET.get('page', 1)
-    paginator = Paginator(activities, 20)  # Har sahifada 20 ta
-    
-    try:
-        activities_page = paginator.page(page)
-    except PageNotAnInteger:
-        activities_page = paginator.page(1)
-    except EmptyPage:
-        activities_page = paginator.page(paginator.num_pages)
+        attach_users(activities_page.object_list)
+        estimated_total = None
+    else:
+        # Faoliyatlarni olish
+        activities = ActivityLog.objects.select_related('user').all()
+        
+        # Filtrlash
+        if activity_type != 'all':
+            activities = activities.filter(activity_type=activity_type)
+        
+        if date_from:
+            activities = activities.filter(created_at__gte=date_from)
+        
+        if date_to:
+            activities = activities.filter(created_at__lte=date_to)
+        
+        if search:
+            activities = search_activities(activities, search)
+        
+        # Keyset sahifalash - chuqur sahifalar ham birinchi sahifa kabi tez
+        activities_page = keyset_paginate(
+            activities,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            per_page=20,  # Har sahifada 20 ta
+        )
+        
+        # Filtrsiz ro'yxat uchun taxminiy jami (COUNT(*) siz)
+        filtered = activity_type != 'all' or date_from or date_to or search
+        estimated_total = None if filtered else estimate_count(ActivityLog)
+    
+    filter_query = urlencode({
+        key: value for key, value in {
+            'type': activity_type if activity_type != 'all' else '',
+            'date_from': date_from,
+            'date_to': date_to,
+            'search': search,
+            'archive': archive,
+        }.items() if value
+    })
     
     context = {
         'activities': activities_page,
@@ -891,6 +1190,10 @@ def admin_activities(request):
         'date_from': date_from,
         'date_to': date_to,
         'search': search,
+        'archive_months': months,
+        'current_archive': archive,
+        'filter_query': filter_query,
+        'estimated_total': estimated_total,
     }
     return render(request, 'admin/admin-activities.html', context)
 
@@ -898,8 +1201,9 @@ def admin_activities(request):
 @admin_required
 def admin_classes(request):
     """Sinflar va fanlar boshqaruvi"""
-    classes = SchoolClass.objects.all()
-    subjects = Subject.objects.all()
+    # O'quvchilar va o'qituvchilar soni student_count/teacher_count ustunlaridan
+    classes = list(SchoolClass.objects.all())
+    subjects = list(Subject.objects.all())
     
     context = {
         'classes': classes,
@@ -939,7 +1243,8 @@ def admin_edit_class(request, class_id):
     if request.method == 'POST':
         form = SchoolClassForm(request.POST, instance=school_class)
         if form.is_valid():
-            form.save()
+            # Hisoblagich ustuni signallarda F() bilan yangilanadi - eskirgan qiymat yozilmasligi uchun
+            form.save(commit=False).save(update_fields=['name'])
             # Activity log
             log_activity(
                 request.user,
@@ -967,7 +1272,7 @@ def admin_delete_class(request, class_id):
     if request.method == 'POST':
         class_name = school_class.name
         # Sinfga bog'langan o'quvchilarni tekshirish
-        student_count = Student.objects.filter(school_class=school_class).count()
+        student_count = school_class.student_count
         if student_count > 0:
             messages.error(request, f"Bu sinfda {student_count} ta o'quvchi mavjud. Avval o'quvchilarni boshqa sinfga ko'chiring.")
             return redirect('admin_classes')
@@ -1018,7 +1323,8 @@ def admin_edit_subject(request, subject_id):
     if request.method == 'POST':
         form = SubjectForm(request.POST, instance=subject)
         if form.is_valid():
-            form.save()
+            # Hisoblagich ustuni signallarda F() bilan yangilanadi - eskirgan qiymat yozilmasligi uchun
+            form.save(commit=False).save(update_fields=['name'])
             # Activity log
             log_activity(
                 request.user,
@@ -1046,7 +1352,7 @@ def admin_delete_subject(request, subject_id):
     if request.method == 'POST':
         subject_name = subject.name
         # Fanga bog'langan o'qituvchilarni tekshirish
-        teacher_count = Teacher.objects.filter(subjects=subject).count()
+        teacher_count = subject.teacher_count
         if teacher_count > 0:
             messages.error(request, f"Bu fan {teacher_count} ta o'qituvchiga bog'langan. Avval o'qituvchilardan fanni olib tashlang.")
             return redirect('admin_classes')
@@ -1076,6 +1382,44 @@ def admin_schedule(request):
     }
     return render(request, 'admin/admin-schedule.html', context)
 
+@login_required
+@admin_required
+def admin_import_schedule(request):
+    """Dars jadvalini CSV/XLSX fayldan ommaviy yuklash"""
+    if request.method != 'POST':
+        return redirect('admin_schedule')
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        messages.error(request, 'Fayl tanlanmagan!')
+        return redirect('admin_schedule')
+    
+    replace = request.POST.get('replace') == 'on'
+    try:
+        records = read_schedule_file(upload.read(), upload.name)
+        try:
+            created = import_schedule(records, replace=replace)
+        except IntegrityError:
+            # Tekshiruvdan keyin boshqa foydalanuvchi shu vaqtga dars qo'shgan - tranzaksiya bekor qilingan
+            raise ScheduleImportError([
+                "Yuklash vaqtida jadval boshqa foydalanuvchi tomonidan o'zgartirildi, qaytadan urinib ko'ring"
+            ])
+    except ScheduleImportError as e:
+        # Barcha xatolar bir vaqtda ko'rsatiladi, bazaga hech narsa yozilmaydi
+        return render(request, 'admin/admin-schedule.html', {
+            'classes': SchoolClass.objects.all(),
+            'import_errors': e.errors,
+        })
+    
+    log_activity(
+        request.user,
+        'schedule_updated',
+        f"Dars jadvali fayldan yuklandi: {upload.name} ({created} ta dars)",
+        request
+    )
+    messages.success(request, f'{created} ta dars muvaffaqiyatli yuklandi!')
+    return redirect('admin_schedule')
+
 @login_required
 @admin_required
 def admin_add_schedule(request):
@@ -1189,31 +1533,12 @@ def admin_schedule_class(request, class_id):
         messages.error(request, 'Sinf topilmadi!')
         return redirect('admin_schedule')
     
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
-    lessons = [1, 2, 3, 4, 5, 6, 7, 8]
-    
-    # Faqat shu sinfning darslarini olamiz
-    schedules = Schedule.objects.filter(school_class=school_class).select_related(
-        'subject', 'teacher__user'
-    )
-    
-    # Ma'lumotlarni tashkil etish
-    schedule_data = {}
-    for day in days:
-        schedule_data[day] = {}
-        for lesson in lessons:
-            schedule_data[day][lesson] = None
-    
-    for schedule in schedules:
-        if (schedule.day in schedule_data and 
-            schedule.period in schedule_data[schedule.day]):
-            schedule_data[schedule.day][schedule.period] = schedule
+    # Sinf haftasi keshdagi [kun][dars] matritsasidan
+    timetable = get_class_timetable(school_class.id)
     
     context = {
         'school_class': school_class,
-        'days': days,
-        'lessons': lessons,
-        'schedule_data': schedule_data,
+        'rows': timetable_rows(timetable['matrix']),
     }
     
     return render(request, 'admin/admin-view-schedule.html', context)